@@ -34,7 +34,7 @@ from creole.html2creole.emitter import CreoleEmitter
 from creole.html2rest.emitter import ReStructuredTextEmitter
 from creole.html2jira.emitter import JiraTextEmitter
 from creole.html2textile.emitter import TextileEmitter
-from creole.html_parser.parser import HtmlParser
+from creole.html_parser.parser import HtmlParser, iter_chunks
 from creole.py3compat import TEXT_TYPE
 
 
@@ -49,12 +49,23 @@ def creole2html(markup_string, debug=False,
         parser_kwargs={}, emitter_kwargs={},
         block_rules=None, blog_line_breaks=True,
         macros=None, verbose=None, stderr=None,
+        macro_workers=None, macro_timeout=None, macro_cache=None,
     ):
     """
     convert creole markup into html code
 
     >>> creole2html('This is **creole //markup//**!')
     '<p>This is <strong>creole <i>markup</i></strong>!</p>'
+
+    With macro_workers the macros are called concurrently in so many
+    threads, macro_timeout is the default timeout in seconds for every
+    macro call, see creole.creole2html.macro_runner. The async macros
+    (coroutine functions) run together in one event loop, also without
+    macro_workers. Inside of a running event loop, it runs in a helper
+    thread.
+
+    macro_cache ("emit", "process" or a cache backend) reuses the results
+    of pure macros, see creole.creole2html.macro_cache
     
     Info: parser_kwargs and emitter_kwargs are deprecated
     """
@@ -77,6 +88,9 @@ def creole2html(markup_string, debug=False,
         "macros": macros,
         "verbose": verbose,
         "stderr": stderr,
+        "macro_workers": macro_workers,
+        "macro_timeout": macro_timeout,
+        "macro_cache": macro_cache,
     }
     if emitter_kwargs:
         warnings.warn("emitter_kwargs argument in creole2html would be removed in the future!", PendingDeprecationWarning)
@@ -86,12 +100,80 @@ def creole2html(markup_string, debug=False,
     return HtmlEmitter(document, **emitter_kwargs2).emit()
 
 
-def parse_html(html_string, debug=False):
-    """ create the document tree from html code """
-    assert isinstance(html_string, TEXT_TYPE), "given html_string must be unicode!"
+def creole2html_iter(source,
+        block_rules=None, blog_line_breaks=True,
+        macros=None, verbose=None, stderr=None,
+        two_pass=False, toc_lookahead=100,
+        macro_workers=None, macro_timeout=None, macro_cache=None,
+    ):
+    """
+    convert creole markup into html code block by block
+
+    The source can be a unicode string or a iterable of unicode strings,
+    e.g. a file object from codecs.open(). The html code is yielded as soon
+    as a top level block is complete. Joined together it's the same as the
+    creole2html() result:
+
+    >>> "".join(creole2html_iter(["This is **creole //mar", "kup//**!\\n", "\\n", "next"]))
+    '<p>This is <strong>creole <i>markup</i></strong>!</p>\\n\\n<p>next</p>'
+
+    A <<toc>> needs all headlines of the document. With two_pass=True the
+    headlines are collected in a first pass over the source (must be a file
+    object or a re-iterable), otherwise the output after a <<toc>> is
+    buffered. see HtmlEmitter.iter_emit()
+
+    macro_workers, macro_timeout and macro_cache are the same as for
+    creole2html()
+    """
+    parser_kwargs = {
+        "block_rules": block_rules,
+        "blog_line_breaks": blog_line_breaks,
+    }
+
+    headlines = None
+    if two_pass:
+        if hasattr(source, "seek"):
+            start_pos = source.tell()
+        elif iter(source) is source:
+            raise TypeError("two_pass needs a file object or a re-iterable source!")
+
+        parser = CreoleParser("", **parser_kwargs)
+        all_headlines = []
+        for nodes in parser.parse_iter(source):
+            all_headlines += [
+                (node.level, node.content) for node in nodes if node.kind == "header"
+            ]
+        if "toc" in parser.root.used_macros:
+            headlines = all_headlines
+        else:
+            toc_lookahead = 0 # There is no <<toc>>
+
+        if hasattr(source, "seek"):
+            source.seek(start_pos)
+
+    parser = CreoleParser("", **parser_kwargs)
+    emitter = HtmlEmitter(parser.root, macros=macros, verbose=verbose, stderr=stderr,
+        macro_workers=macro_workers, macro_timeout=macro_timeout, macro_cache=macro_cache
+    )
+    return emitter.iter_emit(
+        parser.parse_iter(source), headlines=headlines, toc_lookahead=toc_lookahead
+    )
+
+
+def parse_html(html_string, debug=False, tokenizer=None):
+    """
+    create the document tree from html code
+
+    html_string can be a unicode string, a file object or a iterable of
+    unicode strings. File objects and iterables are parsed chunk by chunk.
 
-    h2c = HtmlParser(debug=debug)
-    document_tree = h2c.feed(html_string)
+    tokenizer is the name of the html tokenizer backend, e.g. "lxml",
+    see creole.html_parser.tokenizer
+    """
+    h2c = HtmlParser(debug=debug, tokenizer=tokenizer)
+    for data in iter_chunks(html_string):
+        h2c.feed(data)
+    document_tree = h2c.close()
     if debug:
         h2c.debug()
     return document_tree
@@ -99,18 +181,22 @@ def parse_html(html_string, debug=False):
 
 def html2creole(html_string, debug=False,
         parser_kwargs={}, emitter_kwargs={},
-        unknown_emit=None
+        unknown_emit=None, tokenizer=None
     ):
     """
     convert html code into creole markup
 
+    html_string can be a unicode string, a file object or a iterable of
+    unicode strings and tokenizer the html tokenizer backend, see
+    parse_html()
+
     >>> html2creole('<p>This is <strong>creole <i>markup</i></strong>!</p>')
     'This is **creole //markup//**!'
     """
     if parser_kwargs:
         warnings.warn("parser_kwargs argument in html2creole would be removed in the future!", PendingDeprecationWarning)
 
-    document_tree = parse_html(html_string, debug=debug)
+    document_tree = parse_html(html_string, debug=debug, tokenizer=tokenizer)
 
     emitter_kwargs2 = {
         "unknown_emit": unknown_emit,
@@ -126,10 +212,14 @@ def html2creole(html_string, debug=False,
 
 def html2textile(html_string, debug=False,
         parser_kwargs={}, emitter_kwargs={},
-        unknown_emit=None
+        unknown_emit=None, tokenizer=None
     ):
     """
     convert html code into textile markup
+
+    html_string can be a unicode string, a file object or a iterable of
+    unicode strings and tokenizer the html tokenizer backend, see
+    parse_html()
     
     >>> html2textile('<p>This is <strong>textile <i>markup</i></strong>!</p>')
     'This is *textile __markup__*!'
@@ -137,7 +227,7 @@ def html2textile(html_string, debug=False,
     if parser_kwargs:
         warnings.warn("parser_kwargs argument in html2textile would be removed in the future!", PendingDeprecationWarning)
 
-    document_tree = parse_html(html_string, debug=debug)
+    document_tree = parse_html(html_string, debug=debug, tokenizer=tokenizer)
 
     emitter_kwargs2 = {
         "unknown_emit": unknown_emit,
@@ -153,10 +243,14 @@ def html2textile(html_string, debug=False,
 
 def html2rest(html_string, debug=False,
         parser_kwargs={}, emitter_kwargs={},
-        unknown_emit=None
+        unknown_emit=None, tokenizer=None
     ):
     """
     convert html code into ReStructuredText markup
+
+    html_string can be a unicode string, a file object or a iterable of
+    unicode strings and tokenizer the html tokenizer backend, see
+    parse_html()
     
     >>> html2rest('<p>This is <strong>ReStructuredText</strong> <em>markup</em>!</p>')
     'This is **ReStructuredText** *markup*!'
@@ -164,7 +258,7 @@ def html2rest(html_string, debug=False,
     if parser_kwargs:
         warnings.warn("parser_kwargs argument in html2rest would be removed in the future!", PendingDeprecationWarning)
 
-    document_tree = parse_html(html_string, debug=debug)
+    document_tree = parse_html(html_string, debug=debug, tokenizer=tokenizer)
 
     emitter_kwargs2 = {
         "unknown_emit": unknown_emit,
@@ -180,18 +274,22 @@ def html2rest(html_string, debug=False,
 
 def html2jira(html_string, debug=False,
               parser_kwargs={}, emitter_kwargs={},
-              unknown_emit=None
+              unknown_emit=None, tokenizer=None
     ):
     """
     convert html code into JiraText markup
 
+    html_string can be a unicode string, a file object or a iterable of
+    unicode strings and tokenizer the html tokenizer backend, see
+    parse_html()
+
     >>> html2rest('<p>This is <strong>JiraText</strong> <em>markup</em>!</p>')
     'This is **ReStructuredText** *markup*!'
     """
     if parser_kwargs:
         warnings.warn("parser_kwargs argument in html2rest would be removed in the future!", PendingDeprecationWarning)
 
-    document_tree = parse_html(html_string, debug=debug)
+    document_tree = parse_html(html_string, debug=debug, tokenizer=tokenizer)
 
     emitter_kwargs2 = {
         "unknown_emit": unknown_emit,
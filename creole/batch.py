@@ -0,0 +1,169 @@
+# coding: utf-8
+
+
+"""
+    python-creole batch conversion
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Convert many documents on all CPU cores:
+
+    >>> results = convert_many(["**one**", "//two//"], workers=1)
+    >>> [result.output for result in results]
+    ['<p><strong>one</strong></p>', '<p><i>two</i></p>']
+
+    Every document is converted in a worker process, so all arguments must
+    be picklable. Macros are given by the importable name of a module, a
+    class or a dict with the macro functions, every document gets its own
+    copy of them (see get_macros()), e.g.:
+
+    >>> results = convert_many(
+    ...     ["<<html>><p>raw</p><</html>>"], workers=1,
+    ...     macros="creole.shared.example_macros"
+    ... )
+    >>> results[0].output
+    '<p>raw</p>'
+
+    An error doesn't stop the batch, the traceback is in the result:
+
+    >>> results = convert_many([b"no unicode"], workers=1)
+    >>> results[0].output is None
+    True
+    >>> "AssertionError" in results[0].error
+    True
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import collections
+import functools
+import importlib
+import multiprocessing
+import traceback
+
+import creole
+from creole.creole2html.emitter import TableOfContent
+from creole.py3compat import TEXT_TYPE
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    # Python 2 without the "futures" backport: convert in this process
+    ProcessPoolExecutor = None
+
+
+CONVERTERS = ("creole2html", "html2creole", "html2textile", "html2rest", "html2jira")
+
+ConvertResult = collections.namedtuple("ConvertResult", ("output", "error"))
+
+_IMPORT_CACHE = {}
+
+
+def import_by_name(name):
+    """
+    Import a object by the name "package.module" or "package.module:attribute"
+
+    >>> import_by_name("creole.shared.example_macros:html")("<p>")
+    '<p>'
+    """
+    try:
+        return _IMPORT_CACHE[name]
+    except KeyError:
+        pass
+
+    module_name, _, attribute = name.partition(":")
+    obj = importlib.import_module(module_name)
+    if attribute:
+        for part in attribute.split("."):
+            obj = getattr(obj, part)
+    return _IMPORT_CACHE.setdefault(name, obj)
+
+
+def get_converter(func):
+    """
+    Return the converter function by one of the CONVERTERS names
+    or by the importable name, see import_by_name()
+    """
+    if func in CONVERTERS:
+        return getattr(creole, func)
+    if ":" not in func:
+        raise ValueError(
+            "Unknown converter %r (use one of %s or 'module:function')" % (
+                func, ", ".join(CONVERTERS)
+            )
+        )
+    return import_by_name(func)
+
+
+def get_macros(obj):
+    """
+    Return a new dict with the macros of a module, a class or a dict for
+    one document: The emitter stores the state of the <<toc>> in the
+    macros, so every document needs its own TableOfContent.
+
+    >>> macros = get_macros(import_by_name("creole.shared.example_macros"))
+    >>> macros["pre"]("<p>")
+    '<pre>&lt;p&gt;</pre>'
+    >>> macros["toc"] = TableOfContent()
+    >>> get_macros(macros)["toc"] is macros["toc"]
+    False
+    """
+    if isinstance(obj, dict):
+        items = obj.items()
+    else:
+        items = [
+            (name, getattr(obj, name)) for name in dir(obj)
+            if not name.startswith("_") and callable(getattr(obj, name))
+        ]
+
+    macros = {}
+    for name, macro in items:
+        if isinstance(macro, TableOfContent):
+            macro = macro.__class__()
+        macros[name] = macro
+    return macros
+
+
+def convert(func, kwargs, doc):
+    """
+    Convert one document in the worker process.
+    Returns a ConvertResult with the output or the traceback.
+    """
+    try:
+        converter = get_converter(func)
+        macros = kwargs.get("macros")
+        if isinstance(macros, TEXT_TYPE):
+            macros = import_by_name(macros)
+        if macros is not None:
+            kwargs = dict(kwargs, macros=get_macros(macros))
+        return ConvertResult(converter(doc, **kwargs), None)
+    except Exception:
+        return ConvertResult(None, traceback.format_exc())
+
+
+def convert_many(docs, func="creole2html", workers=None, chunksize=10, **kwargs):
+    """
+    Convert all documents with the converter func (a name from CONVERTERS
+    or "module:function") and return a list of ConvertResult in the same
+    order. All kwargs are passed to the converter.
+
+    The documents are distributed over workers processes (default: the
+    number of CPUs) in chunks of chunksize documents. With workers=1 (or
+    without concurrent.futures) everything runs in the current process.
+    """
+    # Raise errors directly, not for every document:
+    get_converter(func)
+    if isinstance(kwargs.get("macros"), TEXT_TYPE):
+        import_by_name(kwargs["macros"])
+
+    job = functools.partial(convert, func, kwargs)
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers <= 1 or ProcessPoolExecutor is None:
+        return [job(doc) for doc in docs]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(job, docs, chunksize=chunksize))
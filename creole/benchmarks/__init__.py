@@ -0,0 +1,57 @@
+# coding: utf-8
+
+
+"""
+    python-creole benchmarks
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Small timing helpers used by the bench_*.py modules.
+    Every module can be run directly, e.g.:
+
+        python -m creole.benchmarks.bench_grammar
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import timeit
+
+
+def time_per_call(func, number=None, repeat=5):
+    """
+    Return the best time in seconds for one func() call.
+    If number is None, it is increased until one run takes >= 0.2 sec.
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number = 1
+        while True:
+            if timer.timeit(number) >= 0.2:
+                break
+            number *= 10
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def format_time(seconds):
+    """
+    >>> format_time(0.0000012)
+    '1.20 usec'
+    >>> format_time(0.0123)
+    '12.30 msec'
+    >>> format_time(2)
+    '2.00 sec'
+    """
+    if seconds < 0.001:
+        return "%.2f usec" % (seconds * 1000000)
+    if seconds < 1:
+        return "%.2f msec" % (seconds * 1000)
+    return "%.2f sec" % seconds
+
+
+def print_result(title, seconds, baseline=None):
+    line = "%-45s %12s" % (title, format_time(seconds))
+    if baseline:
+        line += "  (x%.1f)" % (baseline / seconds)
+    print(line)
@@ -0,0 +1,83 @@
+# coding: utf-8
+
+
+"""
+    python-creole benchmark suite
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Run all workloads, save the results and compare them with a baseline:
+
+        python -m creole.benchmarks --output before.json
+        ... change the code ...
+        python -m creole.benchmarks --baseline before.json
+
+    The exit code is 1, if a workload is slower than the baseline by more
+    than the threshold. see: python -m creole.benchmarks --help
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import argparse
+import sys
+
+from creole.benchmarks.suite import compare_results, load_results, print_comparison, \
+    run_suite, save_results
+from creole.benchmarks.workloads import CONVERTERS, FEATURES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m creole.benchmarks",
+        description="Benchmark the python-creole converters",
+    )
+    parser.add_argument("-c", "--converter", action="append", choices=CONVERTERS,
+        help="converter to benchmark, can be given more than once (default: all)"
+    )
+    parser.add_argument("-f", "--feature", action="append", choices=FEATURES,
+        help="feature mix of the documents, can be given more than once (default: all)"
+    )
+    parser.add_argument("-s", "--size", action="append", type=int,
+        help="document size in KB, can be given more than once (default: 1 and 64)"
+    )
+    parser.add_argument("--min-time", type=float, default=0.5,
+        help="minimal seconds per workload (default: 0.5)"
+    )
+    parser.add_argument("--no-memory", action="store_true",
+        help="don't measure the peak memory"
+    )
+    parser.add_argument("-o", "--output", help="save the results as JSON into this file")
+    parser.add_argument("-b", "--baseline", help="compare with the JSON results from this file")
+    parser.add_argument("--threshold", type=float, default=10,
+        help="percent the median latency can be longer than in the baseline (default: 10)"
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [size * 1024 for size in (args.size or [1, 64])]
+    results = run_suite(
+        converters=args.converter or CONVERTERS,
+        features=args.feature or FEATURES,
+        sizes=sizes,
+        min_time=args.min_time,
+        memory=not args.no_memory,
+    )
+    if args.output:
+        save_results(results, args.output)
+        print("\nResults saved into %r" % args.output)
+
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        print("\nCompared with %r (version %s, Python %s):" % (
+            args.baseline, baseline["version"], baseline["python"]
+        ))
+        comparisons = compare_results(results, baseline, threshold=args.threshold / 100)
+        print_comparison(comparisons)
+        if any([comparison.regression for comparison in comparisons]):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# coding: utf-8
+
+
+"""
+    batch conversion scaling
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Convert many documents with creole.batch.convert_many() with 1 up to
+    all CPU cores and print the documents per second.
+
+        python -m creole.benchmarks.bench_batch [max. workers]
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import multiprocessing
+import sys
+
+from creole.batch import convert_many
+from creole.benchmarks import time_per_call, print_result
+
+
+PAGE = """= Page %(no)i
+
+Some **bold** and //italic// text with a [[link|http://example.org/%(no)i]].
+
+* list item
+** sub item with ##monospace##
+* [[WikiPage%(no)i]]
+
+|= head |= other head |
+| cell  | //cell//    |
+
+{{{
+preformatted
+}}}
+""" * 5
+
+
+def main():
+    docs = [PAGE % {"no": no} for no in range(2000)]
+    cpu_count = multiprocessing.cpu_count()
+    if len(sys.argv) > 1:
+        max_workers = int(sys.argv[1])
+    else:
+        max_workers = cpu_count
+    worker_counts = sorted(set([1, 2, 4, 8, max_workers]))
+    worker_counts = [count for count in worker_counts if count <= max_workers]
+
+    print("convert_many() of %i documents (%i CPUs):" % (len(docs), cpu_count))
+    before = None
+    for workers in worker_counts:
+        duration = time_per_call(
+            lambda: convert_many(docs, workers=workers, chunksize=50), number=1, repeat=3
+        )
+        print_result("%i worker(s)" % workers, duration, before)
+        print("%45s %9.1f docs/sec" % ("", len(docs) / duration))
+        if before is None:
+            before = duration
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# coding: utf-8
+
+
+"""
+    creole2html render cache
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare creole2html() with cached_creole2html() hits of the
+    memory, sqlite and directory cache backends.
+
+        python -m creole.benchmarks.bench_cache
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from creole import creole2html
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.bench_batch import PAGE
+from creole.creole2html.cache import MemoryCache, SqliteCache, DirectoryCache, \
+    cached_creole2html
+
+
+def main():
+    markup = "\n".join([PAGE % {"no": no} for no in range(10)])
+    temp_dir = tempfile.mkdtemp()
+    try:
+        caches = (
+            ("MemoryCache", MemoryCache(max_size=10 * 1024 * 1024)),
+            ("SqliteCache", SqliteCache(os.path.join(temp_dir, "cache.sqlite"), 10 * 1024 * 1024)),
+            ("DirectoryCache", DirectoryCache(os.path.join(temp_dir, "cache"), 10 * 1024 * 1024)),
+        )
+
+        print("Render %i KB markup:" % (len(markup) / 1024))
+        before = time_per_call(lambda: creole2html(markup))
+        print_result("creole2html()", before)
+        for title, cache in caches:
+            after = time_per_call(lambda: cached_creole2html(markup, cache))
+            print_result("cached_creole2html() with %s" % title, after, before)
+            print("%45s %12s" % ("", "hits: %i misses: %i" % (cache.hits, cache.misses)))
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()
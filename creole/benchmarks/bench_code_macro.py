@@ -0,0 +1,92 @@
+# coding: utf-8
+
+
+"""
+    code macro
+    ~~~~~~~~~~
+
+    Emit a page with many code blocks with the old code macro (a new lexer
+    and formatter for every block), with the shared lexers and formatter
+    and with the cached highlighted code (needs pygments):
+
+        python -m creole.benchmarks.bench_code_macro
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole.benchmarks import time_per_call, print_result
+from creole.creole2html.emitter import HtmlEmitter
+from creole.creole2html.parser import CreoleParser
+from creole.shared import example_macros
+
+try:
+    from pygments import highlight, lexers
+    from pygments.formatters import HtmlFormatter
+except ImportError:
+    highlight = None
+
+
+def old_code(ext, text):
+    """ The code macro before the shared lexers and formatter """
+    source_type = ext.strip().split('.')[1] if '.' in ext else ext.strip()
+
+    try:
+        lexer = lexers.get_lexer_by_name(source_type)
+    except:
+        # Was called with the code macro function instead of the text
+        lexer = lexers.guess_lexer(text)
+    formatter = HtmlFormatter(lineos = True, encoding='utf-8',
+                             style='colorful', outencoding='utf-8',
+                             cssclass='pygments')
+
+    try:
+        highlighted_text = highlight(text, lexer, formatter).decode('utf-8')
+    except:
+        highlighted_text = example_macros.pre(text)
+    finally:
+        return highlighted_text.replace('\n', '<br />\n')
+
+
+BLOCKS = (
+    (".py", 'def hello(name):\n    print("Hello %s!" % name)\n\nhello("World")'),
+    (".js", 'function hello(name) {\n    console.log("Hello " + name);\n}'),
+    (".html", '<p class="hello">Hello <strong>World</strong></p>'),
+    (".sql", "SELECT name FROM users WHERE id = 1;"),
+    (".unknown", '#!/usr/bin/env python\nprint("Hello World")'),
+)
+
+
+def main():
+    if highlight is None:
+        print("pygments is not installed.")
+        return
+
+    markup = "\n\n".join([
+        "== Block %i\n\n<<code ext=\"%s\">>\n%s\n<</code>>" % (no, ext, code)
+        for no in range(40)
+        for ext, code in BLOCKS
+    ])
+    document = CreoleParser(markup).parse()
+    print("Emit a page with %i code blocks:" % (40 * len(BLOCKS)))
+
+    def emit(code, macro_cache=None):
+        return HtmlEmitter(document, macros={"code": code}, macro_cache=macro_cache).emit()
+
+    expected = emit(example_macros.code)
+    assert emit(old_code) == expected
+
+    before = time_per_call(lambda: emit(old_code), repeat=3)
+    print_result("new lexer and formatter per block", before)
+    duration = time_per_call(lambda: emit(example_macros.code), repeat=3)
+    print_result("shared lexers and formatter", duration, before)
+
+    assert emit(example_macros.code, "emit") == expected
+    duration = time_per_call(lambda: emit(example_macros.code, "emit"), repeat=3)
+    print_result("with macro_cache=\"emit\"", duration, before)
+
+
+if __name__ == "__main__":
+    main()
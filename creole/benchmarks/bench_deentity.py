@@ -0,0 +1,108 @@
+# coding: utf-8
+
+
+"""
+    html entity decoding
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Compare the old Deentity (groupdict() + getattr() for every entity and
+    int() + chr() for every number) with the precomputed entity table and
+    the memoized character references on entity heavy text, on text
+    without entities and in the html2creole emitter:
+
+        python -m creole.benchmarks.bench_deentity
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+from creole import parse_html
+from creole.benchmarks import time_per_call, print_result
+from creole.html2creole.emitter import CreoleEmitter
+from creole.html_tools.deentity import Deentity, entities
+from creole.py3compat import PY3
+
+if PY3:
+    unichr = chr
+
+
+SIZE = 256 * 1024
+
+old_entities_regex = re.compile('|'.join([
+    r"(&\#(?P<number>\d+);)",
+    r"(&\#x(?P<hex>[a-fA-F0-9]+);)",
+    r"(&(?P<named>[a-zA-Z]+);)",
+]), re.VERBOSE | re.UNICODE | re.MULTILINE)
+
+
+class OldDeentity(object):
+    def replace_number(self, text):
+        return unichr(int(text))
+
+    def replace_hex(self, text):
+        return unichr(int(text, 16))
+
+    def replace_named(self, text):
+        if text == "nbsp":
+            return " "
+        return unichr(entities.name2codepoint[text])
+
+    def replace_all(self, content):
+        def replace_entity(match):
+            groups = match.groupdict()
+            for name, text in groups.items():
+                if text is not None:
+                    replace_method = getattr(self, 'replace_%s' % name)
+                    return replace_method(text)
+        return old_entities_regex.sub(replace_entity, content)
+
+
+class OldDeentityEmitter(CreoleEmitter):
+    def __init__(self, *args, **kwargs):
+        super(OldDeentityEmitter, self).__init__(*args, **kwargs)
+        self.deentity = OldDeentity()
+
+    def charref_emit(self, node):
+        entity = node.content
+        if entity.startswith("x"):
+            return self.deentity.replace_hex(entity[1:])
+        return self.deentity.replace_number(entity)
+
+
+def get_text(unit, size):
+    return unit * (size // len(unit) + 1)
+
+
+def main():
+    entity_text = get_text(
+        "M&uuml;hlheim &lt;&gt; &#60;&#x3E; &amp; &copy;&nbsp;&#9580;&#x256C; 2&#8364; ", SIZE
+    )
+    plain_text = get_text("Muehlheim without any entities, but long lines. ", SIZE)
+
+    old, new = OldDeentity(), Deentity()
+    for title, text in (("entity heavy text", entity_text), ("text without entities", plain_text)):
+        print("\nDeentity.replace_all() of %s (%i KB):" % (title, len(text) / 1024))
+        assert new.replace_all(text) == old.replace_all(text)
+
+        before = time_per_call(lambda: old.replace_all(text), number=1, repeat=7)
+        print_result("old replace_all()", before)
+        duration = time_per_call(lambda: new.replace_all(text), number=1, repeat=7)
+        print_result("replace_all()", duration, before)
+
+    html = "<p>%s</p>" % entity_text
+    document_tree = parse_html(html)
+    print("\nhtml2creole emit of entity heavy html (%i KB):" % (len(html) / 1024))
+    assert CreoleEmitter(document_tree).emit() == OldDeentityEmitter(document_tree).emit()
+
+    before = time_per_call(lambda: OldDeentityEmitter(document_tree).emit(), number=1, repeat=7)
+    print_result("old entityref_emit()/charref_emit()", before)
+    duration = time_per_call(lambda: CreoleEmitter(document_tree).emit(), number=1, repeat=7)
+    print_result("entityref_emit()/charref_emit()", duration, before)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# coding: utf-8
+
+
+"""
+    parser callback dispatch
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Parse creole/tests/test_README.creole with the match.lastgroup dispatch
+    table and with the old groupdict() walk + getattr() for every match.
+
+        python -m creole.benchmarks.bench_dispatch
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import os
+
+import creole
+from creole.benchmarks import time_per_call, print_result
+from creole.creole2html.parser import CreoleParser
+
+
+README_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(creole.__file__)), "tests", "test_README.creole"
+)
+
+
+class GroupWalkParser(CreoleParser):
+    """ CreoleParser with the dispatch used before the handler table """
+    def _replace(self, match):
+        groups = match.groupdict()
+        for name, text in groups.items():
+            if text is not None:
+                replace_method = getattr(self, '_%s_repl' % name)
+                replace_method(groups)
+                return
+
+
+def main():
+    with codecs.open(README_PATH, "r", encoding="utf-8") as f:
+        markup = f.read()
+
+    for count in (1, 100):
+        text = "\n\n".join([markup] * count)
+        print("CreoleParser.parse() of %r x %i (%i chars):" % (
+            os.path.basename(README_PATH), count, len(text)
+        ))
+        before = time_per_call(lambda: GroupWalkParser(text).parse())
+        print_result("groupdict() walk + getattr()", before)
+        after = time_per_call(lambda: CreoleParser(text).parse())
+        print_result("match.lastgroup dispatch table", after, before)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# coding: utf-8
+
+
+"""
+    html emitter output building
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare HtmlEmitter.emit() with one list of html code parts against
+    joining the html code of the children at every tree level.
+
+        python -m creole.benchmarks.bench_emit
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import os
+
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.bench_dispatch import README_PATH
+from creole.creole2html.emitter import HtmlEmitter
+from creole.creole2html.parser import CreoleParser
+
+
+class JoinedEmitter(HtmlEmitter):
+    """ HtmlEmitter.emit() before the list of html code parts """
+    def emit(self):
+        document = self.emit_node(self.root).strip()
+        if self.toc is not None:
+            return self.toc.emit(document)
+        return document
+
+
+def deep_markup(depth, count):
+    """ nested lists with nested text markup """
+    item = "**bold //italic __underline ##mono## text__ text// text** " * 10
+    lines = []
+    for level in range(1, depth + 1):
+        lines.append("%s %s" % ("*" * level, item))
+    return "\n\n".join(["\n".join(lines)] * count)
+
+
+def main():
+    with codecs.open(README_PATH, "r", encoding="utf-8") as f:
+        readme = f.read()
+
+    workloads = (
+        ("%s x 100" % os.path.basename(README_PATH), "\n\n".join([readme] * 100)),
+        ("nested lists, depth 10", deep_markup(depth=10, count=50)),
+        ("nested lists, depth 30", deep_markup(depth=30, count=20)),
+    )
+    for title, markup in workloads:
+        document = CreoleParser(markup).parse()
+        html = HtmlEmitter(document).emit()
+        assert JoinedEmitter(document).emit() == html
+
+        print("\nHtmlEmitter.emit() of %s (%i KB html):" % (title, len(html) / 1024))
+        before = time_per_call(lambda: JoinedEmitter(document).emit())
+        print_result("join children at every level", before)
+        after = time_per_call(lambda: HtmlEmitter(document).emit())
+        print_result("one list of parts", after, before)
+
+
+if __name__ == "__main__":
+    main()
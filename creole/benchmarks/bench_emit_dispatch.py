@@ -0,0 +1,146 @@
+# coding: utf-8
+
+
+"""
+    emit method dispatch
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Emit the html of the cross compare unittests with the *_emit methods
+    looked up once per emitter class against the lookup in every emitter
+    instance and the result type check of every *_emit call, used before:
+
+        python -m creole.benchmarks.bench_emit_dispatch
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole import parse_html
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.workloads import get_workload
+from creole.creole2html.emitter import HtmlEmitter
+from creole.creole2html.parser import CreoleParser
+from creole.html2creole.emitter import CreoleEmitter
+from creole.html2rest.emitter import ReStructuredTextEmitter
+from creole.py3compat import TEXT_TYPE
+from creole.shared.base_emitter import CHILDREN_FIRST_UNKNOWN_EMITS, _defined_in
+
+
+class InstanceDispatchMixin(object):
+    """
+    BaseEmitter.emit_node() with the handlers looked up per instance and
+    the debug and type checks in every step.
+    """
+    def _get_handlers(self, kind):
+        emit = getattr(self, "%s_emit" % kind, None)
+        if emit is None:
+            return None, None, self._unknown_emit in CHILDREN_FIRST_UNKNOWN_EMITS
+
+        enter = getattr(self, "%s_enter" % kind, None)
+        if enter is not None:
+            cls = self.__class__
+            if not issubclass(_defined_in(cls, "%s_enter" % kind), _defined_in(cls, "%s_emit" % kind)):
+                return emit, None, False
+        return emit, enter, kind not in self.opaque_kinds
+
+    def emit_node(self, node):
+        handlers = self.__dict__.setdefault("_instance_handlers", {})
+        stack = []
+        result = []
+        nodes = iter((node,))
+        while True:
+            for node in nodes:
+                try:
+                    emit, enter, walk = handlers[node.kind]
+                except KeyError:
+                    emit, enter, walk = handlers[node.kind] = self._get_handlers(node.kind)
+
+                if self.debugging:
+                    self.debug_msg("emit_node", "%s: %r" % (node.kind, node.content))
+
+                if enter is not None:
+                    enter(node)
+                    if walk and node.children:
+                        self.last = node
+                        stack.append((node, emit, nodes, result))
+                        nodes = iter(node.children)
+                        result = []
+                        break
+                    self._walked_node = node
+                    self._walked_children = []
+                elif walk and node.children:
+                    self.last = node
+                    stack.append((node, emit, nodes, result))
+                    nodes = iter(node.children)
+                    result = []
+                    break
+
+                result.append(self._old_emit(node, emit))
+            else:
+                if not stack:
+                    return result[0]
+                node, emit, nodes, parent_result = stack.pop()
+                self._walked_node = node
+                self._walked_children = result
+                content = self._old_emit(node, emit)
+                result = parent_result
+                result.append(content)
+
+    def _old_emit(self, node, emit):
+        if emit is None:
+            content = self._unknown_emit(self, node)
+        else:
+            content = emit(node)
+        assert isinstance(content, TEXT_TYPE)
+        self.last = node
+        return content
+
+
+class InstanceCreoleEmitter(InstanceDispatchMixin, CreoleEmitter):
+    pass
+
+
+class InstanceReStructuredTextEmitter(InstanceDispatchMixin, ReStructuredTextEmitter):
+    def emit_node(self, node):
+        # The substitutions of ReStructuredTextEmitter.emit_node()
+        result = ""
+        if self._substitution_data and node.parent == self.root:
+            result += "%s\n\n" % self._get_block_data()
+        return result + InstanceDispatchMixin.emit_node(self, node)
+
+
+class GetattrHtmlEmitter(HtmlEmitter):
+    """ HtmlEmitter.emit_node() with getattr() for every node """
+    def emit_node(self, node):
+        emit = getattr(self, '%s_emit' % node.kind, self.default_emit)
+        return emit(node)
+
+
+def emit_all(emitter_class, document_trees, **kwargs):
+    return [emitter_class(tree, **kwargs).emit() for tree in document_trees]
+
+
+def main():
+    html_docs = get_workload("html2rest", "corpus", 0).docs
+    html_trees = [parse_html(html) for html in html_docs]
+    creole_docs = get_workload("creole2html", "corpus", 0).docs
+    creole_trees = [CreoleParser(markup).parse() for markup in creole_docs]
+
+    for title, trees, before_class, emitter_class, kwargs in (
+            ("html2creole", html_trees, InstanceCreoleEmitter, CreoleEmitter, {}),
+            ("html2rest", html_trees, InstanceReStructuredTextEmitter, ReStructuredTextEmitter, {}),
+            ("creole2html", creole_trees, GetattrHtmlEmitter, HtmlEmitter, {"verbose": 0}),
+        ):
+        print("\n%s emit of the cross compare corpus (%i documents):" % (title, len(trees)))
+        assert emit_all(before_class, trees, **kwargs) == emit_all(emitter_class, trees, **kwargs)
+
+        before = time_per_call(lambda: emit_all(before_class, trees, **kwargs))
+        print_result("lookup per instance/node", before)
+        duration = time_per_call(lambda: emit_all(emitter_class, trees, **kwargs))
+        print_result("lookup per class", duration, before)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# coding: utf-8
+
+
+"""
+    creole2html latency for small documents
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the per-call latency of creole2html() with the shared block
+    grammar (creole.creole2html.parser.get_block_re) against recompiling
+    the grammar for every CreoleParser instance, like it was done before.
+
+        python -m creole.benchmarks.bench_grammar
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+from creole import creole2html
+from creole.benchmarks import time_per_call, print_result
+from creole.creole2html import parser
+
+
+SMALL_DOCUMENTS = (
+    ("one line", "This is **creole //markup//**!"),
+    ("paragraphs", "= Headline\n\nFirst paragraph.\nSecond line.\n\nSecond paragraph."),
+    ("list + table", "* one\n* two\n** two.one\n\n|= head |= head2 |\n| cell | cell2 |"),
+)
+
+
+def creole2html_recompile(markup):
+    """ creole2html() as before: compile the grammar on every call """
+    parser._BLOCK_RE_CACHE.clear()
+    re.purge() # Simulate a miss in the re module cache
+    return creole2html(markup)
+
+
+def creole2html_re_cache(markup):
+    """ creole2html() as before, but with a hit in the re module cache """
+    parser._BLOCK_RE_CACHE.clear()
+    return creole2html(markup)
+
+
+def main():
+    print("creole2html() per-call latency for small documents:")
+    for title, markup in SMALL_DOCUMENTS:
+        print("")
+        before = time_per_call(lambda: creole2html_recompile(markup))
+        print_result("%s - recompile grammar" % title, before)
+        cached = time_per_call(lambda: creole2html_re_cache(markup))
+        print_result("%s - re module cache hit" % title, cached, before)
+        after = time_per_call(lambda: creole2html(markup))
+        print_result("%s - shared grammar" % title, after, before)
+
+
+if __name__ == "__main__":
+    main()
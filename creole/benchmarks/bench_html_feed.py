@@ -0,0 +1,128 @@
+# coding: utf-8
+
+
+"""
+    HtmlParser.feed() pre-processing
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Before the html code is parsed, the <pre> areas are cut out and the
+    whitespace is deleted. Compare the old pre-processing (two regex
+    passes for the <pre> areas and strip_html() after it) with the single
+    pass of clean_html() on 10 MB of html code. The peak memory needs
+    tracemalloc, so Python 3.4 or newer:
+
+        python -m creole.benchmarks.bench_html_feed
+
+    The old block and inline regex match the <pre> content character by
+    character with a (\n|.)*? group, so big <pre> areas are very slow.
+    clean_html() finds the areas with str.find() and looks at every
+    character a constant number of times.
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+from creole import creole2html
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.bench_strip_html import old_strip_html
+from creole.benchmarks.workloads import synthetic_markup
+from creole.html_parser.parser import HtmlParser, clean_html
+from creole.shared import example_macros
+
+
+SIZE = 10 * 1024 * 1024
+
+# The regex of the old HtmlParser.feed()
+block_re = re.compile(r'''
+    ^<pre> \s* $
+    (?P<pre_block>
+        (\n|.)*?
+    )
+    ^</pre> \s* $
+    [\s\n]*
+''', re.VERBOSE | re.UNICODE | re.MULTILINE)
+
+inline_re = re.compile(r'''
+    <pre>
+    (?P<pre_inline>
+        (\n|.)*?
+    )
+    </pre>
+''', re.VERBOSE | re.UNICODE)
+
+
+def old_clean_html(raw_data, block_cut, inline_cut):
+    data = raw_data.strip()
+    data = block_re.sub(lambda match: block_cut(match.group("pre_block")), data)
+    data = inline_re.sub(lambda match: inline_cut(match.group("pre_inline")), data)
+    return old_strip_html(data)
+
+
+def placeholder_cut(content):
+    return "<blockdata />"
+
+
+def get_html(feature, size):
+    markup = synthetic_markup(feature, 64 * 1024)
+    html = creole2html(markup, macros=example_macros)
+    return html * (size // len(html) + 1)
+
+
+def get_pre_html(size):
+    pre = "\n".join(["    line %i with <code> & some text" % no for no in range(1000)])
+    html = (
+        "<p>text with <pre>inline pre</pre></p>\n"
+        "<pre>\n%s\n</pre>\n" % pre
+    )
+    return html * (size // len(html) + 1)
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    documents = (
+        ("mixed html", get_html("mixed", SIZE)),
+        ("paragraphs html", get_html("paragraphs", SIZE)),
+        ("big <pre> areas", get_pre_html(SIZE)),
+    )
+    for title, html in documents:
+        size = len(html) / 1024 / 1024
+        print("\n%s (%.1f MB):" % (title, size))
+
+        for name, func in (("old pre-processing", old_clean_html), ("clean_html()", clean_html)):
+            cut = HtmlParser()._pre_block_cut
+            duration = time_per_call(lambda: func(html, cut, cut), number=1, repeat=3)
+            if func is old_clean_html:
+                before = duration
+                print_result(name, duration)
+            else:
+                print_result(name, duration, before)
+            line = "%45s %9.1f MB/sec" % ("", size / duration)
+            if tracemalloc is not None:
+                peak = peak_memory(lambda: func(html, cut, cut))
+                line += ", peak memory: %.1f MB" % (peak / 1024 / 1024)
+            print(line)
+
+        assert clean_html(html, placeholder_cut, placeholder_cut) \
+            == old_clean_html(html, placeholder_cut, placeholder_cut)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# coding: utf-8
+
+
+"""
+    incremental creole2html
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    The preview of a 1 MB page while typing: creole2html() of the complete
+    page against IncrementalRenderer.render() after every keystroke.
+
+        python -m creole.benchmarks.bench_incremental
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import time
+
+from creole import creole2html
+from creole.benchmarks import print_result, time_per_call
+from creole.benchmarks.bench_dispatch import README_PATH
+from creole.creole2html.incremental import IncrementalRenderer
+
+
+def main():
+    with codecs.open(README_PATH, "r", encoding="utf-8") as f:
+        readme = f.read()
+    count = 1024 * 1024 // len(readme) + 1
+    markup = "\n\n".join([readme] * count)
+    print("%i KB page (%i x %s)" % (len(markup) / 1024, count, "test_README.creole"))
+
+    before = time_per_call(lambda: creole2html(markup), number=1, repeat=3)
+    print_result("creole2html() of the page", before)
+
+    renderer = IncrementalRenderer()
+    start_time = time.time()
+    renderer.render(markup)
+    print_result("IncrementalRenderer.render() first time", time.time() - start_time, before)
+
+    for title, pos in (("start", 100), ("middle", len(markup) // 2), ("end", len(markup) - 100)):
+        # Type a word, char by char
+        durations = []
+        for no, char in enumerate("**word** "):
+            pos += 1
+            markup = markup[:pos] + char + markup[pos:]
+            start_time = time.time()
+            html = renderer.render(markup)
+            durations.append(time.time() - start_time)
+        assert html == creole2html(markup)
+        print_result("render() after a keystroke at the %s" % title, min(durations), before)
+        print("%-45s %i chars" % ("  (parsed again", renderer.reparsed[1] - renderer.reparsed[0]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# coding: utf-8
+
+
+"""
+    macro result cache
+    ~~~~~~~~~~~~~~~~~~
+
+    Emit a page with repeated macro calls (the same code block and status
+    badges) without and with the cache of the pure macro results:
+
+        python -m creole.benchmarks.bench_macro_cache
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole.benchmarks import time_per_call, print_result
+from creole.creole2html.emitter import HtmlEmitter
+from creole.creole2html.parser import CreoleParser
+from creole.shared import example_macros
+
+
+SECTION = """
+== Section %(no)i
+
+Status: <<badge status="ok">>passed<</badge>>, <<badge status="fail">>%(no)i failed<</badge>>
+
+<<code ext=".py">>
+def hello(name):
+    print("Hello %%s!" %% name)
+
+for name in ("foo", "bar"):
+    hello(name)
+<</code>>
+"""
+
+
+def badge(text, status):
+    return '<span class="badge badge-%s">%s</span>' % (status, text)
+badge.pure = True
+
+
+def main():
+    markup = "\n".join([SECTION % {"no": no % 5} for no in range(50)])
+    document = CreoleParser(markup).parse()
+    print("Emit %i KB markup with %i macro calls (pygments: %s):" % (
+        len(markup) / 1024, 150, example_macros.PYGMENTS
+    ))
+
+    def emit(macro_cache=None):
+        macros = {"code": example_macros.code, "badge": badge}
+        return HtmlEmitter(document, macros=macros, macro_cache=macro_cache).emit()
+
+    expected = emit()
+    before = time_per_call(emit, repeat=3)
+    print_result("no macro cache", before)
+    for scope in ("emit", "process"):
+        assert emit(scope) == expected
+        duration = time_per_call(lambda: emit(scope), repeat=3)
+        print_result("macro_cache=\"%s\"" % scope, duration, before)
+
+
+if __name__ == "__main__":
+    main()
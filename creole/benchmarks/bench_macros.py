@@ -0,0 +1,62 @@
+# coding: utf-8
+
+
+"""
+    concurrent macro calls
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Emit a document with macros, that wait for I/O like a database query or
+    a HTTP request, one by one and with HtmlEmitter(macro_workers=...):
+
+        python -m creole.benchmarks.bench_macros
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import time
+
+from creole import creole2html
+from creole.benchmarks import time_per_call, print_result
+from creole.creole2html import macro_runner
+
+
+MACRO_COUNT = 40
+ROUND_TRIP = 0.01 # seconds
+
+
+def fetch(text):
+    """ a macro with one round trip to a server """
+    time.sleep(ROUND_TRIP)
+    return "<em>%s</em>" % text
+
+
+def main():
+    markup = "\n\n".join([
+        "Paragraph %i with <<fetch>>item %i<</fetch>>." % (no, no)
+        for no in range(MACRO_COUNT)
+    ])
+    macros = {"fetch": fetch}
+    print("%i macros with %.0f ms round trip:" % (MACRO_COUNT, ROUND_TRIP * 1000))
+
+    expected = creole2html(markup, macros=macros)
+    before = time_per_call(lambda: creole2html(markup, macros=macros), number=1, repeat=3)
+    print_result("one by one", before)
+
+    if macro_runner.ThreadPoolExecutor is None:
+        print("(no concurrent.futures: the macros are always called one by one)")
+        return
+
+    for workers in (4, 16, MACRO_COUNT):
+        assert creole2html(markup, macros=macros, macro_workers=workers) == expected
+        duration = time_per_call(
+            lambda: creole2html(markup, macros=macros, macro_workers=workers),
+            number=1, repeat=3
+        )
+        print_result("macro_workers=%i" % workers, duration, before)
+
+
+if __name__ == "__main__":
+    main()
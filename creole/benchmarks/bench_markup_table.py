@@ -0,0 +1,118 @@
+# coding: utf-8
+
+
+"""
+    table markup scaling
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Build and render tables with a growing count of rows with the old
+    MarkupTable (preformat the whole table, then pad every row again) and
+    the current one (column widths tracked by add_td()):
+
+        python -m creole.benchmarks.bench_markup_table
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole.benchmarks import time_per_call, print_result
+from creole.shared.markup_table import MarkupTable
+
+
+ROW_COUNTS = (100, 1000, 10000)
+COLUMNS = 6
+
+
+class OldMarkupTable(MarkupTable):
+    """ MarkupTable before the widths are tracked by add_td() """
+    def __init__(self, head_prefix="= ", debug_msg=None):
+        # Store only the raw cells
+        super(OldMarkupTable, self).__init__(head_prefix, auto_width=False, debug_msg=debug_msg)
+
+    def _get_preformat_info(self):
+        cells = []
+        for row in self.rows:
+            line_cells = []
+            for cell in row:
+                cell = cell.strip()
+                if cell != "":
+                    if self.head_prefix and cell.startswith(self.head_prefix):
+                        cell += " " # Headline
+                    else:
+                        cell = " %s " % cell # normal cell
+                line_cells.append(cell)
+            cells.append(line_cells)
+
+        widths = [max(map(len, col)) for col in zip(*cells)]
+        return cells, widths
+
+    def get_table_markup(self):
+        cells, widths = self._get_preformat_info()
+        lines = []
+        for row in cells:
+            cells = [cell.ljust(width) for cell, width in zip(row, widths)]
+            lines.append("|" + "|".join(cells) + "|")
+        return "\n".join(lines)
+
+    def get_rest_table(self):
+        cells, widths = self._get_preformat_info()
+
+        separator_line = "+%s+" % "+".join(["-"*width for width in widths])
+        headline_separator = "+%s+" % "+".join(["="*width for width in widths])
+
+        lines = []
+        for no, row in enumerate(cells):
+            if no == 1 and self.has_header:
+                lines.append(headline_separator)
+            else:
+                lines.append(separator_line)
+            cells = [cell.ljust(width) for cell, width in zip(row, widths)]
+            lines.append("|" + "|".join(cells) + "|")
+
+        lines.append(separator_line)
+        return "\n".join(lines)
+
+
+def get_texts(row_count):
+    return [
+        ["cell %i.%i" % (row, col) + " x" * (row % 7) for col in range(COLUMNS)]
+        for row in range(row_count)
+    ]
+
+
+def build_table(table_class, texts, head_prefix):
+    table = table_class(head_prefix=head_prefix)
+    table.add_tr()
+    for col in range(COLUMNS):
+        table.add_th("head %i" % col)
+    for row in texts:
+        table.add_tr()
+        for text in row:
+            table.add_td(text)
+    return table
+
+
+def main():
+    for title, method, head_prefix in (
+            ("creole markup", "get_table_markup", "= "),
+            ("ReSt markup", "get_rest_table", ""),
+        ):
+        for row_count in ROW_COUNTS:
+            print("\n%s of a table with %i rows:" % (title, row_count))
+            texts = get_texts(row_count)
+
+            def run(table_class):
+                return getattr(build_table(table_class, texts, head_prefix), method)()
+
+            assert run(OldMarkupTable) == run(MarkupTable)
+
+            before = time_per_call(lambda: run(OldMarkupTable), number=1, repeat=7)
+            print_result("old MarkupTable", before)
+            duration = time_per_call(lambda: run(MarkupTable), number=1, repeat=7)
+            print_result("MarkupTable", duration, before)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# coding: utf-8
+
+
+"""
+    streaming creole2html
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Convert a big document with creole2html() and with creole2html_iter()
+    and compare the time until the first html code is available and the
+    peak memory usage (needs tracemalloc, so Python 3.4 or newer).
+
+        python -m creole.benchmarks.bench_stream
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import os
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+from creole import creole2html, creole2html_iter
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.bench_dispatch import README_PATH
+
+
+def first_chunk_time(func):
+    start_time = time.time()
+    next(iter(func()))
+    return time.time() - start_time
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        for html in func():
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    with codecs.open(README_PATH, "r", encoding="utf-8") as f:
+        markup = f.read()
+    lines = "\n\n".join([markup] * 100).splitlines(True)
+    print("creole2html of %r x 100 (%i lines):" % (os.path.basename(README_PATH), len(lines)))
+
+    def complete():
+        return [creole2html("".join(lines))]
+
+    def streamed():
+        return creole2html_iter(lines, toc_lookahead=0)
+
+    before = time_per_call(complete, repeat=3)
+    print_result("creole2html() total", before)
+    after = time_per_call(lambda: "".join(streamed()), repeat=3)
+    print_result("creole2html_iter() total", after, before)
+
+    print("")
+    before = first_chunk_time(complete)
+    print_result("creole2html() first html", before)
+    after = first_chunk_time(streamed)
+    print_result("creole2html_iter() first html", after, before)
+
+    if tracemalloc is None:
+        print("\n(No tracemalloc: peak memory not measured)")
+        return
+
+    print("")
+    for title, func in (("creole2html()", complete), ("creole2html_iter()", streamed)):
+        print("%-45s %9.1f KB peak" % (title, peak_memory(func) / 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# coding: utf-8
+
+
+"""
+    macro argument parsing
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the old string2dict() with shlex.split() with the regular
+    expression tokenizer and the memoized cached_string2dict(), for single
+    arguments and for emitting a macro heavy page:
+
+        python -m creole.benchmarks.bench_string2dict
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import shlex
+
+from creole.benchmarks import time_per_call, print_result
+from creole.creole2html import emitter
+from creole.creole2html.emitter import HtmlEmitter
+from creole.creole2html.parser import CreoleParser
+from creole.py3compat import PY3, TEXT_TYPE
+from creole.shared.utils import KEYWORD_MAP, cached_string2dict, string2dict
+
+
+def old_string2dict(raw_content, encoding="utf-8"):
+    """ string2dict() before the regular expression tokenizer """
+    if not PY3 and isinstance(raw_content, TEXT_TYPE):
+        # shlex.split doesn't work with unicode?!?
+        raw_content = raw_content.encode(encoding)
+
+    parts = shlex.split(raw_content)
+
+    result = {}
+    for part in parts:
+        key, value = part.split("=", 1)
+
+        if value in KEYWORD_MAP:
+            # True False or None
+            value = KEYWORD_MAP[value]
+        else:
+            # A number?
+            try:
+                value = int(value.strip("'\""))
+            except ValueError:
+                pass
+
+        result[key] = value
+
+    return result
+
+
+ARGS = (
+    'ext=".py"',
+    'status="ok" size=2 inline=True',
+    '''title="A 'quoted' title" css=box escaped="say \\"hello\\"" empty=""''',
+)
+
+PARAGRAPH = (
+    'Item %(no)i: <<badge status="ok" size=%(size)i>>passed<</badge>> and'
+    ' <<link target="/page/%(no)i/" title="Page %(no)i" new=False>>page<</link>>'
+)
+
+
+def badge(text, status, size):
+    return '<span class="%s s%i">%s</span>' % (status, size, text)
+
+
+def link(text, target, title, new):
+    return '<a href="%s" title="%s">%s</a>' % (target, title, text)
+
+
+def main():
+    print("Parse the arguments of one macro:")
+    for args in ARGS:
+        assert string2dict(args) == old_string2dict(args)
+        print("\n%s" % args)
+        before = time_per_call(lambda: old_string2dict(args), repeat=3)
+        print_result("shlex.split()", before)
+        duration = time_per_call(lambda: string2dict(args), repeat=3)
+        print_result("string2dict()", duration, before)
+        duration = time_per_call(lambda: cached_string2dict(args), repeat=3)
+        print_result("cached_string2dict()", duration, before)
+
+    markup = "\n\n".join([PARAGRAPH % {"no": no % 20, "size": no % 3} for no in range(200)])
+    document = CreoleParser(markup).parse()
+    macros = {"badge": badge, "link": link}
+    print("\nEmit a page with 400 macros (%i KB):" % (len(markup) / 1024))
+
+    def emit():
+        return HtmlEmitter(document, macros=macros).emit()
+
+    expected = emit()
+    emitter.cached_string2dict = old_string2dict
+    try:
+        assert emit() == expected
+        before = time_per_call(emit, repeat=3)
+    finally:
+        emitter.cached_string2dict = cached_string2dict
+    print_result("shlex.split()", before)
+
+    emitter.cached_string2dict = string2dict
+    try:
+        duration = time_per_call(emit, repeat=3)
+    finally:
+        emitter.cached_string2dict = cached_string2dict
+    print_result("string2dict()", duration, before)
+
+    duration = time_per_call(emit, repeat=3)
+    print_result("cached_string2dict()", duration, before)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# coding: utf-8
+
+
+"""
+    strip_html() throughput
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the old strip_html() (split and rejoin all lines, then a
+    regex substitution with a Python callback for every tag) with the
+    single scan of the current strip_html() on tag heavy html code:
+
+        python -m creole.benchmarks.bench_strip_html
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+from creole import creole2html
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.workloads import synthetic_markup
+from creole.html_parser.config import BLOCK_TAGS
+from creole.html_tools.strip_html import strip_html
+
+
+SIZE = 1024 * 1024
+
+# The regex of the old strip_html()
+old_strip_html_regex = re.compile(
+    r"""
+        \s*
+        <
+            (?P<end>/{0,1})       # end tag e.g.: </end>
+            (?P<tag>[^ >]+)       # tag name
+            .*?
+            (?P<startend>/{0,1})  # closed tag e.g.: <closed />
+        >
+        \s*
+    """,
+    re.VERBOSE | re.MULTILINE | re.UNICODE
+)
+
+
+def old_strip_html(html_code):
+    def strip_tag(match):
+        block = match.group(0)
+        end_tag = match.group("end") in ("/", "/")
+        startend_tag = match.group("startend") in ("/", "/")
+        tag = match.group("tag")
+
+        if tag in BLOCK_TAGS:
+            return block.strip()
+
+        space_start = block.startswith(" ")
+        space_end = block.endswith(" ")
+
+        result = block.strip()
+
+        if end_tag:
+            if space_start or space_end:
+                result += " "
+        elif startend_tag:
+            if space_start:
+                result = " " + result
+            if space_end:
+                result += " "
+        else:
+            if space_start or space_end:
+                result = " " + result
+
+        return result
+
+    data = html_code.strip()
+    clean_data = " ".join([line.strip() for line in data.split("\n")])
+    clean_data = old_strip_html_regex.sub(strip_tag, clean_data)
+    return clean_data
+
+
+def get_html(feature, size):
+    markup = synthetic_markup(feature, 64 * 1024)
+    html = creole2html(markup)
+    return html * (size // len(html) + 1)
+
+
+def get_inline_html(size):
+    html = (
+        "<p>\n  <strong>bold</strong> <em>italic</em> <code>code</code>"
+        " <a href='#'>link</a><br />\n  <span> <i>i</i> <b>b</b> </span>\n</p>\n"
+    )
+    return html * (size // len(html) + 1)
+
+
+def main():
+    documents = (
+        ("tables html", get_html("tables", SIZE)),
+        ("inline formatting html", get_inline_html(SIZE)),
+        ("mixed html", get_html("mixed", SIZE)),
+    )
+    for title, html in documents:
+        size = len(html) / 1024 / 1024
+        tags = html.count("<")
+        print("\n%s (%.1f MB, %i tags):" % (title, size, tags))
+
+        before = time_per_call(lambda: old_strip_html(html), number=1, repeat=7)
+        print_result("old strip_html()", before)
+        print("%45s %9.1f MB/sec" % ("", size / before))
+        duration = time_per_call(lambda: strip_html(html), number=1, repeat=7)
+        print_result("strip_html()", duration, before)
+        print("%45s %9.1f MB/sec" % ("", size / duration))
+
+        assert strip_html(html) == old_strip_html(html)
+
+
+if __name__ == "__main__":
+    main()
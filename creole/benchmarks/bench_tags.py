@@ -0,0 +1,115 @@
+# coding: utf-8
+
+
+"""
+    tag classification in the html parser
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the old tag handling of HtmlParser (tuple scans, a regex for
+    the headlines and a new list of the block tags for every block end
+    tag) with the precomputed tables from creole.html_parser.tags on
+    table heavy html code:
+
+        python -m creole.benchmarks.bench_tags
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+from creole import creole2html
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.workloads import synthetic_markup
+from creole.html_parser.config import BLOCK_TAGS, IGNORE_TAGS
+from creole.html_parser.parser import HtmlParser
+from creole.shared.document_tree import DocNode
+
+
+SIZE = 128 * 1024
+
+headline_tag_re = re.compile(r"h(\d)", re.UNICODE)
+
+
+class OldHtmlParser(HtmlParser):
+    """
+    The tag handling of HtmlParser before the tag classification tables.
+    """
+    def _go_up(self):
+        kinds = list(BLOCK_TAGS) + ["document"]
+        self.cur = self._upto(self.cur, kinds)
+        self.debug_msg("go up to", self.cur)
+
+    def handle_starttag(self, tag, attrs):
+        self.debug_msg("starttag", "%r atts: %s" % (tag, attrs))
+
+        if tag in IGNORE_TAGS:
+            return
+
+        headline = headline_tag_re.match(tag)
+        if headline:
+            self.cur = DocNode(
+                "headline", self.cur, level=int(headline.group(1))
+            )
+            return
+
+        if tag in ("li", "ul", "ol"):
+            if tag in ("ul", "ol"):
+                self._HtmlParser__list_level += 1
+            self.cur = DocNode(
+                tag, self.cur, None, attrs, level=self._HtmlParser__list_level
+            )
+        elif tag in ("img", "br"):
+            DocNode(tag, self.cur, None, attrs)
+        else:
+            self.cur = DocNode(tag, self.cur, None, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in IGNORE_TAGS:
+            return
+
+        self.debug_msg("endtag", "%r" % tag)
+
+        if tag == "br": # handled in starttag
+            return
+
+        self.debug_msg("starttag", "%r" % self.get_starttag_text())
+
+        if tag in ("ul", "ol"):
+            self._HtmlParser__list_level -= 1
+
+        if tag in BLOCK_TAGS or self.cur is None:
+            self._go_up()
+        else:
+            self.cur = self.cur.parent
+
+
+def parse(parser_class, html):
+    parser = parser_class()
+    parser.feed(html)
+    return parser.close()
+
+
+def get_html(feature, size):
+    return creole2html(synthetic_markup(feature, size))
+
+
+def main():
+    documents = (
+        ("tables html", get_html("tables", SIZE)),
+        ("lists html", get_html("lists", SIZE)),
+        ("mixed html", get_html("mixed", SIZE)),
+    )
+    for title, html in documents:
+        print("\n%s (%i KB, %i tags):" % (title, len(html) / 1024, html.count("<")))
+
+        before = time_per_call(lambda: parse(OldHtmlParser, html), number=1, repeat=7)
+        print_result("old tag handling", before)
+        duration = time_per_call(lambda: parse(HtmlParser, html), number=1, repeat=7)
+        print_result("tag classification tables", duration, before)
+
+
+if __name__ == "__main__":
+    main()
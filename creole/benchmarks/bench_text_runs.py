@@ -0,0 +1,58 @@
+# coding: utf-8
+
+
+"""
+    plain text throughput of the creole parser
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare parsing plain paragraphs with the InlineRules.plain_text rule
+    against the old grammar, witch matched every character separately.
+
+        python -m creole.benchmarks.bench_text_runs
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+from creole.benchmarks import time_per_call, print_result
+from creole.creole2html.parser import CreoleParser
+from creole.creole2html.rules import INLINE_RULES, INLINE_FLAGS, InlineRules
+
+
+class CharByCharParser(CreoleParser):
+    """ CreoleParser with the grammar before the plain_text rule """
+    inline_re = re.compile(
+        '|'.join([rule for rule in INLINE_RULES if rule is not InlineRules.plain_text]),
+        INLINE_FLAGS
+    )
+
+
+PARAGRAPH = (
+    "Lorem ipsum dolor sit amet, consectetur adipisici elit, sed eiusmod"
+    " tempor incidunt ut labore et dolore magna aliqua. Ut enim ad minim"
+    " veniam, quis nostrud exercitation - ullamco laboris nisi ut aliquid.\n"
+)
+
+
+def main():
+    print("CreoleParser.parse() throughput for plain paragraphs:")
+    for paragraphs in (10, 100, 1000):
+        markup = "\n".join([PARAGRAPH] * paragraphs)
+        size = len(markup) / 1024
+
+        print("")
+        before = time_per_call(lambda: CharByCharParser(markup).parse(), repeat=3)
+        print_result("%i paragraphs - char by char" % paragraphs, before)
+        print("%45s %9.1f KB/sec" % ("", size / before))
+
+        after = time_per_call(lambda: CreoleParser(markup).parse(), repeat=3)
+        print_result("%i paragraphs - plain text runs" % paragraphs, after, before)
+        print("%45s %9.1f KB/sec" % ("", size / after))
+
+
+if __name__ == "__main__":
+    main()
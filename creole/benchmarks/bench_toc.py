@@ -0,0 +1,125 @@
+# coding: utf-8
+
+
+"""
+    table of content
+    ~~~~~~~~~~~~~~~~
+
+    Emit a large document with a <<toc>>: The old way replaces the
+    placeholder in the complete html code at the end, now the headlines are
+    collected before and the table of content is emitted in place. The peak
+    memory needs tracemalloc (Python 3.4 or newer):
+
+        python -m creole.benchmarks.bench_toc
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+from creole.benchmarks import time_per_call, print_result
+from creole.creole2html.emitter import TOC_PLACEHOLDER, HtmlEmitter, TableOfContent
+from creole.creole2html.parser import CreoleParser
+from creole.py3compat import TEXT_TYPE
+
+
+class OldTableOfContent(TableOfContent):
+    """ The table of content before the headlines were collected before """
+    def nested_headlines2html(self, nested_headlines, level=0):
+        indent = "\t"*level
+        if isinstance(nested_headlines, TEXT_TYPE):
+            return '%s<li><a href="#%s">%s</a></li>\n' % (indent, nested_headlines, nested_headlines)
+        elif isinstance(nested_headlines, list):
+            html = '%s<ul>\n' % indent
+            for elt in nested_headlines:
+                html += self.nested_headlines2html(elt, level + 1)
+            html += '%s</ul>' % indent
+            if level > 0:
+                html += "\n"
+            return html
+
+    def emit(self, document):
+        """Emit the toc where the <<toc>> macro was."""
+        html = self.html()
+        if "<p><<toc>></p>" in document:
+            document = document.replace("<p><<toc>></p>", html, 1)
+        else:
+            document = document.replace(TOC_PLACEHOLDER, html, 1)
+        return document
+
+
+class OldHtmlEmitter(HtmlEmitter):
+    def emit(self):
+        parts = []
+        self.emit_parts(self.root, parts)
+        document = "".join(parts).strip()
+        if self.toc is not None:
+            return self.toc.emit(document)
+        else:
+            return document
+
+
+SECTION = """
+= Chapter %(no)i
+
+Some **text** of the chapter %(no)i with a [[http://example.com/%(no)i|link]].
+
+== Section %(no)i.1
+
+%(text)s
+
+=== Sub section %(no)i.1.1
+
+* one
+* two
+
+== Section %(no)i.2
+
+%(text)s
+"""
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    text = "A line of text in the section. " * 30
+    markup = "<<toc>>\n" + "".join([
+        SECTION % {"no": no, "text": text} for no in range(2000)
+    ])
+    document = CreoleParser(markup).parse()
+    print("Emit %.1f MB markup with 8000 headlines:" % (len(markup) / 1024 / 1024))
+
+    def old():
+        return OldHtmlEmitter(document, macros={"toc": OldTableOfContent()}).emit()
+
+    def new():
+        return HtmlEmitter(document, macros={"toc": TableOfContent()}).emit()
+
+    assert old() == new()
+    before = time_per_call(old, number=1, repeat=5)
+    print_result("replace the <<toc>> at the end", before)
+    duration = time_per_call(new, number=1, repeat=5)
+    print_result("collect the headlines before", duration, before)
+
+    if tracemalloc is not None:
+        print("\nPeak memory:")
+        for title, func in (("replace the <<toc>> at the end", old), ("collect the headlines before", new)):
+            print("%-45s %9.1f MB" % (title, peak_memory(func) / 1024 / 1024))
+
+
+if __name__ == "__main__":
+    main()
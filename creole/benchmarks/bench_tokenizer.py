@@ -0,0 +1,51 @@
+# coding: utf-8
+
+
+"""
+    html tokenizer backends
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the speed of html2creole() with the available html tokenizer
+    backends, see creole.html_parser.tokenizer:
+
+        python -m creole.benchmarks.bench_tokenizer
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole import creole2html, html2creole
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.workloads import synthetic_markup
+from creole.html_parser.tokenizer import TOKENIZERS, available_tokenizers
+
+
+SIZE = 256 * 1024
+
+
+def main():
+    tokenizers = available_tokenizers()
+    missing = sorted(set(TOKENIZERS) - set(tokenizers))
+    if missing:
+        print("Not installed: %s" % ", ".join(missing))
+
+    for feature in ("tables", "mixed"):
+        html = creole2html(synthetic_markup(feature, SIZE))
+        print("\n%s html (%i KB):" % (feature, len(html) / 1024))
+
+        before = None
+        for name in tokenizers:
+            duration = time_per_call(
+                lambda: html2creole(html, tokenizer=name), number=1, repeat=5
+            )
+            print_result("%s tokenizer" % name, duration, before)
+            if before is None:
+                before = duration
+            else:
+                assert html2creole(html, tokenizer=name) == html2creole(html)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# coding: utf-8
+
+
+"""
+    document tree memory usage
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Peak memory (tracemalloc, so Python 3.4 or newer) per MB of input for
+    the document tree of CreoleParser and HtmlParser, with the slotted
+    DocNode and with the DocNode before: a plain class with a children list
+    and an attrs dict in every node.
+
+        python -m creole.benchmarks.bench_tree_memory
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import sys
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+from creole import creole2html, parse_html
+from creole.benchmarks.bench_batch import PAGE
+from creole.creole2html import parser as creole_parser
+from creole.html_parser import parser as html_parser
+from creole.shared.document_tree import DocNode
+
+
+class DictDocNode:
+    """ DocNode before the __slots__ """
+    def __init__(self, kind='', parent=None, content=None, attrs=[], level=None):
+        self.kind = kind
+        self.children = []
+        self.parent = parent
+        if self.parent is not None:
+            self.parent.children.append(self)
+        self.attrs = dict(attrs)
+        self.content = content
+        self.level = level
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    if tracemalloc is None:
+        print("Needs tracemalloc: Python 3.4 or newer")
+        sys.exit(1)
+
+    markup = "\n".join([PAGE % {"no": no} for no in range(1000)])
+    html = creole2html(markup)
+
+    workloads = (
+        ("CreoleParser", creole_parser, markup, lambda: creole_parser.CreoleParser(markup).parse()),
+        ("HtmlParser", html_parser, html, lambda: parse_html(html)),
+    )
+    for title, module, data, func in workloads:
+        mb = len(data.encode("utf-8")) / 1024 / 1024
+        print("%s of %.1f MB input:" % (title, mb))
+        for node_title, node_class in (("dict based DocNode", DictDocNode), ("slotted DocNode", DocNode)):
+            module.DocNode = node_class
+            try:
+                peak = peak_memory(func)
+            finally:
+                module.DocNode = DocNode
+            print("%-45s %9.1f MB peak per MB input" % (node_title, peak / 1024 / 1024 / mb))
+
+
+if __name__ == "__main__":
+    main()
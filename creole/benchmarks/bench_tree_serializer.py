@@ -0,0 +1,62 @@
+# coding: utf-8
+
+
+"""
+    document tree serialization
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare parsing the markup again with loading the serialized document
+    tree (and with pickle, for reference):
+
+        python -m creole.benchmarks.bench_tree_serializer
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import pickle
+
+from creole import creole2html, parse_html
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.workloads import synthetic_markup
+from creole.creole2html.parser import CreoleParser
+from creole.shared.tree_serializer import deserialize_tree, serialize_tree
+
+
+SIZE = 256 * 1024
+
+
+def main():
+    markup = synthetic_markup("mixed", SIZE)
+    html = creole2html(markup)
+
+    for title, source, parse in (
+            ("creole markup", markup, lambda: CreoleParser(markup).parse()),
+            ("html", html, lambda: parse_html(html)),
+        ):
+        document = parse()
+        data = serialize_tree(document)
+        print("\n%s (%i KB, serialized tree: %i KB):" % (
+            title, len(source) / 1024, len(data) / 1024
+        ))
+
+        before = time_per_call(parse, number=1, repeat=7)
+        print_result("parse", before)
+        duration = time_per_call(lambda: deserialize_tree(data), number=1, repeat=7)
+        print_result("deserialize_tree()", duration, before)
+        duration = time_per_call(lambda: serialize_tree(document), number=1, repeat=7)
+        print_result("serialize_tree()", duration)
+
+        try:
+            pickled = pickle.dumps(document, pickle.HIGHEST_PROTOCOL)
+        except Exception as err: # e.g. RuntimeError for deep trees
+            print("%-45s %s" % ("pickle", err))
+        else:
+            duration = time_per_call(lambda: pickle.loads(pickled), number=1, repeat=7)
+            print_result("pickle.loads() (%i KB)" % (len(pickled) / 1024), duration, before)
+
+
+if __name__ == "__main__":
+    main()
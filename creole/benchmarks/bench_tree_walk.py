@@ -0,0 +1,96 @@
+# coding: utf-8
+
+
+"""
+    tree walking in the emitters
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compare the old recursive BaseEmitter.emit_node() with the explicit
+    stack of the current one: the emit speed on normal documents and the
+    deepest nesting, that can be emitted at all:
+
+        python -m creole.benchmarks.bench_tree_walk
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import sys
+
+from creole import creole2html, parse_html
+from creole.benchmarks import time_per_call, print_result
+from creole.benchmarks.workloads import synthetic_markup
+from creole.html2creole.emitter import CreoleEmitter
+from creole.py3compat import TEXT_TYPE
+
+
+SIZE = 128 * 1024
+
+
+class RecursiveCreoleEmitter(CreoleEmitter):
+    """
+    The recursive emit_node() of BaseEmitter before the explicit stack.
+    """
+    def emit_children_list(self, node):
+        self.last = node
+        result = []
+        for child in node.children:
+            content = self.emit_node(child)
+            assert isinstance(content, TEXT_TYPE)
+            result.append(content)
+        return result
+
+    def emit_node(self, node):
+        if node.level:
+            self.debug_msg("emit_node", "%s (level: %i): %r" % (node.kind, node.level, node.content))
+        else:
+            self.debug_msg("emit_node", "%s: %r" % (node.kind, node.content))
+
+        emit_method = getattr(self, "%s_emit" % node.kind, None)
+        if emit_method:
+            content = emit_method(node)
+        else:
+            content = self._unknown_emit(self, node)
+        assert isinstance(content, TEXT_TYPE)
+        self.last = node
+        return content
+
+
+def get_max_depth(emitter_class, limit=2 ** 14):
+    depth = 1
+    while depth <= limit:
+        document_tree = parse_html("<div>" * depth + "text" + "</div>" * depth)
+        try:
+            emitter_class(document_tree).emit()
+        except RuntimeError: # RecursionError
+            return "%i (RecursionError)" % (depth // 2)
+        depth *= 2
+    return ">%i" % limit
+
+
+def main():
+    for feature in ("mixed", "lists", "tables", "nesting"):
+        html = creole2html(synthetic_markup(feature, SIZE))
+        document_tree = parse_html(html)
+        print("\n%s html (%i KB):" % (feature, len(html) / 1024))
+
+        before = time_per_call(
+            lambda: RecursiveCreoleEmitter(document_tree).emit(), number=1, repeat=7
+        )
+        print_result("recursive emit_node()", before)
+        duration = time_per_call(
+            lambda: CreoleEmitter(document_tree).emit(), number=1, repeat=7
+        )
+        print_result("explicit stack emit_node()", duration, before)
+
+        assert CreoleEmitter(document_tree).emit() == RecursiveCreoleEmitter(document_tree).emit()
+
+    print("\nmax. nested <div> depth (recursion limit: %i):" % sys.getrecursionlimit())
+    print("%45s %s" % ("recursive emit_node()", get_max_depth(RecursiveCreoleEmitter)))
+    print("%45s %s" % ("explicit stack emit_node()", get_max_depth(CreoleEmitter)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# coding: utf-8
+
+
+"""
+    benchmark suite
+    ~~~~~~~~~~~~~~~
+
+    Run the workloads of all converters and measure the throughput, the
+    latency percentiles of the single calls and the peak memory (needs
+    tracemalloc, so Python 3.4 or newer). The results can be saved as JSON
+    and compared with the results of a other version:
+
+    >>> results = run_suite(["html2creole"], ["tables"], [1024], min_time=0.01, out=None)
+    >>> metrics = results["results"]["html2creole/tables/1KB"]
+    >>> metrics["latency"]["p50"] <= metrics["latency"]["p99"]
+    True
+    >>> compare_results(results, results)[0].ratio
+    1.0
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import collections
+import json
+import platform
+import sys
+import time
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+from creole import VERSION_STRING
+from creole.benchmarks import format_time
+from creole.benchmarks.workloads import WorkloadError, get_converter, get_workload
+
+
+PERCENTILES = (50, 90, 99)
+
+Comparison = collections.namedtuple(
+    "Comparison", ("name", "baseline", "current", "ratio", "regression")
+)
+
+
+def percentile(values, percent):
+    """
+    Return the percentile of the sorted values, interpolated between the
+    closest ranks.
+
+    >>> percentile([1, 2, 3, 4], 50)
+    2.5
+    >>> percentile([1, 2, 3, 4], 100)
+    4
+    >>> percentile([5], 90)
+    5
+    """
+    position = (len(values) - 1) * percent / 100
+    index = int(position)
+    if index + 1 >= len(values):
+        return values[-1]
+    return values[index] + (values[index + 1] - values[index]) * (position - index)
+
+
+def peak_memory(func, docs, kwargs):
+    """ Return the peak memory in bytes to convert all docs one by one """
+    tracemalloc.start()
+    try:
+        for doc in docs:
+            func(doc, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(workload, min_time=0.5, min_calls=5, max_calls=10000, memory=True):
+    """
+    Convert the documents of the workload one after the other until
+    min_time seconds are over (but at least min_calls times and every
+    document once) and return a dict with the metrics.
+    """
+    func = get_converter(workload.converter)
+    docs, kwargs = workload.docs, workload.kwargs
+    timer = timeit.default_timer
+
+    min_calls = max(min_calls, len(docs))
+    durations = []
+    chars = 0
+    total = 0
+    while (total < min_time or len(durations) < min_calls) and len(durations) < max_calls:
+        doc = docs[len(durations) % len(docs)]
+        start_time = timer()
+        func(doc, **kwargs)
+        duration = timer() - start_time
+        durations.append(duration)
+        total += duration
+        chars += len(doc)
+
+    durations.sort()
+    latency = {"min": durations[0], "max": durations[-1]}
+    for percent in PERCENTILES:
+        latency["p%i" % percent] = percentile(durations, percent)
+
+    if memory and tracemalloc is not None:
+        peak = peak_memory(func, docs, kwargs)
+    else:
+        peak = None
+
+    return {
+        "docs": len(docs),
+        "calls": len(durations),
+        "chars_per_sec": chars / total,
+        "calls_per_sec": len(durations) / total,
+        "latency": latency,
+        "peak_memory": peak,
+    }
+
+
+def format_metrics(name, metrics):
+    if metrics["peak_memory"] is None:
+        memory = "-"
+    else:
+        memory = "%.1f KB" % (metrics["peak_memory"] / 1024)
+    return "%-30s %9.1f KB/s %12s %12s %12s %12s" % (
+        name, metrics["chars_per_sec"] / 1024,
+        format_time(metrics["latency"]["p50"]),
+        format_time(metrics["latency"]["p90"]),
+        format_time(metrics["latency"]["p99"]),
+        memory,
+    )
+
+
+def run_suite(converters, features, sizes, min_time=0.5, memory=True, out=sys.stdout):
+    """
+    Measure all workloads: Every converter with every feature mix and
+    document size (in characters). Return the results dict with some
+    information about the environment. Progress is written to out.
+    """
+    results = {
+        "version": VERSION_STRING,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "results": {},
+        "skipped": {},
+    }
+    if out is not None:
+        out.write("%-30s %15s %12s %12s %12s %12s\n" % (
+            "workload", "throughput", "p50", "p90", "p99", "peak memory"
+        ))
+    for converter in converters:
+        for feature in features:
+            feature_sizes = sizes
+            if feature == "corpus":
+                feature_sizes = sizes[:1] # The size is ignored
+            for size in feature_sizes:
+                try:
+                    workload = get_workload(converter, feature, size)
+                except WorkloadError as err:
+                    name = "%s/%s" % (converter, feature)
+                    results["skipped"][name] = "%s" % err
+                    if out is not None:
+                        out.write("%-30s skipped: %s\n" % (name, err))
+                    break
+
+                metrics = measure(workload, min_time=min_time, memory=memory)
+                results["results"][workload.name] = metrics
+                if out is not None:
+                    out.write(format_metrics(workload.name, metrics) + "\n")
+                    out.flush()
+    return results
+
+
+def save_results(results, filename):
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=4, sort_keys=True)
+
+
+def load_results(filename):
+    with open(filename, "r") as f:
+        return json.load(f)
+
+
+def compare_results(results, baseline, threshold=0.1, key="p50"):
+    """
+    Compare the latency percentile of all workloads in both results.
+    Return a list of Comparison, regression is True if the time is more
+    than threshold (0.1 == 10%) longer than in the baseline.
+    """
+    comparisons = []
+    for name in sorted(results["results"]):
+        if name not in baseline["results"]:
+            continue
+        current = results["results"][name]["latency"][key]
+        before = baseline["results"][name]["latency"][key]
+        ratio = current / before if before else 1.0
+        comparisons.append(Comparison(name, before, current, ratio, ratio > 1 + threshold))
+    return comparisons
+
+
+def print_comparison(comparisons, out=sys.stdout):
+    out.write("%-30s %12s %12s %10s\n" % ("workload", "baseline", "current", "change"))
+    for comparison in comparisons:
+        line = "%-30s %12s %12s %+9.1f%%" % (
+            comparison.name, format_time(comparison.baseline),
+            format_time(comparison.current), (comparison.ratio - 1) * 100
+        )
+        if comparison.regression:
+            line += "  REGRESSION"
+        out.write(line + "\n")
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
@@ -0,0 +1,235 @@
+# coding: utf-8
+
+
+"""
+    benchmark workloads
+    ~~~~~~~~~~~~~~~~~~~
+
+    Synthetic documents for every feature mix, scaled to a given size, and
+    the markup of the cross compare unittests as corpus.
+
+    >>> markup = synthetic_markup("lists", 1024)
+    >>> 1024 <= len(markup) < 2048
+    True
+    >>> workload = get_workload("html2creole", "tables", 1024)
+    >>> workload.name
+    'html2creole/tables/1KB'
+    >>> workload.docs[0].startswith("<table>")
+    True
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import collections
+import unittest
+import warnings
+
+import creole
+from creole import creole2html, html2rest
+from creole.exceptions import DocutilsImportError
+from creole.shared import example_macros
+
+
+CONVERTERS = (
+    "creole2html", "html2creole", "html2rest", "html2textile", "html2jira", "rest2html"
+)
+FEATURES = ("paragraphs", "lists", "tables", "macros", "nesting", "mixed", "corpus")
+
+Workload = collections.namedtuple("Workload", ("name", "converter", "docs", "kwargs"))
+
+
+class WorkloadError(Exception):
+    """ The workload can't be created, e.g. the converter can't handle the markup """
+    pass
+
+
+# The building blocks of the synthetic documents, %(no)i is a counter:
+UNITS = {
+    "paragraphs": (
+        "A paragraph %(no)i with **bold**, //italic//, ##monospace## and a"
+        " [[http://example.org/%(no)i|link %(no)i]].\n"
+        "The paragraph goes on in the next line with more text.\n\n"
+    ),
+    "lists": (
+        "* item %(no)i\n"
+        "** sub item with **bold**\n"
+        "*** sub sub item\n"
+        "* item\n\n"
+        "# number %(no)i\n"
+        "## sub number\n"
+        "# number\n\n"
+    ),
+    "tables": (
+        "|= head %(no)i |= head |= head |\n"
+        "| cell | **bold** | //italic// |\n"
+        "| cell | [[http://example.org|link]] | cell |\n\n"
+    ),
+    "macros": (
+        "<<html>>\n<p>raw html %(no)i</p>\n<</html>>\n\n"
+        "<<pre>>\npre %(no)i\n  text\n<</pre>>\n\n"
+        "Inline <<html>><strong>html</strong><</html>> macro.\n\n"
+    ),
+    "nesting": (
+        "".join(["%s nested item %%(no)i\n" % ("*" * level) for level in range(1, 11)])
+        + "\n**bold //italic **bold //italic// bold** italic// bold**\n\n"
+    ),
+}
+UNITS["mixed"] = "== Section %(no)i\n\n" + "".join([
+    UNITS[feature] for feature in ("paragraphs", "lists", "tables", "macros", "nesting")
+])
+
+
+def get_converter(converter):
+    """ Return the converter function by it's name from CONVERTERS """
+    if converter == "rest2html":
+        try:
+            from creole.rest2html.clean_writer import rest2html
+        except DocutilsImportError as err:
+            raise WorkloadError(err)
+        return rest2html
+    return getattr(creole, converter)
+
+
+def synthetic_markup(feature, size):
+    """ Return creole markup with at least size characters """
+    unit = UNITS[feature]
+    parts = []
+    length = 0
+    no = 0
+    while length < size:
+        part = unit % {"no": no}
+        parts.append(part)
+        length += len(part)
+        no += 1
+    return "".join(parts)
+
+
+class CorpusRecorder(object):
+    """
+    Collect the markup of the cross compare unittests instead of
+    testing the converters.
+    """
+    corpus = None
+
+    def record(self, kind, text):
+        text = self._prepare_text(text)
+        if text not in self.corpus[kind]:
+            self.corpus[kind].append(text)
+
+    def assert_creole2html(self, raw_creole, raw_html, *args, **kwargs):
+        self.record("creole", raw_creole)
+        self.record("html", raw_html)
+
+    def assert_html2creole(self, raw_creole, raw_html, *args, **kwargs):
+        self.record("html", raw_html)
+
+    def cross_compare_creole(self, creole_string, html_string, *args, **kwargs):
+        self.assert_creole2html(creole_string, html_string)
+
+    def assert_html2textile(self, textile_string, html_string, *args, **kwargs):
+        self.record("html", html_string)
+
+    cross_compare_textile = assert_html2textile
+    assert_html2rest = assert_html2textile
+    assert_html2jira = assert_html2textile
+
+    def assert_rest2html(self, rest_string, html_string, *args, **kwargs):
+        self.record("rest", rest_string)
+
+    def cross_compare_rest(self, rest_string, html_string, *args, **kwargs):
+        self.record("rest", rest_string)
+        self.record("html", html_string)
+
+
+_CORPUS = None
+
+
+def get_test_corpus():
+    """
+    Return a dict with the lists of "creole", "html" and "rest" markup
+    from the unittests.
+    """
+    global _CORPUS
+    if _CORPUS is not None:
+        return _CORPUS
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        from creole.tests.test_cross_compare_all import CrossCompareTests
+        from creole.tests.test_cross_compare_creole import CrossCompareCreoleTests
+        from creole.tests.test_cross_compare_rest import CrossCompareReStTests
+        from creole.tests.test_cross_compare_textile import CrossCompareTextileTests
+
+        corpus = {"creole": [], "html": [], "rest": []}
+        loader = unittest.TestLoader()
+        for test_class in (
+                CrossCompareTests, CrossCompareCreoleTests,
+                CrossCompareReStTests, CrossCompareTextileTests
+            ):
+            recorder_class = type(
+                str("Recording%s" % test_class.__name__),
+                (CorpusRecorder, test_class), {"corpus": corpus}
+            )
+            loader.loadTestsFromTestCase(recorder_class).run(unittest.TestResult())
+
+    _CORPUS = corpus
+    return corpus
+
+
+def get_workload(converter, feature, size):
+    """
+    Return the Workload for the converter with the feature mix (one of
+    FEATURES) and the size of the source in characters. The "corpus"
+    feature has all markup of the unittests that the converter can
+    convert and ignores the size.
+    """
+    if converter not in CONVERTERS:
+        raise ValueError("Unknown converter %r" % converter)
+    if feature not in FEATURES:
+        raise ValueError("Unknown feature %r" % feature)
+
+    func = get_converter(converter)
+    kwargs = {}
+    if converter == "creole2html":
+        kwargs = {"macros": example_macros, "verbose": 0}
+
+    if feature == "corpus":
+        corpus = get_test_corpus()
+        if converter == "creole2html":
+            docs = corpus["creole"]
+        elif converter == "rest2html":
+            docs = corpus["rest"]
+        else:
+            docs = corpus["html"]
+
+        convertible = []
+        for doc in docs:
+            try:
+                func(doc, **kwargs)
+            except Exception:
+                continue
+            convertible.append(doc)
+        return Workload("%s/corpus" % converter, converter, convertible, kwargs)
+
+    markup = synthetic_markup(feature, size)
+    name = "%s/%s/%iKB" % (converter, feature, size // 1024)
+    if converter == "creole2html":
+        return Workload(name, converter, [markup], kwargs)
+
+    html = creole2html(markup, macros=example_macros)
+    if converter != "rest2html":
+        return Workload(name, converter, [html], kwargs)
+
+    try:
+        rest = html2rest(html)
+    except Exception as err:
+        raise WorkloadError("html2rest can't create the ReSt markup: %s" % err)
+    return Workload(name, converter, [rest], kwargs)
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
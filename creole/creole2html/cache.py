@@ -0,0 +1,418 @@
+# coding: utf-8
+
+
+"""
+    render cache for creole2html
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Cache the html code of unchanged markup. The cache key is a hash of the
+    markup and all arguments that change the html code:
+
+    >>> cache = MemoryCache(max_size=1024 * 1024)
+    >>> cached_creole2html("This is **creole //markup//**!", cache)
+    '<p>This is <strong>creole <i>markup</i></strong>!</p>'
+    >>> cached_creole2html("This is **creole //markup//**!", cache)
+    '<p>This is <strong>creole <i>markup</i></strong>!</p>'
+    >>> cache.hits, cache.misses
+    (1, 1)
+
+    Pages that use a macro with a false "cacheable" attribute are never
+    cached, e.g.:
+
+        def now(text):
+            return datetime.datetime.now().isoformat()
+        now.cacheable = False
+
+    A "version" attribute of a macro is part of the cache key. Change it if
+    the macro creates other html code. The macros are identified by module
+    and name, so pages with lambdas, nested functions or callable objects
+    as macros are not cached.
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import collections
+import hashlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import types
+
+from creole import VERSION_STRING
+from creole.creole2html.emitter import HtmlEmitter
+from creole.creole2html.parser import CreoleParser
+
+
+def get_macro(macros, name):
+    """ Return the macro like HtmlEmitter.macro_emit() or None """
+    if macros is None:
+        return None
+    if isinstance(macros, dict):
+        return macros.get(name)
+    return getattr(macros, name, None)
+
+
+def get_macro_id(macro):
+    """
+    Return "module.name" of the macro or None, if the name doesn't
+    identify the macro, e.g. for lambdas, nested functions, bound methods
+    and callable objects.
+
+    >>> get_macro_id(get_macro).endswith("cache.get_macro")
+    True
+    >>> get_macro_id(lambda text: text) is None
+    True
+    """
+    module = sys.modules.get(getattr(macro, "__module__", None))
+    name = getattr(macro, "__qualname__", None) or getattr(macro, "__name__", None)
+    if module is None or name is None:
+        return None
+    if not isinstance(getattr(macro, "__self__", module), (type, types.ModuleType)):
+        return None # a method bound to a instance
+
+    obj = module
+    for part in name.split("."):
+        obj = getattr(obj, part, None)
+    if getattr(obj, "__func__", obj) is not getattr(macro, "__func__", macro):
+        return None
+    return "%s.%s" % (module.__name__, name)
+
+
+def get_macros_key(macros):
+    """
+    Return a string that identifies the macro functions and their versions.
+    The <<toc>> macro is added by the emitter and not part of the key.
+    Macros without a unique name are only marked in the key, pages that
+    use them are not cached, see is_cacheable().
+    """
+    if macros is None:
+        return ""
+    if isinstance(macros, dict):
+        names = macros.keys()
+    else:
+        names = [name for name in dir(macros) if not name.startswith("_")]
+
+    parts = []
+    for name in sorted(names):
+        if name == "toc":
+            continue
+        macro = get_macro(macros, name)
+        if not callable(macro):
+            continue
+        parts.append("%s=%s:%s" % (
+            name, get_macro_id(macro), getattr(macro, "version", None),
+        ))
+    return ",".join(parts)
+
+
+def get_cache_key(markup_string, block_rules=None, blog_line_breaks=True,
+        macros=None, verbose=None, macro_timeout=None):
+    """
+    Return the hex digest for the markup and the arguments
+    that change the html code. macro_workers and macro_cache of
+    creole2html() change only the speed, not the html code.
+    """
+    if block_rules is None:
+        rules_key = ""
+    else:
+        rules_key = "%s.%s:%r:%s" % (
+            block_rules.__class__.__module__, block_rules.__class__.__name__,
+            block_rules.rules, block_rules.re_flags
+        )
+
+    key = "\0".join([
+        VERSION_STRING, rules_key, repr(bool(blog_line_breaks)),
+        get_macros_key(macros), repr(verbose), repr(macro_timeout), markup_string
+    ])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(macros, used_macros):
+    """
+    Return False if one of the used macros has a false "cacheable" attribute
+    or can't be identified by its name (see get_macro_id()).
+    """
+    for name in used_macros:
+        macro = get_macro(macros, name)
+        if macro is None or name == "toc":
+            continue
+        if not getattr(macro, "cacheable", True) or get_macro_id(macro) is None:
+            return False
+    return True
+
+
+def get_size(html):
+    """
+    Return the size of the html code in bytes (UTF-8), the unit of max_size
+    for all cache backends.
+
+    >>> get_size("üñíçödé")
+    13
+    """
+    return len(html.encode("utf-8"))
+
+
+class BaseCache(object):
+    """
+    Base class for the cache backends with the hit/miss counters.
+    max_size is the maximal size of all cached html code in bytes (UTF-8),
+    the least recently used entries are removed if it's exceeded.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def get(self, key):
+        """ Return the cached html code or None """
+        html = self.load(key)
+        if html is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return html
+
+    def set(self, key, html):
+        size = get_size(html)
+        if size <= self.max_size:
+            self.store(key, html, size)
+
+    def load(self, key):
+        raise NotImplementedError
+
+    def store(self, key, html, size):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(BaseCache):
+    """
+    In memory LRU cache.
+    """
+    def __init__(self, max_size):
+        super(MemoryCache, self).__init__(max_size)
+        self.entries = collections.OrderedDict() # key -> (html, size)
+        self.size = 0
+
+    def load(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        self.entries[key] = entry # mark as most recently used
+        return entry[0]
+
+    def store(self, key, html, size):
+        old_entry = self.entries.pop(key, None)
+        if old_entry is not None:
+            self.size -= old_entry[1]
+        self.entries[key] = (html, size)
+        self.size += size
+        while self.size > self.max_size:
+            self.size -= self.entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+
+
+class SqliteCache(BaseCache):
+    """
+    LRU cache in a sqlite database file.
+    The size of all entries is counted on every change, the database is
+    only queried for the total size when the cache is opened.
+
+    A SqliteCache can be shared by threads: It has one connection, that
+    is used by one thread at a time. Processes can't share the file, every
+    process needs its own one: The size of the entries, that another
+    process adds, isn't counted.
+    """
+    def __init__(self, filename, max_size):
+        super(SqliteCache, self).__init__(max_size)
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        # It's only a cache: Don't wait for the disk at every hit
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS render_cache"
+            " (key TEXT PRIMARY KEY, html TEXT, size INTEGER, used REAL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS render_cache_used ON render_cache (used)"
+        )
+        self.connection.commit()
+        self.size = self.connection.execute(
+            "SELECT TOTAL(size) FROM render_cache"
+        ).fetchone()[0]
+
+    def load(self, key):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT html FROM render_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self.connection:
+                self.connection.execute(
+                    "UPDATE render_cache SET used = ? WHERE key = ?", (time.time(), key)
+                )
+            return row[0]
+
+    def store(self, key, html, size):
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT size FROM render_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self.size -= row[0]
+            self.connection.execute(
+                "INSERT OR REPLACE INTO render_cache VALUES (?, ?, ?, ?)",
+                (key, html, size, time.time())
+            )
+            self.size += size
+            if self.size <= self.max_size:
+                return
+
+            old_keys = []
+            for old_key, old_size in self.connection.execute(
+                    "SELECT key, size FROM render_cache ORDER BY used"
+                ):
+                if self.size <= self.max_size:
+                    break
+                old_keys.append((old_key,))
+                self.size -= old_size
+            self.connection.executemany("DELETE FROM render_cache WHERE key = ?", old_keys)
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM render_cache")
+            self.size = 0
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class DirectoryCache(BaseCache):
+    """
+    LRU cache with one file per entry.
+    The modification time of the files is used as last access time: The
+    files are listed only when the cache is opened, after that the order
+    and the size of the entries are kept up to date in memory.
+    """
+    suffix = ".html"
+
+    def __init__(self, path, max_size):
+        super(DirectoryCache, self).__init__(max_size)
+        self.path = path
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        self.entries = collections.OrderedDict() # key -> size, least recently used first
+        self.size = 0
+        for mtime, size, key in sorted(self._entries()):
+            self.entries[key] = size
+            self.size += size
+
+    def _filename(self, key):
+        return os.path.join(self.path, key + self.suffix)
+
+    def load(self, key):
+        filename = self._filename(key)
+        try:
+            with io.open(filename, "r", encoding="utf-8", newline="") as f:
+                html = f.read()
+                size = os.fstat(f.fileno()).st_size
+        except IOError:
+            return None
+        try:
+            self._touch(filename) # mark as most recently used
+        except OSError:
+            pass
+        # The file may be stored by a other process
+        self.size += size - self.entries.pop(key, 0)
+        self.entries[key] = size
+        return html
+
+    def _touch(self, filename):
+        # Note: The file system time stamps of os.utime(filename, None) can
+        # be too coarse (some msec), so multiple files get the same time.
+        now = time.time()
+        os.utime(filename, (now, now))
+
+    def store(self, key, html, size):
+        fd, temp_name = tempfile.mkstemp(dir=self.path)
+        with io.open(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(html)
+        self._touch(temp_name)
+        os.rename(temp_name, self._filename(key))
+        self.size += size - self.entries.pop(key, 0)
+        self.entries[key] = size
+        self.evict()
+
+    def _entries(self):
+        """ List all cache files as (mtime, size, key) """
+        entries = []
+        for filename in os.listdir(self.path):
+            if filename.endswith(self.suffix):
+                try:
+                    stat = os.stat(os.path.join(self.path, filename))
+                except OSError: # removed in the meantime
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, filename[:-len(self.suffix)]))
+        return entries
+
+    def evict(self):
+        while self.size > self.max_size:
+            key, size = self.entries.popitem(last=False)
+            self.size -= size
+            try:
+                os.remove(self._filename(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        for mtime, size, key in self._entries():
+            os.remove(self._filename(key))
+        self.entries.clear()
+        self.size = 0
+
+
+def cached_creole2html(markup_string, cache,
+        block_rules=None, blog_line_breaks=True,
+        macros=None, verbose=None, stderr=None,
+        macro_workers=None, macro_timeout=None, macro_cache=None,
+    ):
+    """
+    creole2html() with the html code from the cache, if the markup and
+    the arguments are the same.
+    """
+    key = get_cache_key(
+        markup_string, block_rules=block_rules, blog_line_breaks=blog_line_breaks,
+        macros=macros, verbose=verbose, macro_timeout=macro_timeout
+    )
+    html = cache.get(key)
+    if html is not None:
+        return html
+
+    document = CreoleParser(
+        markup_string, block_rules=block_rules, blog_line_breaks=blog_line_breaks
+    ).parse()
+    html = HtmlEmitter(
+        document, macros=macros, verbose=verbose, stderr=stderr,
+        macro_workers=macro_workers, macro_timeout=macro_timeout, macro_cache=macro_cache
+    ).emit()
+    if is_cacheable(macros, document.used_macros):
+        cache.set(key, html)
+    else:
+        cache.uncacheable += 1
+    return html
@@ -11,20 +11,67 @@
 
 from __future__ import division, absolute_import, print_function, unicode_literals
 
+from itertools import chain
 from xml.sax.saxutils import escape
 import sys
 import traceback
 
+from creole.creole2html.macro_cache import get_macro_cache, get_macro_key, get_memo_key, \
+    is_pure
+from creole.creole2html.macro_runner import call_macro, is_async_macro, run_coroutines, \
+    run_macros
 from creole.creole2html.parser import CreoleParser
-from creole.py3compat import TEXT_TYPE, repr2
-from creole.shared.utils import string2dict
+from creole.py3compat import TEXT_TYPE, reraise, repr2
+from creole.shared.document_tree import iter_tree
+from creole.shared.utils import cached_string2dict, get_group_handlers, strip_iter, \
+    strip_parts
 
 
+MACRO_KINDS = ("macro_inline", "macro_block")
+
+
+# The output of the first <<toc>> macro, if the headlines are not known yet
+TOC_PLACEHOLDER = "<<toc>>"
+
+
+def has_toc_macro(node):
+    """
+    Is the node or one of its children a <<toc>> macro? A <<toc>> with
+    wrong arguments is only a error message.
+    """
+    for depth, child in chain(((0, node),), iter_tree(node)):
+        if child.kind in MACRO_KINDS and child.macro_name == "toc":
+            try:
+                cached_string2dict(child.macro_args)
+            except ValueError:
+                continue
+            return True
+    return False
+
 
 class TableOfContent(object):
+    """
+    The <<toc>> macro. If all headlines are set before the macro is
+    emitted, the table of content is returned directly, otherwise a
+    placeholder that must be replaced with html() at the end.
+
+    >>> toc = TableOfContent()
+    >>> toc.set_headlines([(1, "one"), (2, "two"), (3, "three"), (1, "four")])
+    >>> print(toc(depth=2).replace("\\t", "  "))
+    <ul>
+      <li><a href="#one">one</a></li>
+      <ul>
+        <li><a href="#two">two</a></li>
+      </ul>
+      <li><a href="#four">four</a></li>
+    </ul>
+    >>> toc()
+    '&lt;&lt;toc&gt;&gt;'
+    """
     def __init__(self):
         self.max_depth = None
         self.headlines = []
+        self.complete = False # are all headlines known?
         self._created = False
         self._current_level = 0
 
@@ -37,14 +84,32 @@ class TableOfContent(object):
         if depth is not None:
             self.max_depth = depth
 
-        return '<<toc>>'
+        if self.complete:
+            return self.html()
+        return TOC_PLACEHOLDER
+
+    @property
+    def created(self):
+        """Was the <<toc>> emitted?"""
+        return self._created
+
+    @created.setter
+    def created(self, value):
+        self._created = value
 
     def add_headline(self, level, content):
         """Add the current header to the toc."""
-        if self.max_depth is None or level <= self.max_depth:
-            self.headlines.append(
-                (level, content)
-            )
+        self.headlines.append(
+            (level, content)
+        )
+
+    def set_headlines(self, headlines):
+        """
+        Set the (level, content) tuples of all headlines of the document,
+        e.g. collected before the document is emitted.
+        """
+        self.headlines = list(headlines)
+        self.complete = True
 
     def flat_list2nest_list(self, flat_list):
         # this func code based on borrowed code from EyDu, Thanks!
@@ -69,31 +134,32 @@ class TableOfContent(object):
 
     def nested_headlines2html(self, nested_headlines, level=0):
         """Convert a python nested list like the one representing the toc to an html equivalent."""
+        parts = []
+        self._nested_headlines2parts(nested_headlines, level, parts)
+        return "".join(parts)
+
+    def _nested_headlines2parts(self, nested_headlines, level, parts):
         indent = "\t"*level
         if isinstance(nested_headlines, TEXT_TYPE):
-            return '%s<li><a href="#%s">%s</a></li>\n' % (indent, nested_headlines, nested_headlines)
+            parts.append('%s<li><a href="#%s">%s</a></li>\n' % (indent, nested_headlines, nested_headlines))
         elif isinstance(nested_headlines, list):
-            html = '%s<ul>\n' % indent
+            parts.append('%s<ul>\n' % indent)
             for elt in nested_headlines:
-                html += self.nested_headlines2html(elt, level + 1)
-            html += '%s</ul>' % indent
+                self._nested_headlines2parts(elt, level + 1, parts)
+            parts.append('%s</ul>' % indent)
             if level > 0:
-                html += "\n"
-            return html
-
-    def emit(self, document):
-        """Emit the toc where the <<toc>> macro was."""
-        nested_headlines = self.flat_list2nest_list(self.headlines)
-        html = self.nested_headlines2html(nested_headlines)
-
-        # FIXME: We should not use <p> here, because it doesn't match
-        #        if no newline was made before <<toc>>
-        if "<p><<toc>></p>" in document:
-            document = document.replace("<p><<toc>></p>", html, 1)
-        else:
-            document = document.replace("<<toc>>", html, 1)
+                parts.append("\n")
 
-        return document
+    def html(self):
+        """Return the html code of the table of content."""
+        max_depth = self.max_depth
+        if max_depth is None:
+            headlines = self.headlines
+        else:
+            headlines = [
+                (level, content) for level, content in self.headlines if level <= max_depth
+            ]
+        return self.nested_headlines2html(self.flat_list2nest_list(headlines))
 
 
 
@@ -102,7 +168,8 @@ class HtmlEmitter(object):
     Generate HTML output for the document
     tree consisting of DocNodes.
     """
-    def __init__(self, root, macros=None, verbose=None, stderr=None):
+    def __init__(self, root, macros=None, verbose=None, stderr=None,
+            macro_workers=None, macro_timeout=None, macro_cache=None):
         self.root = root
 
 
@@ -115,22 +182,15 @@ class HtmlEmitter(object):
         else:
             self.macros = macros
 
+        self._wrappers = get_wrappers(self.__class__)
+        # The *_emit methods by node kind, looked up once per class
+        self._emits = get_group_handlers(self.__class__, "%s_emit")
+
         if not "toc" in root.used_macros:
             # The document has no <<toc>>
             self.toc = None
         else:
-            if isinstance(self.macros, dict):
-                if "toc" in self.macros:
-                    self.toc = self.macros["toc"]
-                else:
-                    self.toc = TableOfContent()
-                    self.macros["toc"] = self.toc
-            else:
-                try:
-                    self.toc = getattr(self.macros, "toc")
-                except AttributeError:
-                    self.toc = TableOfContent()
-                    self.macros.toc = self.toc
+            self.toc = self.get_toc()
 
 
         if verbose is None:
@@ -143,6 +203,37 @@ class HtmlEmitter(object):
         else:
             self.stderr = stderr
 
+        # Call the macros in a pool of threads, see run_macros()
+        self.macro_workers = macro_workers
+        self.macro_timeout = macro_timeout
+        self._macro_outcomes = {}
+
+        # Reuse the results of pure macros, see creole.creole2html.macro_cache
+        if macro_cache is None:
+            self.macro_cache = None
+        else:
+            self.macro_cache = get_macro_cache(macro_cache)
+        # Other emits share the cache, so the macro name is not enough
+        self.shared_macro_cache = macro_cache != "emit"
+        self._macro_keys = {} # macro name -> (macro, get_macro_key() result)
+
+    def get_toc(self):
+        """
+        Return the <<toc>> macro and add a TableOfContent, if not exists.
+        """
+        if isinstance(self.macros, dict):
+            if "toc" in self.macros:
+                return self.macros["toc"]
+            toc = TableOfContent()
+            self.macros["toc"] = toc
+        else:
+            try:
+                return getattr(self.macros, "toc")
+            except AttributeError:
+                toc = TableOfContent()
+                self.macros.toc = toc
+        return toc
+
     def get_text(self, node):
         """Try to emit whatever text is in the node."""
         try:
@@ -168,29 +259,40 @@ class HtmlEmitter(object):
         return '<hr />\n\n'
 
     def paragraph_emit(self, node):
+        if self._is_toc_paragraph(node):
+            html = self.emit_children(node)
+            if self.toc.created:
+                # The table of content is not put into the <p> tag
+                return html + "\n"
+            return '<p>%s</p>\n' % html
         return '<p>%s</p>\n' % self.emit_children(node)
 
-    def _list_emit(self, node, list_type):
+    def _is_toc_paragraph(self, node):
+        """ Is the paragraph only the first <<toc>>? """
+        toc = self.toc
+        if toc is None or toc.created or len(node.children) != 1:
+            return False
+        child = node.children[0]
+        return child.kind in MACRO_KINDS and child.macro_name == "toc"
+
+    def _list_wrap(self, node, list_type):
         if node.parent.kind in ("document",):
             # The first list item
-            formatter = ''
+            start = ''
         else:
-            formatter = '\n'
+            start = '\n'
 
+        indent = "\t" * node.level
+        start += '%s<%s>' % (indent, list_type)
         if list_type == "li":
-            formatter += (
-                '%(i)s<%(t)s>%(c)s</%(t)s>'
-            )
+            end = '</%s>' % list_type
         else:
-            formatter += (
-                '%(i)s<%(t)s>%(c)s\n'
-                '%(i)s</%(t)s>'
-            )
-        return formatter % {
-            "i": "\t" * node.level,
-            "c": self.emit_children(node),
-            "t": list_type,
-        }
+            end = '\n%s</%s>' % (indent, list_type)
+        return start, end
+
+    def _list_emit(self, node, list_type):
+        start, end = self._list_wrap(node, list_type)
+        return start + self.emit_children(node) + end
 
     def bullet_list_emit(self, node):
         return self._list_emit(node, list_type="ul")
@@ -213,6 +315,63 @@ class HtmlEmitter(object):
     def table_head_emit(self, node):
         return '\t<th>%s</th>\n' % self.emit_children(node)
 
+    # *_wrap methods return the html code before and after the children,
+    # used in emit_parts() instead of the *_emit method:
+
+    def document_wrap(self, node):
+        return "", ""
+
+    def paragraph_wrap(self, node):
+        if self._is_toc_paragraph(node):
+            return None # see paragraph_emit()
+        return "<p>", "</p>\n"
+
+    def bullet_list_wrap(self, node):
+        return self._list_wrap(node, list_type="ul")
+
+    def number_list_wrap(self, node):
+        return self._list_wrap(node, list_type="ol")
+
+    def list_item_wrap(self, node):
+        return self._list_wrap(node, list_type="li")
+
+    def table_wrap(self, node):
+        return "<table>\n", "</table>\n"
+
+    def table_row_wrap(self, node):
+        return "<tr>\n", "</tr>\n"
+
+    def table_cell_wrap(self, node):
+        return "\t<td>", "</td>\n"
+
+    def table_head_wrap(self, node):
+        return "\t<th>", "</th>\n"
+
+    def _typeface_wrap(self, node, tag):
+        return "<%s>" % tag, "</%s>" % tag
+
+    def emphasis_wrap(self, node):
+        return self._typeface_wrap(node, tag="i")
+    def strong_wrap(self, node):
+        return self._typeface_wrap(node, tag="strong")
+    def monospace_wrap(self, node):
+        return self._typeface_wrap(node, tag="tt")
+    def superscript_wrap(self, node):
+        return self._typeface_wrap(node, tag="sup")
+    def subscript_wrap(self, node):
+        return self._typeface_wrap(node, tag="sub")
+    def underline_wrap(self, node):
+        return self._typeface_wrap(node, tag="u")
+    def small_wrap(self, node):
+        return self._typeface_wrap(node, tag="small")
+    def delete_wrap(self, node):
+        return self._typeface_wrap(node, tag="del")
+
+    def link_wrap(self, node):
+        if not node.children:
+            return None # emit the link with link_emit()
+        return '<a href="%s">' % self.attr_escape(node.content), "</a>"
+
     #--------------------------------------------------------------------------
 
     def _typeface(self, node, tag):
@@ -246,7 +405,8 @@ class HtmlEmitter(object):
                 node.level, self.html_escape(node.content), node.level
         )
         if self.toc is not None:
-            self.toc.add_headline(node.level, node.content)
+            if not self.toc.complete:
+                self.toc.add_headline(node.level, node.content)
             # add link attribute for toc navigation
             header = '<a name="%s">%s</a>' % (
                 self.html_escape(node.content), header
@@ -275,15 +435,31 @@ class HtmlEmitter(object):
         return '<img src="%s" title="%s" alt="%s" />' % (
             self.attr_escape(target), text, text)
 
-    def macro_emit(self, node):
-        #print(node.debug())
+    def get_macro(self, macro_name):
+        """
+        Return the macro and None or None and the exc_info of the error.
+        """
+        if isinstance(self.macros, dict):
+            try:
+                return self.macros[macro_name], None
+            except KeyError as e:
+                return None, sys.exc_info()
+        else:
+            try:
+                return getattr(self.macros, macro_name), None
+            except AttributeError as e:
+                return None, sys.exc_info()
+
+    def _prepare_macro(self, node):
+        """
+        Return the macro and the keyword arguments for the call or the html
+        code of the error.
+        """
         macro_name = node.macro_name
-        text = node.content
-        macro = None
 
         args = node.macro_args
         try:
-            macro_kwargs = string2dict(args)
+            macro_kwargs = cached_string2dict(args)
         except ValueError as e:
             exc_info = sys.exc_info()
             return self.error(
@@ -293,34 +469,129 @@ class HtmlEmitter(object):
                 exc_info
             )
 
-        macro_kwargs["text"] = text
-
-        exc_info = None
-        if isinstance(self.macros, dict):
-            try:
-                macro = self.macros[macro_name]
-            except KeyError as e:
-                exc_info = sys.exc_info()
-        else:
-            try:
-                macro = getattr(self.macros, macro_name)
-            except AttributeError as e:
-                exc_info = sys.exc_info()
+        macro_kwargs["text"] = node.content
 
+        macro, exc_info = self.get_macro(macro_name)
         if macro == None:
             return self.error(
                 "Macro '%s' doesn't exist" % macro_name,
                 exc_info
             )
+        return macro, macro_kwargs
+
+    def _lookup_memo(self, node):
+        """
+        Return the cache key and the cached result of a pure macro.
+        The key is None, if the result can't be cached.
+        """
+        if self.macro_cache is None:
+            return None, None
+        macro, exc_info = self.get_macro(node.macro_name)
+        if macro is None or not is_pure(macro):
+            return None, None
+        cached = self._macro_keys.get(node.macro_name)
+        if cached is None or cached[0] is not macro:
+            cached = self._macro_keys[node.macro_name] = (
+                macro, get_macro_key(node.macro_name, macro, self.shared_macro_cache)
+            )
+        macro_key = cached[1]
+        if macro_key is None:
+            return None, None
+        memo_key = get_memo_key(macro_key, macro, node.macro_args, node.content)
+        return memo_key, self.macro_cache.get(memo_key)
+
+    def run_macros(self, nodes):
+        """
+        Call the macros in the nodes and all their children concurrently,
+        see creole.creole2html.macro_runner: All macros in a pool of
+        macro_workers threads or without macro_workers only the async macros
+        together in one event loop. macro_emit() uses the results. The <<toc>>
+        and macros with a false "parallel" attribute are called by
+        macro_emit() as usual.
+        """
+        names = None # all macro names to call
+        if not self.macro_workers:
+            names = set([
+                macro_name for macro_name in self.root.used_macros
+                if is_async_macro(self.get_macro(macro_name)[0])
+            ])
+            if not names:
+                return
+
+        calls = []
+        memo_keys = {} # node -> memo key of the called pure macros
+        first_calls = {} # memo key -> the first node with this call
+        duplicates = []
+        for node in nodes:
+            for depth, child in chain(((0, node),), iter_tree(node)):
+                if child.kind not in MACRO_KINDS or child.macro_name == "toc":
+                    continue
+                if names is not None and child.macro_name not in names:
+                    continue
+
+                memo_key, result = self._lookup_memo(child)
+                if result is not None:
+                    self._macro_outcomes[child] = (None, result, None, None)
+                    continue
+                if memo_key is not None:
+                    if memo_key in first_calls:
+                        # The same pure macro call is done only once
+                        duplicates.append((child, first_calls[memo_key]))
+                        continue
+                    first_calls[memo_key] = child
+
+                prepared = self._prepare_macro(child)
+                if isinstance(prepared, tuple) and getattr(prepared[0], "parallel", True):
+                    macro, macro_kwargs = prepared
+                    calls.append((child, macro, macro_kwargs))
+                    memo_keys[child] = memo_key
+
+        if calls:
+            if self.macro_workers:
+                outcomes = run_macros(calls, self.macro_workers, self.macro_timeout)
+            else:
+                outcomes = run_coroutines(calls, self.macro_timeout)
+            for node, macro, macro_kwargs in calls:
+                self._macro_outcomes[node] = (macro,) + outcomes[node] + (memo_keys[node],)
+            for node, first_node in duplicates:
+                if first_node in self._macro_outcomes:
+                    macro, result, exc_info, memo_key = self._macro_outcomes[first_node]
+                    self._macro_outcomes[node] = (macro, result, exc_info, None)
+
+    def _uses_macros(self):
+        """ Has the document other macros than <<toc>>? """
+        used_macros = getattr(self.root, "used_macros", None)
+        return bool(used_macros) and used_macros != set(["toc"])
 
+    def macro_emit(self, node):
+        #print(node.debug())
         try:
-            result = macro(**macro_kwargs)
-        except TypeError as err:
+            macro, result, exc_info, memo_key = self._macro_outcomes.pop(node)
+        except KeyError:
+            memo_key, result = self._lookup_memo(node)
+            if result is not None:
+                # cache hit: nothing to store
+                macro = exc_info = memo_key = None
+            else:
+                prepared = self._prepare_macro(node)
+                if not isinstance(prepared, tuple):
+                    return prepared # the error
+                macro, macro_kwargs = prepared
+                result, exc_info = call_macro(macro, macro_kwargs, self.macro_timeout)
+
+        macro_name = node.macro_name
+        if exc_info is not None:
+            err = exc_info[1]
+            if not isinstance(err, TypeError):
+                return self.error(
+                    "Macro '%s' error: %s" % (macro_name, err),
+                    exc_info=exc_info
+                )
+
             msg = "Macro '%s' error: %s" % (macro_name, err)
-            exc_info = sys.exc_info()
             if self.verbose > 1:
                 if self.verbose > 2:
-                    raise
+                    reraise(*exc_info)
 
                 # Inject more information about the macro in traceback
                 etype, evalue, etb = exc_info
@@ -339,11 +610,6 @@ class HtmlEmitter(object):
                     exc_info = etype, evalue, etb
 
             return self.error(msg, exc_info)
-        except Exception as err:
-            return self.error(
-                "Macro '%s' error: %s" % (macro_name, err),
-                exc_info=sys.exc_info()
-            )
 
         if not isinstance(result, TEXT_TYPE):
             msg = "Macro '%s' doesn't return a unicode string!" % macro_name
@@ -351,6 +617,9 @@ class HtmlEmitter(object):
                 msg += " - returns: %r, type %r" % (result, type(result))
             return self.error(msg)
 
+        if memo_key is not None:
+            self.macro_cache.set(memo_key, result)
+
         if node.kind == "macro_block":
             result += "\n"
 
@@ -383,21 +652,143 @@ class HtmlEmitter(object):
 
     def emit_children(self, node):
         """Emit all the children of a node."""
-        return ''.join([self.emit_node(child) for child in node.children])
+        parts = []
+        self._emit_parts(node.children, parts)
+        return "".join(parts)
 
     def emit_node(self, node):
         """Emit a single node."""
         #print("%s_emit: %r" % (node.kind, node.content))
-        emit = getattr(self, '%s_emit' % node.kind, self.default_emit)
-        return emit(node)
+        emit = self._emits[node.kind]
+        if emit is None:
+            return self.default_emit(node)
+        return emit(self, node)
+
+    def emit_parts(self, node, parts):
+        """
+        Emit a single node and append the html code to the list of parts.
+        Nodes with a *_wrap method are not emitted into one string, so
+        the html code of deep nested nodes is not copied at every level.
+        """
+        self._emit_parts((node,), parts)
+
+    def _emit_parts(self, nodes, parts):
+        # Walk into the nodes with a *_wrap method with a explicit stack,
+        # so deep nested documents need no deep Python stack.
+        wrappers = self._wrappers
+        emit_node = self.emit_node
+        stack = []
+        nodes = iter(nodes)
+        while True:
+            for node in nodes:
+                wrap = wrappers.get(node.kind)
+                if wrap is not None:
+                    wrapped = wrap(self, node)
+                    if wrapped is not None:
+                        start, end = wrapped
+                        parts.append(start)
+                        stack.append((end, nodes))
+                        nodes = iter(node.children)
+                        break
+                parts.append(emit_node(node))
+            else:
+                if not stack:
+                    return
+                end, nodes = stack.pop()
+                parts.append(end)
+
+    def collect_headlines(self):
+        """
+        Set all headlines of the document in the table of content, before
+        the document is emitted. So the <<toc>> is emitted in place.
+        """
+        self.toc.set_headlines([
+            (node.level, node.content)
+            for depth, node in iter_tree(self.root) if node.kind == "header"
+        ])
 
     def emit(self):
         """Emit the document represented by self.root DOM tree."""
-        document = self.emit_node(self.root).strip()
+        if self._uses_macros():
+            self.run_macros((self.root,))
         if self.toc is not None:
-            return self.toc.emit(document)
+            self.collect_headlines()
+        parts = []
+        self.emit_parts(self.root, parts)
+        strip_parts(parts)
+        return "".join(parts)
+
+    def iter_emit(self, blocks, headlines=None, toc_lookahead=100):
+        """
+        Emit the lists of top level nodes from CreoleParser.parse_iter()
+        and yield the html code block by block. All parts joined together
+        are the same as self.emit() would return for the complete tree.
+
+        A <<toc>> needs all headlines of the document:
+        If the headlines are given as (level, content) tuples (e.g.
+        collected in a first pass), the table of content is emitted
+        directly. Otherwise the top level nodes are held back until a <<toc>>
+        was found, but only up to toc_lookahead nodes. The top level node
+        with the <<toc>> is emitted at the end of the document, when all
+        headlines are known, the html code after it is buffered until then.
+        """
+        return strip_iter(self._iter_emit(blocks, headlines, toc_lookahead))
+
+    def _iter_emit(self, blocks, headlines, toc_lookahead):
+        if headlines is not None:
+            self.toc = self.get_toc()
+            self.toc.set_headlines(headlines)
+            pending = None
         else:
-            return document
+            pending = [] # top level nodes to look for a <<toc>>
+        toc_node = None # the top level node with the <<toc>>, emitted at the end
+        buffered = None # html code after the <<toc>>, waits for all headlines
+
+        for nodes in blocks:
+            if pending is not None:
+                pending += nodes
+                if self.toc is None and "toc" in self.root.used_macros:
+                    self.toc = self.get_toc()
+                elif len(pending) < toc_lookahead:
+                    continue
+                nodes, pending = pending, None
+
+            if self._uses_macros():
+                self.run_macros(nodes)
+            parts = []
+            for node in nodes:
+                if toc_node is None and self.toc is not None and not self.toc.complete \
+                        and not self.toc.created and has_toc_macro(node):
+                    # Emit the html code before the <<toc>> and hold back the rest
+                    yield "".join(parts)
+                    parts = []
+                    toc_node = node
+                    buffered = []
+                    self.toc.created = True # a other <<toc>> is no table of content
+                    continue
+                self.emit_parts(node, parts)
+            html = "".join(parts)
+            if buffered is not None:
+                buffered.append(html)
+            else:
+                yield html
+
+        if pending:
+            if self._uses_macros():
+                self.run_macros(pending)
+            parts = []
+            for node in pending:
+                self.emit_parts(node, parts)
+            yield "".join(parts)
+        if toc_node is not None:
+            # All headlines are known: The <<toc>> is emitted in place
+            self.toc.complete = True
+            self.toc.created = False
+            parts = []
+            self.emit_parts(toc_node, parts)
+            yield "".join(parts)
+            for html in buffered:
+                yield html
 
     def error(self, text, exc_info=None):
         """
@@ -415,6 +806,61 @@ class HtmlEmitter(object):
             return ""
 
 
+# The *_emit methods that HtmlEmitter.emit_parts() replace with the *_wrap
+# methods and the other methods they use. A subclass that overwrites one of
+# them gets the *_emit method, see get_wrappers()
+WRAPPED_EMITS = {
+    "document": (),
+    "paragraph": (),
+    "bullet_list": ("_list_emit",),
+    "number_list": ("_list_emit",),
+    "list_item": ("_list_emit",),
+    "table": (),
+    "table_row": (),
+    "table_cell": (),
+    "table_head": (),
+    "emphasis": ("_typeface",),
+    "strong": ("_typeface",),
+    "monospace": ("_typeface",),
+    "superscript": ("_typeface",),
+    "subscript": ("_typeface",),
+    "underline": ("_typeface",),
+    "small": ("_typeface",),
+    "delete": ("_typeface",),
+    "link": (),
+}
+_WRAPPERS_CACHE = {}
+
+
+def get_wrappers(emitter_class):
+    """
+    Return a dict with the usable *_wrap methods of the HtmlEmitter
+    (sub-)class, keyed by the node kind.
+
+    >>> sorted(get_wrappers(HtmlEmitter))[:3]
+    ['bullet_list', 'delete', 'document']
+    >>> class MyEmitter(HtmlEmitter):
+    ...     def strong_emit(self, node):
+    ...         return '<b>%s</b>' % self.emit_children(node)
+    >>> "strong" in get_wrappers(MyEmitter)
+    False
+    """
+    try:
+        return _WRAPPERS_CACHE[emitter_class]
+    except KeyError:
+        pass
+
+    def unchanged(name):
+        return getattr(emitter_class, name) == getattr(HtmlEmitter, name)
+
+    wrappers = {}
+    if unchanged("emit_node") and unchanged("emit_children"):
+        for kind, used in WRAPPED_EMITS.items():
+            if unchanged("%s_emit" % kind) and all([unchanged(name) for name in used]):
+                wrappers[kind] = getattr(emitter_class, "%s_wrap" % kind)
+    return _WRAPPERS_CACHE.setdefault(emitter_class, wrappers)
+
+
 if __name__ == "__main__":
     txt = """Local test
 <<toc>>
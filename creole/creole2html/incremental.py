@@ -0,0 +1,446 @@
+# coding: utf-8
+
+
+"""
+    incremental creole2html
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Render a page again after a edit, but parse and emit only the changed
+    blocks. The html code is the same as from creole2html():
+
+    >>> renderer = IncrementalRenderer()
+    >>> page = "\\n\\n".join(["one", "two", "three", "**four**", "five", "six"])
+    >>> renderer.render(page)
+    '<p>one</p>\\n\\n<p>two</p>\\n\\n<p>three</p>\\n\\n<p><strong>four</strong></p>\\n\\n<p>five</p>\\n\\n<p>six</p>'
+    >>> renderer.render(page.replace("four", "4"))
+    '<p>one</p>\\n\\n<p>two</p>\\n\\n<p>three</p>\\n\\n<p><strong>4</strong></p>\\n\\n<p>five</p>\\n\\n<p>six</p>'
+
+    Only the text around the change was parsed again:
+
+    >>> renderer.reparsed
+    (9, 29)
+
+    The document is kept as a list of RenderedBlock: The top level nodes
+    between two checkpoints of CreoleParser._iter_parse() with their html
+    code. A block is parsed again, if it depends on the changed text. The
+    parsing stops at the first checkpoint after the change, that is the
+    same as before.
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+from creole.creole2html.emitter import HtmlEmitter, TableOfContent, has_toc_macro
+from creole.creole2html.parser import CreoleParser
+from creole.py3compat import TEXT_TYPE
+from creole.shared.document_tree import DocNode
+from creole.shared.utils import strip_parts
+
+
+# The checkpoint at the start of the document, see CreoleParser._iter_parse()
+START_CHECKPOINT = (0, 0, 0, 0, None, False)
+
+# A empty line before a non empty line: The end of a part from split_blocks()
+part_end_re = re.compile(r"^[^\S\n]*\n(?=[^\S\n]*\S)", re.MULTILINE | re.UNICODE)
+non_space_re = re.compile(r"\S", re.UNICODE)
+
+
+def iter_parts(source, start=0):
+    """
+    Yield the same parts as split_blocks(source[start:]), if start is the
+    start of a part. The source must have \\n line endings.
+
+    >>> list(iter_parts("one\\ntwo\\n\\n  \\nthree\\n{{{\\n\\n}}}\\nfour"))
+    ['one\\ntwo\\n\\n  \\n', 'three\\n{{{\\n\\n', '}}}\\nfour']
+    >>> list(iter_parts("one\\n\\ntwo\\n\\nthree", start=5))
+    ['two\\n\\n', 'three']
+    """
+    for match in part_end_re.finditer(source, start):
+        end = match.end()
+        yield source[start:end]
+        start = end
+    if start < len(source):
+        yield source[start:]
+
+
+def get_common_prefix(old, new):
+    """
+    Return the length of the common start of both strings.
+
+    >>> get_common_prefix("one two", "one three")
+    5
+    """
+    start, end = 0, min(len(old), len(new))
+    while start < end:
+        middle = (start + end + 1) // 2
+        if old[start:middle] == new[start:middle]:
+            start = middle
+        else:
+            end = middle - 1
+    return start
+
+
+def get_common_suffix(old, new, max_length):
+    """
+    Return the length of the common end of both strings, but not more
+    than max_length.
+
+    >>> get_common_suffix("one two", "three two", max_length=10)
+    5
+    >>> get_common_suffix("one two", "three two", max_length=2)
+    2
+    """
+    start, end = 0, min(len(old), len(new), max_length)
+    while start < end:
+        middle = (start + end + 1) // 2
+        if old[len(old) - middle:len(old) - start] == new[len(new) - middle:len(new) - start]:
+            start = middle
+        else:
+            end = middle - 1
+    return start
+
+
+def shift_checkpoint(checkpoint, delta):
+    text_start, parts_start, parts_end, pos, last_end, last_empty = checkpoint
+    if last_end is not None:
+        last_end += delta
+    return (
+        text_start + delta, parts_start + delta, parts_end + delta, pos + delta,
+        last_end, last_empty
+    )
+
+
+class TocRecorder(TableOfContent):
+    """
+    The <<toc>> macro of the IncrementalRenderer. It records the <<toc>>
+    calls and all headlines of a block. The TableOfContent of the document
+    is created from the records of all blocks.
+    """
+    def __init__(self):
+        super(TocRecorder, self).__init__()
+        self.records = []
+
+    def __call__(self, depth=None, **kwargs):
+        self.records.append((None, depth))
+        return super(TocRecorder, self).__call__(depth=depth, **kwargs)
+
+    def add_headline(self, level, content):
+        self.records.append((level, content))
+
+
+class TocMacros(object):
+    """
+    The macros (a dict or a object with the macro functions) and the
+    TocRecorder as "toc" macro.
+    """
+    def __init__(self, macros, toc):
+        self.macros = macros
+        self.toc = toc
+
+    def __getattr__(self, name):
+        if isinstance(self.macros, dict):
+            try:
+                return self.macros[name]
+            except KeyError:
+                raise AttributeError(name)
+        return getattr(self.macros, name)
+
+
+class RenderedBlock(object):
+    """
+    Top level nodes from the checkpoint to the next checkpoint.
+    The block with the table of content keeps the html code before and
+    after the top level node with the <<toc>>.
+    """
+    __slots__ = (
+        "checkpoint", "nodes", "used_macros", "html", "toc_records", "toc_before",
+        "toc_node", "head", "tail",
+    )
+
+    def __init__(self, checkpoint):
+        self.checkpoint = checkpoint
+        self.nodes = []
+        self.used_macros = set()
+        self.html = None
+        self.toc_records = []
+        self.toc_before = False # Was the <<toc>> created in a block before?
+        self.toc_node = None
+        self.head = self.tail = None
+
+    def headlines(self):
+        return [record for record in self.toc_records if record[0] is not None]
+
+    def has_toc(self):
+        for level, content in self.toc_records:
+            if level is None:
+                return True
+        return False
+
+
+class IncrementalRenderer(object):
+    """
+    Render the changed versions of one page with render(). The arguments
+    are the same as for creole2html().
+
+    After render() the attribute reparsed is the (start, end) range in the
+    markup that was parsed again.
+
+    The joined html code of the blocks before and after the change is
+    cached, so the next edit at the same place joins only the new blocks.
+    """
+    def __init__(self, block_rules=None, blog_line_breaks=True,
+            macros=None, verbose=None, stderr=None):
+        self.block_rules = block_rules
+        self.blog_line_breaks = blog_line_breaks
+
+        root = DocNode("document")
+        root.used_macros = set()
+        self.emitter = HtmlEmitter(root, macros=macros, verbose=verbose, stderr=stderr)
+        self.toc_recorder = TocRecorder()
+        self.emitter.macros = TocMacros(self.emitter.macros, self.toc_recorder)
+
+        self.source = ""
+        self.blocks = []
+        self.html = ""
+        self.uses_toc = False
+        self.toc_blocks = 0 # Number of blocks with a <<toc>> macro
+        self.toc_block = None # The block with the table of content
+        self.reparsed = (0, 0)
+
+        # (block index, html) of the blocks before the change and
+        # (first block, html) of the blocks after the change
+        self._prefix = self._suffix = None
+
+    def render(self, markup_string):
+        """ convert the creole markup into html code """
+        assert isinstance(markup_string, TEXT_TYPE), "given markup_string must be unicode!"
+        source = markup_string.replace("\r\n", "\n").replace("\r", "\n")
+        old_source, old_blocks = self.source, self.blocks
+
+        prefix = get_common_prefix(old_source, source)
+        if prefix == len(old_source) == len(source) and old_blocks:
+            self.reparsed = (0, 0)
+            return self.html
+        suffix = get_common_suffix(
+            old_source, source, max_length=min(len(old_source), len(source)) - prefix
+        )
+        delta = len(source) - len(old_source)
+        edit_end = len(source) - suffix
+
+        # Keep the blocks before the first block that depends on the change:
+        # The checkpoint depends on the text until the first non space
+        # character after parts_end, see CreoleParser._iter_parse()
+        keep, low, high = 0, 1, len(old_blocks) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            match = non_space_re.search(old_source, old_blocks[middle].checkpoint[2])
+            if match is not None and match.start() < prefix:
+                keep, low = middle, middle + 1
+            else:
+                high = middle - 1
+        if keep > 0:
+            checkpoint = old_blocks[keep].checkpoint
+        else:
+            checkpoint = START_CHECKPOINT
+
+        new_blocks, rest = self._parse(source, checkpoint, old_blocks, keep, edit_end, delta)
+        if delta:
+            for block in rest:
+                block.checkpoint = shift_checkpoint(block.checkpoint, delta)
+
+        replaced = old_blocks[keep:len(old_blocks) - len(rest)]
+        for block in replaced:
+            if "toc" in block.used_macros:
+                self.toc_blocks -= 1
+        for block in new_blocks:
+            if "toc" in block.used_macros:
+                self.toc_blocks += 1
+
+        self.source = source
+        self.blocks = old_blocks[:keep] + new_blocks + rest
+        self.html = self._emit(keep, keep + len(new_blocks), replaced)
+        return self.html
+
+    def _parse(self, source, checkpoint, old_blocks, old_index, edit_end, delta):
+        """
+        Parse from the checkpoint until the first checkpoint after the
+        change that is in old_blocks. Return the new blocks and the old
+        blocks after them.
+        """
+        text_start, parts_start, parts_end, pos, last_end, last_empty = checkpoint
+        parser = CreoleParser(
+            "", block_rules=self.block_rules, blog_line_breaks=self.blog_line_breaks
+        )
+        block = RenderedBlock(checkpoint)
+        parser.root.used_macros = block.used_macros
+
+        new_blocks = []
+        end = len(source)
+        for nodes, checkpoint in parser._iter_parse(
+                iter_parts(source, parts_start), text=source[text_start:parts_start],
+                offset=text_start, pos=pos, last_end=last_end, last_empty=last_empty
+            ):
+            block.nodes += nodes
+            if checkpoint is None:
+                continue
+            if not block.nodes:
+                block.checkpoint = checkpoint
+                continue
+            new_blocks.append(block)
+
+            if checkpoint[0] >= edit_end:
+                # The rest of the text is unchanged: Stop at a old block
+                # with the same parser state, if it's text is unchanged,
+                # too (the start of the kept text doesn't matter).
+                old_checkpoint = shift_checkpoint(checkpoint, -delta)
+                while old_index < len(old_blocks) and \
+                        old_blocks[old_index].checkpoint[3] < old_checkpoint[3]:
+                    old_index += 1
+                if old_index < len(old_blocks) and \
+                        old_blocks[old_index].checkpoint[1:] == old_checkpoint[1:] and \
+                        old_blocks[old_index].checkpoint[0] >= edit_end - delta:
+                    end = checkpoint[3]
+                    self.reparsed = (pos, end)
+                    return new_blocks, old_blocks[old_index:]
+
+            block = RenderedBlock(checkpoint)
+            parser.root.used_macros = block.used_macros
+
+        if block.nodes:
+            new_blocks.append(block)
+        self.reparsed = (pos, end)
+        return new_blocks, []
+
+    def _emit_block(self, block, toc_before):
+        toc = self.toc_recorder
+        toc.records = []
+        toc.created = toc_before
+        block.toc_node = block.head = block.tail = None
+        parts = []
+        for node in block.nodes:
+            if self.emitter.toc is not None and not toc.created and has_toc_macro(node):
+                # The node is emitted by _emit_toc(), when all headlines are known
+                toc.records.append((None, None))
+                toc.created = True
+                block.toc_node = node
+                block.head = "".join(parts)
+                parts = []
+                continue
+            self.emitter.emit_parts(node, parts)
+        if block.toc_node is None:
+            block.html = "".join(parts)
+        else:
+            block.html = None
+            block.tail = "".join(parts)
+        block.toc_records = toc.records
+        block.toc_before = toc_before
+
+    def _emit_toc(self, block, headlines):
+        """
+        Emit the node with the <<toc>> in place with all headlines of the
+        document.
+        """
+        toc = TableOfContent()
+        toc.set_headlines(headlines)
+        self.emitter.toc = self.emitter.macros.toc = toc
+        try:
+            parts = [block.head]
+            self.emitter.emit_parts(block.toc_node, parts)
+            parts.append(block.tail)
+        finally:
+            self.emitter.toc = self.emitter.macros.toc = self.toc_recorder
+        block.html = "".join(parts)
+
+    def _emit(self, start, end, replaced):
+        """
+        Emit the new blocks self.blocks[start:end] and the blocks that
+        depend on the changed <<toc>> usage. Return the html code of the
+        document.
+        """
+        blocks = self.blocks
+        new_blocks = blocks[start:end]
+        emit_all = False
+
+        uses_toc = self.toc_blocks > 0
+        if uses_toc != self.uses_toc:
+            # The headlines are different with a table of content
+            self.uses_toc = uses_toc
+            self.emitter.toc = self.toc_recorder if uses_toc else None
+            self.toc_block = None
+            emit_all = True
+
+        if not uses_toc:
+            for block in (blocks if emit_all else new_blocks):
+                self._emit_block(block, toc_before=False)
+            return self._join(start, end, reset=emit_all)
+
+        toc_block = self.toc_block
+        if emit_all or any([block.has_toc() for block in replaced]) \
+                or any([has_toc_macro(node) for block in new_blocks for node in block.nodes]):
+            # A <<toc>> was added or removed: A other <<toc>> is maybe the
+            # table of content now.
+            toc_block = None
+            for index, block in enumerate(blocks):
+                toc_before = toc_block is not None
+                if start <= index < end or emit_all:
+                    self._emit_block(block, toc_before)
+                elif block.toc_before != toc_before and block.has_toc():
+                    self._emit_block(block, toc_before)
+                    emit_all = True
+                if toc_block is None and block.has_toc():
+                    toc_block = block
+            self.toc_block = toc_block
+        else:
+            toc_before = toc_block is not None and bool(new_blocks) and \
+                toc_block.checkpoint[3] < new_blocks[0].checkpoint[3]
+            for block in new_blocks:
+                self._emit_block(block, toc_before)
+
+        if toc_block is not None:
+            if toc_block.html is None:
+                changed = True # emitted again
+            else:
+                # The table of content changes only with the headlines
+                changed = [record for block in replaced for record in block.headlines()] \
+                    != [record for block in new_blocks for record in block.headlines()]
+            if changed:
+                self._emit_toc(toc_block, [
+                    record for block in blocks for record in block.headlines()
+                ])
+                if toc_block not in new_blocks and not emit_all:
+                    # The html code of the block is cached before or after the change
+                    if start < len(blocks) and toc_block.checkpoint[3] > blocks[start].checkpoint[3]:
+                        self._suffix = None
+                    else:
+                        self._prefix = None
+
+        return self._join(start, end, reset=emit_all)
+
+    def _join(self, start, end, reset=False):
+        """
+        Return the html code of the document: The blocks before start and
+        after end are joined only if they are not the same as the last time.
+        """
+        blocks = self.blocks
+        if reset:
+            self._prefix = self._suffix = None
+        if self._prefix is None or self._prefix[0] != start:
+            self._prefix = (start, "".join([block.html for block in blocks[:start]]).lstrip())
+        first = blocks[end] if end < len(blocks) else None
+        if self._suffix is None or self._suffix[0] is not first:
+            self._suffix = (first, "".join([block.html for block in blocks[end:]]).rstrip())
+
+        parts = [self._prefix[1]]
+        parts += [block.html for block in blocks[start:end]]
+        parts.append(self._suffix[1])
+        strip_parts(parts)
+        return "".join(parts)
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
@@ -0,0 +1,128 @@
+# coding: utf-8
+
+
+"""
+    macro result cache
+    ~~~~~~~~~~~~~~~~~~
+
+    Reuse the result of "pure" macros: Macros with a true "pure" attribute
+    return always the same html code for the same arguments and text and
+    have no side effects, e.g.:
+
+        def badge(status, text):
+            return '<span class="badge %s">%s</span>' % (status, text)
+        badge.pure = True
+
+    The cache key is a hash of the macro name, the unparsed macro arguments
+    and the text, so a cache hit needs no string2dict() call. A "version"
+    attribute of the macro is part of the key, like for the render cache.
+    The "process" scope and the cache backends are shared by all emits, so
+    the macro must be found by its module and name, see get_macro_id() of
+    creole.creole2html.cache: The results of lambdas, nested functions,
+    bound methods and callable objects are only reused in the same emit.
+
+    The macro_cache argument of HtmlEmitter is the scope of the cache:
+    "emit" for a new cache for every emit, "process" for one cache in the
+    process or a cache backend of creole.creole2html.cache, e.g. a shared
+    SqliteCache. All of them remove the least recently used results.
+
+    >>> cache = get_macro_cache("emit")
+    >>> get_macro_cache("process") is get_macro_cache("process")
+    True
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import hashlib
+
+
+# max. size in bytes of the "emit" and "process" caches
+EMIT_CACHE_SIZE = 1024 * 1024
+PROCESS_CACHE_SIZE = 4 * 1024 * 1024
+
+_process_cache = None
+
+
+def is_pure(macro):
+    """
+    >>> def macro(text):
+    ...     return text
+    >>> is_pure(macro)
+    False
+    >>> macro.pure = True
+    >>> is_pure(macro)
+    True
+    """
+    return bool(getattr(macro, "pure", False))
+
+
+def get_macro_key(macro_name, macro, shared=True):
+    """
+    Return the part of the cache keys, that identifies the macro. A key
+    for a shared cache needs the macro id, without it None is returned.
+
+    >>> def macro(text):
+    ...     return text
+    >>> get_macro_key("macro", macro) is None
+    True
+    >>> get_macro_key("macro", macro, shared=False) is None
+    False
+    """
+    # Import here: creole.creole2html.cache needs the HtmlEmitter
+    from creole.creole2html.cache import get_macro_id
+
+    macro_id = get_macro_id(macro)
+    if macro_id is None and shared:
+        return None
+    return "%s\0%s" % (macro_name, macro_id)
+
+
+def get_memo_key(macro_key, macro, macro_args, text):
+    """
+    Return the hex digest for the macro call, see get_macro_key().
+
+    >>> def macro(text):
+    ...     return text
+    >>> macro_key = get_macro_key("macro", macro, shared=False)
+    >>> key = get_memo_key(macro_key, macro, 'ext=".py"', "text")
+    >>> key == get_memo_key(macro_key, macro, 'ext=".py"', "text")
+    True
+    >>> key == get_memo_key(macro_key, macro, 'ext=".py"', None)
+    False
+    """
+    parts = [macro_key, "%s" % (getattr(macro, "version", None),)]
+    for value in (macro_args, text):
+        # "\1" is None, a other value is marked with "\2"
+        parts.append("\1" if value is None else "\2" + value)
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def get_macro_cache(scope):
+    """
+    Return the cache for the scope "emit" or "process" or the given
+    cache backend.
+    """
+    global _process_cache
+
+    # Import here: creole.creole2html.cache needs the HtmlEmitter
+    from creole.creole2html.cache import MemoryCache
+
+    if scope == "emit":
+        return MemoryCache(max_size=EMIT_CACHE_SIZE)
+    elif scope == "process":
+        if _process_cache is None:
+            _process_cache = MemoryCache(max_size=PROCESS_CACHE_SIZE)
+        return _process_cache
+    elif hasattr(scope, "get") and hasattr(scope, "set"):
+        return scope
+    raise ValueError(
+        "macro_cache must be 'emit', 'process' or a cache backend, not %r" % (scope,)
+    )
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
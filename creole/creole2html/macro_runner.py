@@ -0,0 +1,253 @@
+# coding: utf-8
+
+
+"""
+    concurrent macro calls
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Call the macros of a document concurrently, see HtmlEmitter.run_macros():
+    The normal macros in a thread pool and the async macros (coroutine
+    functions) together in one event loop.
+
+    >>> def upper(text):
+    ...     return text.upper()
+    >>> outcomes = run_macros([("a", upper, {"text": "one"}), ("b", upper, {})], workers=2)
+    >>> outcomes["a"]
+    ('ONE', None)
+    >>> result, exc_info = outcomes["b"]
+    >>> exc_info[0].__name__
+    'TypeError'
+
+    A macro can have its own timeout in seconds as "timeout" attribute,
+    otherwise the default timeout is used. A normal macro can't be stopped
+    after the timeout, but its result is ignored.
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import sys
+import time
+
+try:
+    import asyncio
+except ImportError:
+    # Python 2: No async macros
+    asyncio = None
+
+try:
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+except ImportError:
+    # Python 2 without the "futures" backport: call the macros one by one
+    ThreadPoolExecutor = None
+
+
+# How often a macro is checked for the timeout, if it wasn't started yet
+POLL_INTERVAL = 0.05
+
+
+class MacroTimeoutError(Exception):
+    pass
+
+
+def get_timeout(macro, default=None):
+    """ Return the timeout in seconds of the macro or the default """
+    return getattr(macro, "timeout", default)
+
+
+def timeout_exc_info(timeout):
+    err = MacroTimeoutError("timeout after %s sec" % timeout)
+    return MacroTimeoutError, err, None
+
+
+def is_async_macro(macro):
+    """ Is the macro a coroutine function? Always False on Python 2 """
+    if asyncio is None:
+        return False
+    return (
+        asyncio.iscoroutinefunction(macro)
+        or asyncio.iscoroutinefunction(getattr(macro, "__call__", None))
+    )
+
+
+def is_loop_running():
+    """ Is a event loop running in this thread? """
+    # Python 3.6 has no asyncio.get_running_loop()
+    return asyncio._get_running_loop() is not None
+
+
+def run_in_loop(func):
+    """
+    Return the result of the awaitable func(loop) in a new event loop.
+
+    A running event loop (e.g. of a async web server) can't run a second
+    one in the same thread, so then the new loop runs in a helper thread.
+    The running loop is blocked until the macros are done, like by every
+    other synchronous call of creole2html().
+    """
+    def run():
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(func(loop))
+        finally:
+            loop.close()
+
+    if not is_loop_running():
+        return run()
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        return executor.submit(run).result()
+    finally:
+        executor.shutdown()
+
+
+def run_coroutine(coroutine, timeout=None):
+    """ Run the coroutine in a new event loop and return the result """
+    try:
+        return run_in_loop(lambda loop: asyncio.wait_for(coroutine, timeout))
+    except asyncio.TimeoutError:
+        raise MacroTimeoutError("timeout after %s sec" % timeout)
+    finally:
+        # Not awaited, if the loop couldn't run
+        coroutine.close()
+
+
+def call_macro(macro, macro_kwargs, timeout=None):
+    """
+    Call the macro and return (result, exc_info), exc_info is None if there
+    was no error. The coroutine of a async macro is run in a new event loop.
+    """
+    try:
+        result = macro(**macro_kwargs)
+        if asyncio is not None and asyncio.iscoroutine(result):
+            result = run_coroutine(result, get_timeout(macro, timeout))
+    except Exception:
+        return None, sys.exc_info()
+    return result, None
+
+
+def run_coroutines(calls, timeout=None):
+    """
+    Run the async macros of the (key, macro, macro_kwargs) calls together
+    in a new event loop and return a dict key -> (result, exc_info).
+    """
+    outcomes = {}
+    keys = []
+    coroutines = []
+    for key, macro, macro_kwargs in calls:
+        try:
+            coroutine = macro(**macro_kwargs)
+        except Exception:
+            outcomes[key] = (None, sys.exc_info())
+            continue
+        keys.append((key, get_timeout(macro, timeout)))
+        coroutines.append(coroutine)
+    if not coroutines:
+        return outcomes
+
+    def gather(loop):
+        tasks = [
+            loop.create_task(asyncio.wait_for(coroutine, macro_timeout))
+            for (key, macro_timeout), coroutine in zip(keys, coroutines)
+        ]
+        return asyncio.gather(*tasks, return_exceptions=True)
+
+    try:
+        results = run_in_loop(gather)
+    except Exception:
+        # The loop couldn't run: Every macro gets the error
+        exc_info = sys.exc_info()
+        for coroutine in coroutines:
+            coroutine.close()
+        for key, macro_timeout in keys:
+            outcomes[key] = (None, exc_info)
+        return outcomes
+
+    for (key, macro_timeout), result in zip(keys, results):
+        if isinstance(result, asyncio.TimeoutError):
+            outcomes[key] = (None, timeout_exc_info(macro_timeout))
+        elif isinstance(result, Exception):
+            outcomes[key] = (None, (type(result), result, result.__traceback__))
+        else:
+            outcomes[key] = (result, None)
+    return outcomes
+
+
+def run_macros(calls, workers, timeout=None):
+    """
+    Call the macros of the (key, macro, macro_kwargs) calls concurrently in
+    a pool of worker threads and return a dict key -> (result, exc_info).
+    The timeout of a macro starts, when it's called. Without the thread
+    pool (Python 2) the macros are called one by one.
+    """
+    if ThreadPoolExecutor is None:
+        return dict([
+            (key, call_macro(macro, macro_kwargs, timeout))
+            for key, macro, macro_kwargs in calls
+        ])
+
+    sync_calls = []
+    async_calls = []
+    for call in calls:
+        if is_async_macro(call[1]):
+            async_calls.append(call)
+        else:
+            sync_calls.append(call)
+
+    outcomes = {}
+    started = {} # key -> start time of the running macros
+
+    def run(key, macro, macro_kwargs):
+        started[key] = time.time()
+        return call_macro(macro, macro_kwargs, timeout)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        async_future = None
+        if async_calls:
+            async_future = executor.submit(run_coroutines, async_calls, timeout)
+        futures = dict([(executor.submit(run, *call), call) for call in sync_calls])
+
+        pending = set(futures)
+        while pending:
+            # Wait until the next macro is done or the next timeout is over
+            now = time.time()
+            wait_time = None
+            for future in pending:
+                key, macro, _ = futures[future]
+                macro_timeout = get_timeout(macro, timeout)
+                if macro_timeout is None:
+                    continue
+                if key in started:
+                    remaining = max(started[key] + macro_timeout - now, 0)
+                else:
+                    remaining = POLL_INTERVAL
+                if wait_time is None or remaining < wait_time:
+                    wait_time = remaining
+
+            done, pending = wait(pending, timeout=wait_time, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes[futures[future][0]] = future.result()
+
+            now = time.time()
+            for future in list(pending):
+                key, macro, _ = futures[future]
+                macro_timeout = get_timeout(macro, timeout)
+                if macro_timeout is not None and key in started \
+                        and now - started[key] >= macro_timeout:
+                    pending.discard(future)
+                    outcomes[key] = (None, timeout_exc_info(macro_timeout))
+
+        if async_future is not None:
+            outcomes.update(async_future.result())
+    finally:
+        # Don't wait for the macros after the timeout
+        executor.shutdown(wait=False)
+    return outcomes
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
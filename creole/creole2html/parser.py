@@ -29,7 +29,191 @@ import re
 from creole.creole2html.rules import BlockRules, INLINE_FLAGS, INLINE_RULES, \
     SpecialRules, InlineRules
 from creole.py3compat import TEXT_TYPE
-from creole.shared.document_tree import DocNode, DebugList
+from creole.shared.document_tree import DocNode, DebugList, iter_tree
+from creole.shared.utils import get_group_handlers
+
+
+# Compiled block grammars, shared by all parser instances.
+# key: (BlockRules class, rules tuple, re flags)
+_BLOCK_RE_CACHE = {}
+
+
+def get_block_re(block_rules=None, blog_line_breaks=True):
+    """
+    Return the compiled block regex for the given BlockRules instance.
+
+    The merged block grammar is large, so it's compiled only once per
+    BlockRules (sub)class and rules combination and reused afterwards:
+
+    >>> get_block_re(blog_line_breaks=True) is get_block_re(blog_line_breaks=True)
+    True
+    >>> get_block_re(blog_line_breaks=True) is get_block_re(blog_line_breaks=False)
+    False
+    >>> get_block_re(BlockRules(blog_line_breaks=False)) is get_block_re(blog_line_breaks=False)
+    True
+    """
+    if block_rules is None:
+        key = (BlockRules, blog_line_breaks)
+        try:
+            return _BLOCK_RE_CACHE[key]
+        except KeyError:
+            block_rules = BlockRules(blog_line_breaks=blog_line_breaks)
+            block_re = get_block_re(block_rules)
+            _BLOCK_RE_CACHE[key] = block_re
+            return block_re
+
+    key = (block_rules.__class__, tuple(block_rules.rules), block_rules.re_flags)
+    try:
+        return _BLOCK_RE_CACHE[key]
+    except KeyError:
+        block_re = re.compile('|'.join(block_rules.rules), block_rules.re_flags)
+        return _BLOCK_RE_CACHE.setdefault(key, block_re)
+
+
+# Start and end of the block rules that can span many parts,
+# see is_incomplete_match():
+macro_block_name_re = re.compile(r"<<\s*(\w+)", re.UNICODE)
+pre_block_start_re = re.compile(r"{{{\s*$", re.UNICODE | re.MULTILINE)
+pre_block_end_re = re.compile(r"^}}}", re.MULTILINE)
+
+
+# re.sub() ignores a empty match directly after the previous match before
+# Python 3.7, but re.finditer() yields it, see parse_iter():
+SUB_SKIPS_ADJACENT_EMPTY = re.sub("x*", "-", "abxd") == "-a-b-d-"
+
+
+def iter_lines(source):
+    """
+    Yield all lines of the source with \\n line endings.
+    The source can be a unicode string or a iterable of unicode strings
+    (e.g. a file object), the strings must not be complete lines.
+
+    >>> list(iter_lines(["one\\r", "\\ntwo\\rthr", "ee"]))
+    ['one\\n', 'two\\n', 'three']
+    """
+    if isinstance(source, TEXT_TYPE):
+        source = (source,)
+
+    rest = ""
+    for data in source:
+        assert isinstance(data, TEXT_TYPE), "source must be unicode!"
+        data = rest + data
+        if data.endswith("\r"):
+            # \r\n could be split into two parts
+            data, rest = data[:-1], "\r"
+        else:
+            rest = ""
+        lines = data.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        rest = lines.pop() + rest
+        for line in lines:
+            yield line + "\n"
+    if rest:
+        yield rest.replace("\r", "\n")
+
+
+def split_blocks(source):
+    """
+    Split the creole markup into parts for CreoleParser.parse_iter():
+    A part ends with empty lines and the next part starts with the next
+    non empty line.
+
+    >>> list(split_blocks("one\\ntwo\\n\\n  \\nthree\\n{{{\\n\\n}}}\\nfour"))
+    ['one\\ntwo\\n\\n  \\n', 'three\\n{{{\\n\\n', '}}}\\nfour']
+    """
+    lines = []
+    after_empty_line = False
+    for line in iter_lines(source):
+        if line.strip():
+            if after_empty_line:
+                yield "".join(lines)
+                lines = []
+                after_empty_line = False
+        else:
+            after_empty_line = True
+        lines.append(line)
+
+    if lines:
+        yield "".join(lines)
+
+
+def get_macro_block_end_re(text, start, name, match):
+    """
+    Return a regex for the end tags, that would change the block macro
+    match at start, or None. The name is the longest possible macro name.
+    The macro_block rule prefers the longest name, whose start tag and
+    end tag exists, so the match changes if the end tag of a longer name
+    follows, and also if it's start tag isn't complete yet: The whitespace
+    around the arguments can contain empty lines.
+    """
+    min_length = 1
+    if match.lastgroup == "macro_block":
+        min_length = len(match.group("macro_block_start")) + 1
+
+    names = []
+    for length in range(len(name), min_length - 1, -1):
+        macro_name = re.escape(name[:length])
+        start_tag = re.compile(
+            BlockRules.macro_block_start % macro_name, re.VERBOSE | re.UNICODE
+        ).match(text, start)
+        if start_tag is None:
+            if re.compile(
+                    r"<< \s* %s \s* .* \s* \Z" % macro_name, re.VERBOSE | re.UNICODE
+                ).match(text, start) is not None:
+                names.append(macro_name)
+        elif re.compile(r"<</\s*%s\s*>>" % macro_name, re.UNICODE).search(
+                text, start_tag.end()
+            ) is None:
+            names.append(macro_name)
+    if not names:
+        return None
+    return re.compile(r"<</\s*(?:%s)\s*>>" % "|".join(names), re.UNICODE)
+
+
+def get_missing_end(text, match):
+    """
+    Block macros and pre blocks can span many parts from split_blocks().
+    If one starts at the match, but it's end is not in the text, return
+    a regex for the missing end: The text was matched by a other rule, but
+    with more text it could be the block. Otherwise return None.
+
+    >>> block_re = get_block_re()
+    >>> get_missing_end("{{{\\ncode", block_re.match("{{{\\ncode")).pattern
+    '^}}}'
+    >>> get_missing_end("{{{\\ncode\\n}}}", block_re.match("{{{\\ncode\\n}}}")) is None
+    True
+
+    The macro_block rule backtracks to a shorter macro name, if the end
+    tag has it: "<<html>>text<</h>>" is the macro "h" with the arguments
+    "tml". So the end tag can have every start of the name:
+
+    >>> end_re = get_missing_end("<<html>>\\n", block_re.match("<<html>>\\n"))
+    >>> end_re.search("<</h>>") is not None
+    True
+
+    The start tag itself can be completed by the next parts, e.g.
+    "<<html\\n\\n" and ">>text<</html>>":
+
+    >>> get_missing_end("<<html\\n\\n", block_re.match("<<html\\n\\n")).pattern
+    '<</\\\\s*(?:html|htm|ht|h)\\\\s*>>'
+
+    A block macro with a shorter name is replaced by the longer name, if
+    it's end tag follows:
+
+    >>> text = "<<html>><</ht>>\\n\\n"
+    >>> get_missing_end(text, block_re.match(text)).pattern
+    '<</\\\\s*(?:html|htm)\\\\s*>>'
+    """
+    start = match.start()
+    kind = match.lastgroup
+    macro_start = macro_block_name_re.match(text, start)
+    if macro_start is not None:
+        end_re = get_macro_block_end_re(text, start, macro_start.group(1), match)
+        if end_re is not None:
+            return end_re
+    if kind != "pre_block" and pre_block_start_re.match(text, start):
+        if pre_block_end_re.search(text, start + 4) is None:
+            return pre_block_end_re
+    return None
 
 
 class CreoleParser(object):
@@ -44,7 +228,10 @@ class CreoleParser(object):
 
     # for link descriptions:
     link_re = re.compile(
-        '|'.join([InlineRules.image, InlineRules.linebreak, InlineRules.char]),
+        '|'.join([
+            InlineRules.image, InlineRules.linebreak,
+            InlineRules.plain_text, InlineRules.char
+        ]),
         re.VERBOSE | re.UNICODE
     )
     # for list items:
@@ -63,11 +250,11 @@ class CreoleParser(object):
         assert isinstance(raw, TEXT_TYPE)
         self.raw = raw
 
-        if block_rules is None:
-            block_rules = BlockRules(blog_line_breaks=blog_line_breaks)
+        # group name -> _*_repl method, see self._replace()
+        self._handlers = get_group_handlers(self.__class__, "_%s_repl")
 
-        # setup block element rules:
-        self.block_re = re.compile('|'.join(block_rules.rules), block_rules.re_flags)
+        # setup block element rules (compiled only once, see get_block_re):
+        self.block_re = get_block_re(block_rules, blog_line_breaks)
 
         self.blog_line_breaks = blog_line_breaks
 
@@ -166,7 +353,7 @@ class CreoleParser(object):
         self.cur = DocNode('link', self.cur)
         self.cur.content = target
         self.text = None
-        re.sub(self.link_re, self._replace, text)
+        self.link_re.sub(self._replace, text)
         self.cur = parent
         self.text = None
     _link_target_repl = _link_repl
@@ -418,33 +605,37 @@ class CreoleParser(object):
             self.text = DocNode('text', self.cur, "")
         self.text.content += groups.get('char', "")
 
+    def _plain_text_repl(self, groups):
+        """ a run of characters without any inline markup """
+        if self.text is None:
+            self.text = DocNode('text', self.cur, "")
+        self.text.content += groups['plain_text']
+
     #--------------------------------------------------------------------------
 
     def _replace(self, match):
         """Invoke appropriate _*_repl method. Called for every matched group."""
+        # The outermost group of the matched rule is closed last:
+        handler = self._handlers[match.lastgroup]
+        if handler is not None:
+            handler(self, match.groupdict())
+            return
 
-#        def debug(groups):
-#            from pprint import pformat
-#            data = dict([
-#                group for group in groups.items() if group[1] is not None
-#            ])
-#            print("%s\n" % pformat(data))
-
+        # Fallback for rules without a named outermost group:
         groups = match.groupdict()
         for name, text in groups.items():
             if text is not None:
-                #if name != "char": debug(groups)
                 replace_method = getattr(self, '_%s_repl' % name)
                 replace_method(groups)
                 return
 
     def parse_inline(self, raw):
         """Recognize inline elements inside blocks."""
-        re.sub(self.inline_re, self._replace, raw)
+        self.inline_re.sub(self._replace, raw)
 
     def parse_block(self, raw):
         """Recognize block elements."""
-        re.sub(self.block_re, self._replace, raw)
+        self.block_re.sub(self._replace, raw)
 
     def parse(self):
         """Parse the text given as self.raw and return DOM tree."""
@@ -453,6 +644,122 @@ class CreoleParser(object):
         self.parse_block(text)
         return self.root
 
+    def parse_iter(self, source):
+        """
+        Parse the markup from source (a unicode string or a iterable of
+        unicode strings, e.g. a file object) part by part, see split_blocks().
+
+        Yield lists of the completed top level nodes. They are removed from
+        the document tree, so the complete tree is never in memory.
+
+        Note: A block macro start tag without a end tag holds back the rest
+        of the document, because the end tag could follow.
+        """
+        for nodes, checkpoint in self._iter_parse(split_blocks(source)):
+            if nodes:
+                yield nodes
+
+    def _iter_parse(self, parts, text="", offset=0, pos=0, last_end=None, last_empty=False):
+        """
+        The parse_iter() loop: Yield lists of the completed top level nodes
+        (can be empty) with a checkpoint or None after every part.
+
+        The checkpoint is the parser state after the nodes, if the current
+        node was the root and the nodes before can't be changed any more.
+        A new parser can continue at it without the nodes before: The
+        checkpoint is the tuple
+        (text_start, parts_start, parts_end, pos, last_end, last_empty) and
+
+            _iter_parse(
+                split_blocks(source[parts_start:]), text=source[text_start:parts_start],
+                offset=text_start, pos=pos, last_end=last_end, last_empty=last_empty
+            )
+
+        yields the same as the rest of this loop. It depends on the source
+        until the start of the part after parts_end. All positions are in
+        the source, the given text starts at offset.
+        """
+        root = self.root
+        pos -= offset
+        if last_end is not None:
+            last_end -= offset
+        missing_end = None
+        for part in parts:
+            # Keep one character before pos for ^ and (?<!\\) in the block rules
+            cut = max(pos - 1, 0)
+            text = text[cut:] + part
+            offset += cut
+            pos -= cut
+            if last_end is not None:
+                last_end -= cut
+
+            if missing_end is not None and missing_end.search(part) is None:
+                yield [], None
+                continue
+
+            limit = len(text) - len(part)
+            pos, last_end, last_empty, missing_end, clean = self._parse_block_matches(
+                text, pos, last_end, last_empty, limit=limit
+            )
+
+            # The top level node that contains the current node can be
+            # continued in the next part (e.g. a table), so hold it back:
+            node = self.cur
+            while node.parent is not None and node.parent is not root:
+                node = node.parent
+
+            nodes = root.children
+            if node is root:
+                root.children = []
+            else:
+                root.children = [nodes.pop()]
+
+            if clean is not None:
+                clean_pos, clean_last_end, clean_last_empty, count = clean
+                yield nodes[:count], (
+                    offset, offset + limit, offset + len(text), offset + clean_pos,
+                    offset + clean_last_end, clean_last_empty
+                )
+                nodes = nodes[count:]
+            yield nodes, None
+
+        self._parse_block_matches(text, pos, last_end, last_empty)
+        nodes = root.children
+        root.children = []
+        yield nodes, None
+
+    def _parse_block_matches(self, text, pos, last_end, last_empty, limit=None):
+        """
+        Handle the block matches from pos like parse_block() does, but stop
+        before the first match that doesn't end before limit or that is
+        incomplete, see get_missing_end(). The last part from split_blocks()
+        starts at limit, so the other matches can't be changed by the text
+        that is added later.
+
+        Return the state to continue from, the missing end and the last
+        clean state: (pos, last_end, last_empty, number of root children)
+        after the last match that leaves the root as current node, or None.
+        """
+        root = self.root
+        clean = None
+        for match in self.block_re.finditer(text, pos):
+            start, end = match.span()
+            if limit is not None:
+                if end >= limit:
+                    return pos, last_end, last_empty, None, clean
+                missing_end = get_missing_end(text, match)
+                if missing_end is not None:
+                    return pos, last_end, last_empty, missing_end, clean
+
+            if start == end and last_end == start:
+                if last_empty or SUB_SKIPS_ADJACENT_EMPTY:
+                    # Was handled before we stopped / re.sub() ignores it
+                    continue
+            self._replace(match)
+            pos, last_end, last_empty = end, end, start == end
+            if self.cur is root and self.text is None:
+                clean = (pos, last_end, last_empty, len(root.children))
+        return pos, last_end, last_empty, None, clean
 
     #--------------------------------------------------------------------------
     def debug(self, start_node=None):
@@ -468,11 +775,8 @@ class CreoleParser(object):
             print("  tree from %s:" % start_node)
 
         print("=" * 80)
-        def emit(node, ident=0):
-            for child in node.children:
-                print("%s%s: %r" % (" " * ident, child.kind, child.content))
-                emit(child, ident + 4)
-        emit(start_node)
+        for depth, node in iter_tree(start_node):
+            print("%s%s: %r" % (" " * (depth * 4), node.kind, node.content))
         print("*" * 80)
 
     def debug_groups(self, groups):
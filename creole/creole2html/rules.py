@@ -97,6 +97,18 @@ class InlineRules(object):
     escape = r'(?P<escape> ~ (?P<escaped_char>\S) )'
     char = r'(?P<char> . )'
 
+    # A run of characters that can't be the start of any other inline rule:
+    # markup characters are only allowed if they are not doubled, a ~ only
+    # if it escapes nothing and whitespace only if no url follows.
+    plain_text = r'''(?P<plain_text>
+        (?:
+            [^\s\[<{*/\#^,_~\-\\]
+            | \[(?!\[) | <(?!<) | {(?!{) | \*(?!\*) | /(?!/) | \#(?!\#)
+            | \^(?!\^) | ,(?!,) | _(?!_) | -(?!-) | \\(?!\\) | ~(?!\S)
+            | [^\S\n](?!(?:%s)://)
+        )+
+    )''' % proto
+
 
 
 
@@ -117,13 +129,19 @@ class BlockRules(object):
 #            <</.*?>>
 #        )'''
 
+    # The start tag with a pattern for the macro name, it's also used for
+    # a block macro without a end tag, see get_missing_end() of
+    # creole.creole2html.parser
+    macro_block_start = r'''
+        << \s* (?P<macro_block_start>%s) \s* (?P<macro_block_args>.*?) \s* >>
+    '''
     macro_block = r'''
         (?P<macro_block>
-        << \s* (?P<macro_block_start>\w+) \s* (?P<macro_block_args>.*?) \s* >>
+        %s
         (?P<macro_block_text>(.|\n)*?)
         <</ \s* (?P=macro_block_start) \s* >>
         )
-    '''
+    ''' % (macro_block_start % r"\w+")
 
     line = r'''(?P<line> ^\s*$ )''' # empty line that separates paragraphs
 
@@ -217,7 +235,7 @@ INLINE_RULES = (
     InlineRules.small, InlineRules.delete,
 
     InlineRules.linebreak,
-    InlineRules.escape, InlineRules.char
+    InlineRules.escape, InlineRules.plain_text, InlineRules.char
 )
 
 
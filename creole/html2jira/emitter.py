@@ -23,23 +23,12 @@ from creole.shared.markup_table import MarkupTable
 
 class JiraMarkupTable(MarkupTable):
 
-    def get_rest_table(self):
-        """ return the table data in ReSt markup. """
-        # preformat every table cell
-        cells, widths = self._get_preformat_info()
-
-        lines = []
-        first = True
-        for no, row in enumerate(cells):
-            # Join every line with ljust
-            cells = [cell.ljust(width) for cell, width in zip(row, widths)]
-            line = "|" + "|".join(cells) + "|"
-            if first and self.has_header:
+    def iter_rest_table(self):
+        """ yield the lines of the table in Jira markup. """
+        for no, line in enumerate(self.iter_lines()):
+            if no == 0 and self.has_header:
                 line += self.head_prefix
-                first = False
-            lines.append(line)
-
-        return "\n".join(lines)
+            yield line
 
 
 class JiraTextEmitter(BaseEmitter):
@@ -74,7 +63,6 @@ class JiraTextEmitter(BaseEmitter):
     def blockdata_pre_emit(self, node):
         """ pre block -> with newline at the end """
         pre_block = self.deentity.replace_all(node.content).strip()
-        print(pre_block)
         pre_block = "\n".join(["%s" % line for line in pre_block.splitlines()])
         return "{quote}\n%s\n{quote}\n\n" % pre_block
 
@@ -231,11 +219,15 @@ class JiraTextEmitter(BaseEmitter):
         result = "\n%s %s\n" % (self._list_markup, content)
         return result
 
-    def _list_emit(self, node, list_type):
+    def _list_enter(self, node, list_type):
         if node.level > 1:
             self._list_markup += list_type
         else:
             self._list_markup = list_type
+
+    def _list_emit(self, node, list_type):
+        if self._walked_node is not node:
+            self._list_enter(node, list_type)
         content = self.emit_children(node)
 
         if node.level == 1:
@@ -248,18 +240,28 @@ class JiraTextEmitter(BaseEmitter):
 
         return content
 
+    def ul_enter(self, node):
+        self._list_enter(node, "*")
+
     def ul_emit(self, node):
         return self._list_emit(node, "*")
 
+    def ol_enter(self, node):
+        self._list_enter(node, "#")
+
     def ol_emit(self, node):
         return self._list_emit(node, "#")
 
-    def table_emit(self, node):
+    def table_enter(self, node):
         self._table = JiraMarkupTable(
             head_prefix="|",
             auto_width=True,
             debug_msg=self.debug_msg
         )
+
+    def table_emit(self, node):
+        if self._walked_node is not node:
+            self.table_enter(node)
         self.emit_children(node)
         content = self._table.get_rest_table()
         return "%s\n\n" % content
@@ -304,7 +306,8 @@ if __name__ == '__main__':
     h2c = HtmlParser(
 #        debug=True
     )
-    document_tree = h2c.feed(data)
+    h2c.feed(data)
+    document_tree = h2c.close()
     h2c.debug()
 
     e = JiraTextEmitter(document_tree,
@@ -173,14 +173,13 @@ class ReStructuredTextEmitter(BaseEmitter):
 
     def _should_do_substitution(self, node):
         node = node.parent
-
-        if node.kind in DO_SUBSTITUTION:
-            return True
-
-        if node is not self.root:
-            return self._should_do_substitution(node)
-        else:
-            return False
+        while node is not None:
+            if node.kind in DO_SUBSTITUTION:
+                return True
+            if node is self.root:
+                return False
+            node = node.parent
+        return False
 
     def _get_old_substitution(self, substitution_dict, text, url):
         if text not in substitution_dict:
@@ -262,8 +261,12 @@ class ReStructuredTextEmitter(BaseEmitter):
         )
         return result
 
-    def _list_emit(self, node, list_type):
+    def _list_enter(self, node, list_type):
         self._list_markup = list_type
+
+    def _list_emit(self, node, list_type):
+        if self._walked_node is not node:
+            self._list_enter(node, list_type)
         content = self.emit_children(node)
 
         if node.level == 1:
@@ -273,21 +276,31 @@ class ReStructuredTextEmitter(BaseEmitter):
 
         return content
 
+    def ul_enter(self, node):
+        self._list_enter(node, "*")
+
     def ul_emit(self, node):
         return self._list_emit(node, "*")
 
+    def ol_enter(self, node):
+        self._list_enter(node, "#.")
+
     def ol_emit(self, node):
         return self._list_emit(node, "#.")
 
-    def table_emit(self, node):
-        """
-        http://docutils.sourceforge.net/docs/ref/rst/restructuredtext.html#tables
-        """
+    def table_enter(self, node):
         self._table = MarkupTable(
             head_prefix="",
             auto_width=True,
             debug_msg=self.debug_msg
         )
+
+    def table_emit(self, node):
+        """
+        http://docutils.sourceforge.net/docs/ref/rst/restructuredtext.html#tables
+        """
+        if self._walked_node is not node:
+            self.table_enter(node)
         self.emit_children(node)
         content = self._table.get_rest_table()
         return "%s\n\n" % content
@@ -329,7 +342,8 @@ if __name__ == '__main__':
     h2c = HtmlParser(
 #        debug=True
     )
-    document_tree = h2c.feed(data)
+    h2c.feed(data)
+    document_tree = h2c.close()
     h2c.debug()
 
     e = ReStructuredTextEmitter(document_tree,
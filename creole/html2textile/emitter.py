@@ -118,9 +118,15 @@ class TextileEmitter(BaseEmitter):
 
     #--------------------------------------------------------------------------
 
+    def ul_enter(self, node):
+        self._list_enter(node, list_type="*")
+
     def ul_emit(self, node):
         return self._list_emit(node, list_type="*")
 
+    def ol_enter(self, node):
+        self._list_enter(node, list_type="#")
+
     def ol_emit(self, node):
         return self._list_emit(node, list_type="#")
 
@@ -156,7 +162,8 @@ if __name__ == '__main__':
     h2c = HtmlParser(
         debug=True
     )
-    document_tree = h2c.feed(data)
+    h2c.feed(data)
+    document_tree = h2c.close()
     h2c.debug()
 
     e = TextileEmitter(document_tree,
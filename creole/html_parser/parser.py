@@ -16,33 +16,324 @@ import re
 import sys
 import warnings
 
-from creole.html_parser.config import BLOCK_TAGS, IGNORE_TAGS
-from creole.html_tools.strip_html import strip_html
+from creole.html_parser.tags import BLOCK, BLOCK_NODE_KINDS, HEADLINE, HEADLINE_LEVEL, \
+    IGNORE, LIST, LIST_ITEM, TAG_FLAGS, VOID
+from creole.html_parser.tokenizer import create_tokenizer
+from creole.html_tools.strip_html import BLOCK_TAG, BLOCK_TAG_NAMES, END_TAG, \
+    STARTEND_TAG, TAG_NAME_CHAR, is_space, join_lines, space_re, strip_tag, \
+    strip_tags, strip_text
 from creole.py3compat import TEXT_TYPE, BINARY_TYPE
-from creole.shared.document_tree import DocNode, DebugList
-from creole.shared.html_parser import HTMLParser
+from creole.shared.document_tree import DocNode, DebugList, iter_tree
+from creole.shared.html_parser import HTMLParser, HTMLParseError
 
 #------------------------------------------------------------------------------
 
-block_re = re.compile(r'''
-    ^<pre> \s* $
-    (?P<pre_block>
-        (\n|.)*?
-    )
-    ^</pre> \s* $
-    [\s\n]*
-''', re.VERBOSE | re.UNICODE | re.MULTILINE)
+# Read file objects in chunks of this size, see iter_chunks()
+CHUNK_SIZE = 64 * 1024
 
-inline_re = re.compile(r'''
-    <pre>
-    (?P<pre_inline>
-        (\n|.)*?
-    )
-    </pre>
-''', re.VERBOSE | re.UNICODE)
+# A tag that is not closed at the end of the data
+open_tag_re = re.compile(r"""
+    <
+    (?P<end>/?)
+    (?:
+        (?P<tag>%s+)
+        [^>]*
+    )?
+    \Z
+""" % TAG_NAME_CHAR, re.VERBOSE | re.UNICODE)
 
 
-headline_tag_re = re.compile(r"h(\d)", re.UNICODE)
+def get_pre_areas(data, start, end, block_cut, inline_cut, final=True, line_start=True):
+    """
+    Return the <pre> areas of data[start:end] as a list of
+    (area start, area end, placeholder) tuples and the end of the
+    checked data.
+
+    A block area is a <pre> and a </pre> tag, each on a line of its own.
+    The whitespace after the block is a part of the area. A inline area
+    is a <pre> tag and the next </pre> tag (the text between can contain
+    block areas). The content of a area is passed to block_cut() or
+    inline_cut(), which return the placeholder.
+
+    If final is False, more data can follow: The areas end before the
+    first <pre> tag, that may be changed by the following data. This is
+    the returned end. line_start is True, if data[start] is the start of
+    a line.
+
+    The areas are found with str.find() and the text between is never
+    copied, so the costs are linear to the length of the data.
+
+    >>> cut = lambda content: "[%s]" % content
+    >>> data = "<p>a <pre>b</pre></p>\\n<pre>\\nc\\n</pre>\\n\\nd"
+    >>> get_pre_areas(data, 0, len(data), cut, cut)
+    ([(5, 17, '[b]'), (22, 38, '[\\nc\\n]')], 39)
+    >>> get_pre_areas(data + "<pre>\\nnot closed", 0, len(data) + 16, cut, cut, final=False)
+    ([(5, 17, '[b]'), (22, 38, '[\\nc\\n]')], 39)
+    """
+    blocks = []
+    pos = start
+    no_end_after = end # no block end after this position
+    while True:
+        pre_start = data.find("<pre>", pos, end)
+        if pre_start == -1:
+            break
+        pos = pre_start + 5
+        if pre_start == start:
+            if not line_start:
+                continue
+        elif data[pre_start - 1] != "\n":
+            continue # not at the start of a line
+
+        # The block content starts with the last line break after <pre>
+        space_end = space_re.match(data, pos, end).end()
+        if space_end == end and not final:
+            end = pre_start # The next data decides
+            break
+        content_start = data.rfind("\n", pos, space_end)
+        if content_start == -1 or content_start >= no_end_after:
+            continue
+
+        search_pos = content_start
+        while True:
+            content_end = data.find("\n</pre>", search_pos, end) + 1
+            if content_end == 0:
+                no_end_after = content_start
+                break
+            area_end = space_re.match(data, content_end + 6, end).end()
+            if area_end == end and not final:
+                no_end_after = content_start
+                break
+            if area_end == end or data.find("\n", content_end + 6, area_end) != -1:
+                blocks.append((pre_start, area_end, content_start, content_end))
+                pos = area_end
+                break
+            # </pre> is not on a line of its own
+            search_pos = content_end
+        if no_end_after == content_start and not final:
+            end = pre_start # The next data decides
+            break
+
+    areas = []
+    pos = start
+    index = 0
+    while True:
+        pre_start = data.find("<pre>", pos, end)
+        while index < len(blocks) and (pre_start == -1 or blocks[index][0] <= pre_start):
+            block_start, block_end, content_start, content_end = blocks[index]
+            areas.append((block_start, block_end, block_cut(data[content_start:content_end])))
+            index += 1
+            pos = block_end
+        if pre_start == -1:
+            break
+        if pre_start < pos:
+            continue # <pre> of a block area
+
+        # The content of a inline area ends at the next </pre> that is not
+        # in a block area
+        contained = index
+        search_pos = pre_start + 5
+        while True:
+            pre_end = data.find("</pre>", search_pos, end)
+            if pre_end == -1 or contained == len(blocks) or blocks[contained][0] > pre_end:
+                break
+            search_pos = blocks[contained][1]
+            contained += 1
+        if not final and (
+                pre_end == -1 or space_re.match(data, pre_end + 6, end).end() == len(data)
+            ):
+            end = pre_start # The next data decides
+            break
+        if pre_end == -1:
+            pos = end # No inline area in the rest of the data
+            continue
+
+        parts = []
+        content_start = pre_start + 5
+        for block_start, block_end, block_content_start, block_content_end in blocks[index:contained]:
+            parts.append(data[content_start:block_start])
+            parts.append(block_cut(data[block_content_start:block_content_end]))
+            content_start = block_end
+        parts.append(data[content_start:pre_end])
+        areas.append((pre_start, pre_end + 6, inline_cut("".join(parts))))
+        index = contained
+        pos = pre_end + 6
+    return areas, end
+
+
+def clean_part(data, start, end, block_cut, inline_cut, append, final=True, line_start=True):
+    """
+    Cut out the <pre> areas and delete the whitespace in data[start:end]
+    and append the result, see clean_html(). If final is False, more data
+    can follow: The html code after the last complete tag is left over.
+    Return the end of the used data.
+    """
+    areas, limit = get_pre_areas(data, start, end, block_cut, inline_cut, final, line_start)
+    pos = start
+    for area_start, area_end, placeholder in areas:
+        pos = strip_tags(data, pos, area_start, append)
+        trail_end = space_re.match(data, area_end, end).end()
+
+        # The placeholder is a closed start tag. It also closes a tag that
+        # is open before the area.
+        match = open_tag_re.search(data, pos, area_start)
+        if match is None:
+            tag_start = strip_text(data, pos, area_start, append)
+            append(strip_tag(
+                placeholder, STARTEND_TAG,
+                is_space(data, tag_start, area_start, tag_start),
+                is_space(data, area_end, trail_end, trail_end - 1),
+            ))
+        else:
+            tag_start = match.start()
+            text_end = strip_text(data, pos, tag_start, append)
+            if match.end("tag") != area_start and match.group("tag") in BLOCK_TAG_NAMES:
+                kind = BLOCK_TAG
+            elif match.group("end"):
+                kind = END_TAG
+            else:
+                kind = STARTEND_TAG
+            append(strip_tag(
+                join_lines(data[tag_start:area_start] + placeholder), kind,
+                is_space(data, text_end, tag_start, text_end),
+                is_space(data, area_end, trail_end, trail_end - 1),
+            ))
+        pos = trail_end
+
+    pos = strip_tags(data, pos, limit, append, final)
+    if final:
+        strip_text(data, pos, end, append)
+        return end
+    return pos
+
+
+def clean_html(data, block_cut, inline_cut):
+    """
+    Cut out the <pre> areas (see get_pre_areas()) and delete the whitespace
+    from the html code (like strip_html()) in one pass over the data.
+    The result is the same as replacing the areas with the placeholders
+    first and calling strip_html() after it.
+
+    >>> cut = lambda content: '<blockdata id="%s" />' % content.strip()
+    >>> clean_html(" <p>\\n  one <i>two</i></p>\\n<pre>\\n3\\n</pre>\\n", cut, cut)
+    '<p>one <i>two</i></p><blockdata id="3" />'
+    """
+    start = 0
+    end = len(data)
+    while start < end and data[start].isspace():
+        start += 1
+    while end > start and data[end - 1].isspace():
+        end -= 1
+
+    result = []
+    clean_part(data, start, end, block_cut, inline_cut, result.append)
+    return "".join(result)
+
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    Yield the html code of source in chunks. The source can be a unicode
+    string, a file object or a iterable of unicode strings. The file
+    object is read in chunks of chunk_size characters.
+
+    >>> import io
+    >>> list(iter_chunks(io.StringIO("<p>text</p>"), chunk_size=4))
+    ['<p>t', 'ext<', '/p>']
+    """
+    if isinstance(source, TEXT_TYPE):
+        yield source
+    elif hasattr(source, "read"):
+        while True:
+            data = source.read(chunk_size)
+            if not data:
+                break
+            yield data
+    else:
+        for data in source:
+            yield data
+
+
+class HtmlCleaner(object):
+    """
+    Cut out the <pre> areas and delete the whitespace from html code, that
+    is given in chunks. The joined results are the same as the
+    clean_html() result of the joined chunks:
+
+    >>> cut = lambda content: '<blockdata id="%s" />' % content.strip()
+    >>> cleaner = HtmlCleaner(cut, cut)
+    >>> cleaner.feed(" <p>\\n  one <i>tw")
+    '<p>one <i>'
+    >>> cleaner.feed("o</i></p>\\n<pre>\\n3\\n</p")
+    'two</i></p>'
+    >>> cleaner.feed("re>\\n")
+    ''
+    >>> cleaner.close()
+    '<blockdata id="3" />'
+
+    The html code after the last complete tag is kept back, until the next
+    chunk or close() decides about the whitespace. A <pre> area is kept
+    back until it's end is found. The results always end with a tag, so
+    the text between two tags is never split into two data nodes.
+    """
+    def __init__(self, block_cut, inline_cut):
+        self.block_cut = block_cut
+        self.inline_cut = inline_cut
+        self.reset()
+
+    def reset(self):
+        self.chunks = []
+        self.length = 0
+        self.min_length = 0
+        self.started = False
+        self.line_start = True # The kept back data starts a new line
+        self.pending = "" # cleaned whitespace after the last returned tag
+
+    def feed(self, data):
+        """ Add the next chunk and return the cleaned html code """
+        if not self.started:
+            data = data.lstrip()
+            if not data:
+                return ""
+            self.started = True
+        self.chunks.append(data)
+        self.length += len(data)
+        if self.length < self.min_length:
+            # Wait for more data, instead of cleaning the kept back data
+            # again and again
+            return ""
+
+        data = "".join(self.chunks)
+        result = []
+        pos = clean_part(
+            data, 0, len(data), self.block_cut, self.inline_cut, result.append,
+            final=False, line_start=self.line_start
+        )
+        if pos:
+            self.line_start = data[pos - 1] == "\n"
+        data = data[pos:]
+        self.chunks = [data]
+        self.length = self.min_length = len(data)
+        self.min_length *= 2
+
+        result = self.pending + "".join(result)
+        cut = result.rfind(">") + 1
+        self.pending = result[cut:]
+        return result[:cut]
+
+    def close(self):
+        """ Return the cleaned html code of the kept back data """
+        data = "".join(self.chunks)
+        end = len(data)
+        while end and data[end - 1].isspace():
+            end -= 1
+
+        result = []
+        clean_part(
+            data, 0, end, self.block_cut, self.inline_cut, result.append,
+            line_start=self.line_start
+        )
+        result = self.pending + "".join(result)
+        self.reset()
+        return result
 
 #------------------------------------------------------------------------------
 
@@ -52,7 +343,11 @@ class HtmlParser(HTMLParser):
     parse html code and create a document tree.
     
     >>> p = HtmlParser()
-    >>> p.feed("<p>html <strong>code</strong></p>")
+    >>> p.feed("<p>html <str")
+    <DocNode document: None>
+    >>> p.feed("ong>code</strong></p>")
+    <DocNode document: None>
+    >>> p.close()
     <DocNode document: None>
     >>> p.debug()
     ________________________________________________________________________________
@@ -67,6 +362,8 @@ class HtmlParser(HTMLParser):
     >>> p = HtmlParser()
     >>> p.feed("<p>html1 <script>var foo='<em>BAR</em>';</script> html2</p>")
     <DocNode document: None>
+    >>> p.close()
+    <DocNode document: None>
     >>> p.debug()
     ________________________________________________________________________________
       document tree:
@@ -84,9 +381,12 @@ class HtmlParser(HTMLParser):
     _block_placeholder = "blockdata"
     _inline_placeholder = "inlinedata"
 
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, tokenizer=None):
         HTMLParser.__init__(self)
 
+        # None: tokenize with HTMLParser, see creole.html_parser.tokenizer
+        self.tokenizer = create_tokenizer(tokenizer, self)
+
         self.debugging = debug
         if self.debugging:
             warnings.warn(
@@ -97,6 +397,7 @@ class HtmlParser(HTMLParser):
             self.result = []
 
         self.blockdata = []
+        self.cleaner = HtmlCleaner(self._pre_block_cut, self._pre_inline_cut)
 
         self.root = DocNode("document", None)
         self.cur = self.root
@@ -111,40 +412,44 @@ class HtmlParser(HTMLParser):
         id = len(self.blockdata) - 1
         return '<%s type="%s" id="%s" />' % (placeholder, type, id)
 
-    def _pre_pre_inline_cut(self, groups):
-        return self._pre_cut(groups["pre_inline"], "pre", self._inline_placeholder)
-
-    def _pre_pre_block_cut(self, groups):
-        return self._pre_cut(groups["pre_block"], "pre", self._block_placeholder)
-
-    def _pre_pass_block_cut(self, groups):
-        content = groups["pass_block"].strip()
-        return self._pre_cut(content, "pass", self._block_placeholder)
-
-    _pre_pass_block_start_cut = _pre_pass_block_cut
+    def _pre_block_cut(self, content):
+        return self._pre_cut(content, "pre", self._block_placeholder)
 
-    def _pre_cut_out(self, match):
-        groups = match.groupdict()
-        for name, text in groups.items():
-            if text is not None:
-                if self.debugging:
-                    print("%15s: %r (%r)" % (name, text, match.group(0)))
-                method = getattr(self, '_pre_%s_cut' % name)
-                return method(groups)
-
-#        data = match.group("data")
+    def _pre_inline_cut(self, content):
+        return self._pre_cut(content, "pre", self._inline_placeholder)
 
     def feed(self, raw_data):
+        """
+        Feed the html code, all at once or chunk by chunk. The html code
+        after the last complete tag is kept back, so call close() after
+        the last chunk.
+        """
         assert isinstance(raw_data, TEXT_TYPE), "feed data must be unicode!"
-        data = raw_data.strip()
 
-        # cut out <pre> and <tt> areas block tag areas
-        data = block_re.sub(self._pre_cut_out, data)
-        data = inline_re.sub(self._pre_cut_out, data)
+        # cut out <pre> areas and delete whitespace from html code
+        data = self.cleaner.feed(raw_data)
+        self._feed_cleaned(raw_data, data)
+        return self.root
 
-        # Delete whitespace from html code
-        data = strip_html(data)
+    def close(self):
+        """
+        Parse the kept back html code and return the complete document tree.
+        A construct that is not closed at the end (e.g. "text <b") is
+        dropped, like a truncated html code was always handled.
+        """
+        data = self.cleaner.close()
+        self._feed_cleaned("", data)
+        if self.tokenizer is None:
+            try:
+                HTMLParser.close(self)
+            except HTMLParseError:
+                # All before the construct is already handled
+                self.rawdata = ""
+        else:
+            self.tokenizer.close()
+        return self.root
 
+    def _feed_cleaned(self, raw_data, data):
         if self.debugging:
             print("_" * 79)
             print("raw data:")
@@ -156,10 +461,10 @@ class HtmlParser(HTMLParser):
 #            print(clean_data.replace(">", ">\n"))
 #            print("-"*79)
 
-        HTMLParser.feed(self, data)
-
-        return self.root
-
+        if self.tokenizer is None:
+            HTMLParser.feed(self, data)
+        else:
+            self.tokenizer.feed(data)
 
     #-------------------------------------------------------------------------
 
@@ -177,8 +482,7 @@ class HtmlParser(HTMLParser):
         return node
 
     def _go_up(self):
-        kinds = list(BLOCK_TAGS) + ["document"]
-        self.cur = self._upto(self.cur, kinds)
+        self.cur = self._upto(self.cur, BLOCK_NODE_KINDS)
         self.debug_msg("go up to", self.cur)
 
     #-------------------------------------------------------------------------
@@ -186,22 +490,24 @@ class HtmlParser(HTMLParser):
     def handle_starttag(self, tag, attrs):
         self.debug_msg("starttag", "%r atts: %s" % (tag, attrs))
 
-        if tag in IGNORE_TAGS:
+        flags = TAG_FLAGS.get(tag, 0)
+        if not flags:
+            self.cur = DocNode(tag, self.cur, None, attrs)
             return
 
-        headline = headline_tag_re.match(tag)
-        if headline:
-            self.cur = DocNode(
-                "headline", self.cur, level=int(headline.group(1))
-            )
+        if flags & IGNORE:
+            return
+
+        if flags & HEADLINE:
+            self.cur = DocNode("headline", self.cur, level=HEADLINE_LEVEL[tag])
             return
 
-        if tag in ("li", "ul", "ol"):
-            if tag in ("ul", "ol"):
+        if flags & (LIST | LIST_ITEM):
+            if flags & LIST:
                 self.__list_level += 1
             self.cur = DocNode(tag, self.cur, None, attrs, level=self.__list_level)
-        elif tag in ("img", "br"):
-            # Work-a-round if img or br  tag is not marked as startendtag:
+        elif flags & VOID:
+            # Work-a-round if a void tag is not marked as startendtag:
             # wrong: <img src="/image.jpg"> doesn't work if </img> not exist
             # right: <img src="/image.jpg" />
             DocNode(tag, self.cur, None, attrs)
@@ -238,20 +544,21 @@ class HtmlParser(HTMLParser):
             DocNode(tag, self.cur, None, attrs)
 
     def handle_endtag(self, tag):
-        if tag in IGNORE_TAGS:
+        flags = TAG_FLAGS.get(tag, 0)
+        if flags & IGNORE:
             return
 
         self.debug_msg("endtag", "%r" % tag)
 
-        if tag == "br": # handled in starttag
+        if flags & VOID: # handled in starttag
             return
 
         self.debug_msg("starttag", "%r" % self.get_starttag_text())
 
-        if tag in ("ul", "ol"):
+        if flags & LIST:
             self.__list_level -= 1
 
-        if tag in BLOCK_TAGS or self.cur is None:
+        if flags & BLOCK or self.cur is None:
             self._go_up()
         else:
             self.cur = self.cur.parent
@@ -276,22 +583,19 @@ class HtmlParser(HTMLParser):
             print("  tree from %s:" % start_node)
 
         print("=" * 80)
-        def emit(node, ident=0):
-            for child in node.children:
-                txt = "%s%s" % (" " * ident, child.kind)
+        for depth, node in iter_tree(start_node):
+            txt = "%s%s" % (" " * (depth * 4), node.kind)
 
-                if child.content:
-                    txt += ": %r" % child.content
+            if node.content:
+                txt += ": %r" % node.content
 
-                if child.attrs:
-                    txt += " - attrs: %r" % child.attrs
+            if node.attrs:
+                txt += " - attrs: %r" % node.attrs
 
-                if child.level != None:
-                    txt += " - level: %r" % child.level
+            if node.level != None:
+                txt += " - level: %r" % node.level
 
-                print(txt)
-                emit(child, ident + 4)
-        emit(start_node)
+            print(txt)
         print("*" * 80)
 
 
@@ -0,0 +1,68 @@
+# coding: utf-8
+
+
+"""
+    html tag classification
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Precomputed flags for the known html tags, so the parser and the
+    emitters need only one dict or set lookup per tag:
+
+    >>> flags = TAG_FLAGS["h2"]
+    >>> bool(flags & BLOCK), bool(flags & HEADLINE), HEADLINE_LEVEL["h2"]
+    (True, True, 2)
+    >>> bool(TAG_FLAGS["img"] & VOID), TAG_FLAGS.get("span", 0)
+    (True, 0)
+    >>> "td" in BLOCK_TAG_SET, "tbody" in IGNORE_TAG_SET
+    (True, True)
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+from creole.html_parser.config import BLOCK_TAGS, IGNORE_TAGS
+
+
+# Elements without content and without a end tag
+VOID_TAGS = (
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "meta", "param", "source", "track", "wbr",
+)
+LIST_TAGS = ("ul", "ol")
+
+# The flags in TAG_FLAGS
+BLOCK = 1
+IGNORE = 2
+VOID = 4
+HEADLINE = 8
+LIST = 16 # ul and ol
+LIST_ITEM = 32 # li
+
+BLOCK_TAG_SET = frozenset(BLOCK_TAGS)
+IGNORE_TAG_SET = frozenset(IGNORE_TAGS)
+
+# The block tags and the root node of the document tree
+BLOCK_NODE_KINDS = BLOCK_TAG_SET | frozenset(["document"])
+
+HEADLINE_LEVEL = dict([("h%i" % level, level) for level in range(1, 7)])
+
+
+def _build_tag_flags():
+    tag_flags = {}
+    for tags, flag in (
+            (BLOCK_TAGS, BLOCK), (IGNORE_TAGS, IGNORE), (VOID_TAGS, VOID),
+            (HEADLINE_LEVEL, HEADLINE), (LIST_TAGS, LIST),
+            (("li",), LIST_ITEM),
+        ):
+        for tag in tags:
+            tag_flags[tag] = tag_flags.get(tag, 0) | flag
+    return tag_flags
+
+TAG_FLAGS = _build_tag_flags()
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
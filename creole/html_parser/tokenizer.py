@@ -0,0 +1,222 @@
+# coding: utf-8
+
+
+"""
+    html tokenizer backends
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    HtmlParser gets the tags and the text of the html code as events from
+    a tokenizer. The default tokenizer is the pure python HTMLParser from
+    creole.shared.html_parser, the optional "lxml" tokenizer uses the html
+    parser of libxml2, if lxml is installed.
+
+    Select the tokenizer for one conversion:
+
+        html2creole(html, tokenizer="lxml")
+
+    or for all conversions:
+
+        creole.html_parser.tokenizer.DEFAULT_TOKENIZER = "lxml"
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import re
+
+from creole.py3compat import TEXT_TYPE
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+
+DEFAULT_TOKENIZER = "stdlib"
+
+# The html code is fed into libxml2 inside of these tags, so that it
+# doesn't add them or a <p> around the text
+WRAPPER_TAGS = ("html", "body")
+CDATA_TAGS = ("script", "style")
+PLACEHOLDER_TAGS = ("blockdata", "inlinedata")
+
+text_token_re = re.compile(r"""
+    &\#(?P<charref> [0-9]+(?![0-9a-fA-F]) | [xX][0-9a-fA-F]+ );?
+    |
+    &(?P<entityref> [a-zA-Z][-.a-zA-Z0-9]* );?
+    |
+    [&<]
+""", re.VERBOSE | re.UNICODE)
+
+
+def tokenize_text(text, handler):
+    """
+    Split the character and entity references out of the raw text, like
+    HTMLParser does, and call the handler methods for them.
+
+    >>> class Handler(object):
+    ...     def handle_data(self, data): print("data", repr(data))
+    ...     def handle_charref(self, name): print("charref", repr(name))
+    ...     def handle_entityref(self, name): print("entityref", repr(name))
+    >>> tokenize_text("a &amp; b&#x41; < c", Handler())
+    data 'a '
+    entityref 'amp'
+    data ' b'
+    charref 'x41'
+    data ' '
+    data '<'
+    data ' c'
+    """
+    pos = 0
+    for match in text_token_re.finditer(text):
+        start = match.start()
+        if start > pos:
+            handler.handle_data(text[pos:start])
+        charref, entityref = match.group("charref", "entityref")
+        if charref is not None:
+            handler.handle_charref(charref)
+        elif entityref is not None:
+            handler.handle_entityref(entityref)
+        else:
+            handler.handle_data(match.group())
+        pos = match.end()
+    if pos < len(text):
+        handler.handle_data(text[pos:])
+
+
+def to_text(value):
+    # lxml returns byte strings for ASCII text under Python 2
+    if value is None or isinstance(value, TEXT_TYPE):
+        return value
+    return value.decode("utf-8")
+
+
+class LxmlTarget(object):
+    """
+    Pass the events from the html parser of lxml to the HtmlParser handler.
+    """
+    def __init__(self, handler):
+        self.handler = handler
+        self.text = []
+        self.cdata_tag = None
+
+    def flush(self):
+        if not self.text:
+            return
+        text = "".join(self.text)
+        self.text = []
+        if self.cdata_tag is None:
+            tokenize_text(text, self.handler)
+        else:
+            self.handler.handle_data(text.replace("&amp;", "&"))
+
+    def start(self, tag, attrib):
+        tag = to_text(tag)
+        if tag in WRAPPER_TAGS:
+            return
+        self.flush()
+        attrs = []
+        for name, value in attrib.items():
+            value = to_text(value)
+            if value:
+                value = self.handler.unescape(value)
+            attrs.append((to_text(name), value))
+        if tag in PLACEHOLDER_TAGS:
+            # a startend tag, libxml2 calls end() for it
+            self.handler.handle_startendtag(tag, attrs)
+            return
+        if tag in CDATA_TAGS:
+            self.cdata_tag = tag
+        self.handler.handle_starttag(tag, attrs)
+
+    def end(self, tag):
+        tag = to_text(tag)
+        if tag in WRAPPER_TAGS or tag in PLACEHOLDER_TAGS:
+            return
+        self.flush()
+        if tag == self.cdata_tag:
+            self.cdata_tag = None
+        self.handler.handle_endtag(tag)
+
+    def data(self, data):
+        self.text.append(to_text(data))
+
+    def close(self):
+        self.flush()
+
+
+class LxmlTokenizer(object):
+    """
+    Tokenize with the html parser of libxml2, using the target parser
+    interface of lxml.
+
+    libxml2 resolves all entities, so every "&" is escaped before feeding
+    and the character and entity references are split out of the text
+    again. The attribute values are unescaped by the handler, like the
+    HTMLParser does it. So the document tree is the same as with the
+    default tokenizer, except for broken html code: libxml2 closes
+    misnested tags and drops end tags without a start tag.
+    """
+    def __init__(self, handler):
+        if etree is None:
+            raise ImportError("The lxml tokenizer needs lxml, see: http://lxml.de")
+        self.parser = etree.HTMLParser(target=LxmlTarget(handler))
+        self.parser.feed("<%s>" % "><".join(WRAPPER_TAGS))
+
+    def feed(self, data):
+        self.parser.feed(data.replace("&", "&amp;"))
+
+    def close(self):
+        self.parser.close()
+
+
+# Name -> tokenizer class, None is the HTMLParser base class of HtmlParser
+TOKENIZERS = {
+    "stdlib": None,
+    "lxml": LxmlTokenizer,
+}
+
+
+def create_tokenizer(name, handler):
+    """
+    Return a new tokenizer, that calls the handler methods of the
+    HtmlParser handler. None means the default tokenizer.
+
+    >>> create_tokenizer("stdlib", None) is None
+    True
+    >>> create_tokenizer("foo", None)
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown html tokenizer 'foo', use one of: lxml, stdlib
+    """
+    if name is None:
+        name = DEFAULT_TOKENIZER
+    try:
+        tokenizer_class = TOKENIZERS[name]
+    except KeyError:
+        raise ValueError("Unknown html tokenizer %r, use one of: %s" % (
+            str(name), ", ".join(sorted(TOKENIZERS))
+        ))
+    if tokenizer_class is None:
+        return None
+    return tokenizer_class(handler)
+
+
+def available_tokenizers():
+    """
+    Return the names of the tokenizers usable here.
+
+    >>> "stdlib" in available_tokenizers()
+    True
+    """
+    names = ["stdlib"]
+    if etree is not None:
+        names.append("lxml")
+    return names
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
@@ -20,16 +20,66 @@ except ImportError:
 
 from creole.py3compat import PY3
 
+if PY3:
+    unichr = chr
 
-entities_rules = '|'.join([
-    r"(&\#(?P<number>\d+);)",
-    r"(&\#x(?P<hex>[a-fA-F0-9]+);)",
-    r"(&(?P<named>[a-zA-Z]+);)",
-])
-#print(entities_rules)
-entities_regex = re.compile(
-    entities_rules, re.VERBOSE | re.UNICODE | re.MULTILINE
-)
+
+def build_entity_table():
+    """
+    Return a dict with all named html entities -> unicode character(s):
+    The HTML 4 entities, "apos" and with Python 3 all HTML5 entities.
+
+    >>> table = build_entity_table()
+    >>> [ord(table[name]) for name in ("gt", "hellip", "frac12", "apos")]
+    [62, 8230, 189, 39]
+    """
+    table = {"apos": "'"}
+    for name, codepoint in entities.name2codepoint.items():
+        table[name] = unichr(codepoint)
+    # Python 3.3+ has the HTML5 entities with the ";"
+    for name, chars in getattr(entities, "html5", {}).items():
+        if name.endswith(";"):
+            table[name[:-1]] = chars
+    # Non breaking spaces are replaced by normal spaces
+    table["nbsp"] = " "
+    return table
+
+ENTITY_TABLE = build_entity_table()
+
+
+class CharrefTable(dict):
+    """
+    Memoize the decoding of character references (the part between "&#"
+    and ";") into the unicode character. Only the first max_size
+    different references are stored.
+
+    >>> charrefs = CharrefTable()
+    >>> charrefs["62"], charrefs["x3E"], charrefs["X3e"]
+    ('>', '>', '>')
+    >>> sorted(charrefs)
+    ['62', 'X3e', 'x3E']
+    """
+    max_size = 2048
+
+    def __missing__(self, text):
+        if text[0] in "xX":
+            char = unichr(int(text[1:], 16))
+        else:
+            char = unichr(int(text))
+        if len(self) < self.max_size:
+            self[text] = char
+        return char
+
+CHARREFS = CharrefTable()
+
+
+entities_regex = re.compile(r"""
+    &(?:
+        \#(?P<charref> [0-9]+ | [xX][a-fA-F0-9]+ )
+        |
+        (?P<named> [a-zA-Z][a-zA-Z0-9]* )
+    );
+""", re.VERBOSE | re.UNICODE)
 
 
 class Deentity(object):
@@ -43,54 +93,49 @@ class Deentity(object):
     >>> d.replace_all("-=[M&uuml;hlheim]=-") # uuml - latin small letter u with diaeresis
     '-=[M\\xfchlheim]=-'
 
+    Unknown entities are not replaced:
+    >>> d.replace_all("&frac12; &foo; &#X41;")
+    '\\xbd &foo; A'
+
     >>> d.replace_number("126")
     '~'
     >>> d.replace_hex("7E")
     '~'
+    >>> d.replace_charref("x7E")
+    '~'
     >>> d.replace_named("amp")
     '&'
     """
     def replace_number(self, text):
         """ unicode number entity """
-        unicode_no = int(text)
-        if PY3:
-            return chr(unicode_no)
-        else:
-            return unichr(unicode_no)
+        return CHARREFS[text]
 
     def replace_hex(self, text):
         """ hex entity """
-        unicode_no = int(text, 16)
-        if PY3:
-            return chr(unicode_no)
-        else:
-            return unichr(unicode_no)
+        return CHARREFS["x" + text]
+
+    def replace_charref(self, text):
+        """ number or hex entity with the "x", e.g. "126" or "x7E" """
+        return CHARREFS[text]
 
     def replace_named(self, text):
-        """ named entity """
-        if text == "nbsp":
-            # Non breaking spaces is not in htmlentitydefs
-            return " "
-        else:
-            codepoint = entities.name2codepoint[text]
-            if PY3:
-                return chr(codepoint)
-            else:
-                return unichr(codepoint)
+        """ named entity, KeyError if unknown """
+        return ENTITY_TABLE[text]
 
     def replace_all(self, content):
         """ replace all html entities form the given text. """
-        def replace_entity(match):
-            groups = match.groupdict()
-            for name, text in groups.items():
-                if text is not None:
-                    replace_method = getattr(self, 'replace_%s' % name)
-                    return replace_method(text)
-
-            # Should never happen:
-            raise RuntimeError("deentitfy re rules wrong!")
-
-        return entities_regex.sub(replace_entity, content)
+        if "&" not in content:
+            return content
+        return entities_regex.sub(_replace_entity, content)
+
+
+def _replace_entity(match):
+    if match.lastgroup == "charref":
+        return CHARREFS[match.group("charref")]
+    try:
+        return ENTITY_TABLE[match.group("named")]
+    except KeyError:
+        return match.group()
 
 
 if __name__ == '__main__':
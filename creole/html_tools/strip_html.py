@@ -15,23 +15,233 @@ from __future__ import division, absolute_import, print_function, unicode_litera
 
 import re
 
-from creole.html_parser.config import BLOCK_TAGS
-
-
-strip_html_regex = re.compile(
-    r"""
-        \s*
+from creole.html_parser.tags import BLOCK_TAG_SET
+
+
+space_re = re.compile(r"\s*", re.UNICODE)
+
+# A tag in the html code. The tag name ends at a space or at a line break,
+# because the lines are joined with spaces (see join_lines())
+TAG_NAME_CHAR = r"(?: [^\s>] | [^\S\ \n](?![^\S\n]*\n) )"
+exact_tag_re = re.compile(r"""
+    <
+    (?P<end>/?)
+    (?P<tag>%s+)
+    [^>]*?
+    (?P<startend>/?)
+    >
+""" % TAG_NAME_CHAR, re.VERBOSE | re.UNICODE)
+
+# Faster, if the tag name contains no whitespace
+tag_re = re.compile(r"""
+    (?P<block>
         <
-            (?P<end>/{0,1})       # end tag e.g.: </end>
-            (?P<tag>[^ >]+)       # tag name
-            .*?
-            (?P<startend>/{0,1})  # closed tag e.g.: <closed />
+        (?P<end>/?)
+        (?P<tag>[^\s>]*)
+        [^>]*
         >
-        \s*
-    """,
-    re.VERBOSE | re.MULTILINE | re.UNICODE
-)
+    )
+    (?P<space_end>\s*)
+""", re.VERBOSE | re.UNICODE)
+
+
+def join_lines(text):
+    """
+    >>> join_lines("one \\n\\n two")
+    'one  two'
+    """
+    if "\n" not in text:
+        return text
+    return " ".join([line.strip() for line in text.split("\n")])
+
+
+BLOCK_TAG_NAMES = BLOCK_TAG_SET
+
+# The kinds of tags, see get_tag_kind()
+BLOCK_TAG, END_TAG, STARTEND_TAG, START_TAG = range(4)
+
 
+def get_tag_kind(tag):
+    """
+    Return the kind of the tag or None, if it's not a tag.
+
+    >>> get_tag_kind("<p>") == BLOCK_TAG
+    True
+    >>> get_tag_kind("</strong>") == END_TAG
+    True
+    >>> get_tag_kind('<img src="/image.jpg" />') == STARTEND_TAG
+    True
+    >>> get_tag_kind("<br/>") == START_TAG # The tag name is "br/"
+    True
+    >>> get_tag_kind("< p>") is None
+    True
+    """
+    match = tag_re.match(tag)
+    end_tag, name = match.group("end", "tag")
+    name_end = len(end_tag) + len(name) + 1
+    char = tag[name_end]
+    if not name or (char != " " and char != ">" and char != "\n"
+            and "\n" not in space_re.match(tag, name_end).group()):
+        # The tag name is empty or contains whitespace: Use the
+        # slow, exact regex
+        match = exact_tag_re.match(tag)
+        if match is None:
+            return None
+        end_tag, name, is_startend = match.group("end", "tag", "startend")
+    else:
+        is_startend = tag[-2] == "/" and len(tag) - 2 >= name_end
+
+    if name in BLOCK_TAG_NAMES:
+        return BLOCK_TAG
+    if end_tag:
+        return END_TAG
+    if is_startend:
+        return STARTEND_TAG
+    return START_TAG
+
+
+def strip_tag(tag, kind, space_start, space_end):
+    """
+    Return the tag with a space before or after it, if there was
+    whitespace around it. see strip_html()
+    """
+    if kind == END_TAG:
+        # It's a normal end tag e.g.: </strong>
+        if space_start or space_end:
+            tag += " "
+    elif kind == STARTEND_TAG:
+        # It's a closed start tag e.g.: <br />
+        if space_start:
+            tag = " " + tag
+        if space_end:
+            tag += " "
+    elif kind == START_TAG:
+        # a start tag e.g.: <strong>
+        if space_start or space_end:
+            tag = " " + tag
+    return tag
+
+
+def is_space(data, start, end, char):
+    """
+    Is the whitespace data[start:end] a space after the lines are joined?
+    char is the position of the first or last character.
+    """
+    if start == end:
+        return False
+    return data[char] == " " or data.find("\n", start, end) != -1
+
+
+def strip_text(data, pos, end, append):
+    """
+    Append the text data[pos:end] with joined lines, without the
+    whitespace at the end. Return the start of this whitespace.
+    """
+    text_end = end
+    while text_end > pos and data[text_end - 1].isspace():
+        text_end -= 1
+    if text_end > pos:
+        append(join_lines(data[pos:text_end]))
+    return text_end
+
+
+def strip_tags(data, pos, end, append, final=True):
+    """
+    Delete whitespace from the html code in data[pos:end], like
+    strip_html(), and append the result. The text after the last tag
+    is left over, the start of it is returned. If final is False, more
+    data can follow and a tag at the end of the data is left over, too.
+
+    Only the whitespace around the tags and the line breaks are changed,
+    the html code between the changes is appended in one slice.
+    """
+    block_tag_names = BLOCK_TAG_NAMES
+    copy_pos = pos # data[copy_pos:pos] is not changed and not appended
+    search_pos = pos
+    while search_pos is not None:
+        for match in tag_re.finditer(data, search_pos, end):
+            tag, end_tag, name, space_end = match.groups()
+            tag_start = match.start()
+            name_end = len(end_tag) + len(name) + 1
+            char = tag[name_end]
+            if name and (char == ">" or char == " " or char == "\n"):
+                if name in block_tag_names:
+                    kind = BLOCK_TAG
+                elif end_tag:
+                    kind = END_TAG
+                elif tag[-2] == "/" and len(tag) - 2 >= name_end:
+                    kind = STARTEND_TAG
+                else:
+                    kind = START_TAG
+            else:
+                kind = get_tag_kind(tag)
+                if kind is None:
+                    # Not a tag, search the next one after the "<"
+                    search_pos = tag_start + 1
+                    break
+            match_end = match.end()
+            if not final and match_end == len(data):
+                search_pos = None
+                break # The whitespace after the tag is not complete
+
+            text_end = tag_start
+            if text_end != pos:
+                while text_end > pos and data[text_end - 1].isspace():
+                    text_end -= 1
+                if data.find("\n", pos, text_end) != -1:
+                    append(data[copy_pos:pos])
+                    append(join_lines(data[pos:text_end]))
+                    copy_pos = text_end
+            pos = match_end
+
+            # Is there a space before and after the tag? see strip_tag()
+            if kind == BLOCK_TAG:
+                space_start = space_end = False
+            else:
+                space_start = text_end != tag_start and (
+                    data[text_end] == " " or data.find("\n", text_end, tag_start) != -1
+                )
+                space_end = space_end != "" and (
+                    space_end[-1] == " " or "\n" in space_end
+                )
+                if kind == END_TAG:
+                    space_start, space_end = False, space_start or space_end
+                elif kind == START_TAG:
+                    space_start, space_end = space_start or space_end, False
+
+            if "\n" in tag:
+                # STARTEND_TAG keeps both spaces, they are decided above
+                append(data[copy_pos:text_end])
+                append(strip_tag(join_lines(tag), STARTEND_TAG, space_start, space_end))
+                copy_pos = match_end
+                continue
+
+            if space_start:
+                changed = tag_start != text_end + 1 or data[text_end] != " "
+            else:
+                changed = tag_start != text_end
+            if changed:
+                append(data[copy_pos:text_end])
+                if space_start:
+                    append(" ")
+                copy_pos = tag_start
+
+            tag_end = tag_start + len(tag)
+            if space_end:
+                changed = match_end != tag_end + 1 or data[tag_end] != " "
+            else:
+                changed = match_end != tag_end
+            if changed:
+                append(data[copy_pos:tag_end])
+                if space_end:
+                    append(" ")
+                copy_pos = match_end
+        else:
+            search_pos = None
+
+    if copy_pos < pos:
+        append(data[copy_pos:pos])
+    return pos
 
 
 def strip_html(html_code):
@@ -59,53 +269,14 @@ def strip_html(html_code):
     >>> strip_html('<p>a <img src="/image.jpg" /> image.</p>')
     '<p>a <img src="/image.jpg" /> image.</p>'
 
-
+    The html code is scanned once and only the changed parts are copied,
+    see strip_tags().
     """
-
-    def strip_tag(match):
-        block = match.group(0)
-        end_tag = match.group("end") in ("/", "/")
-        startend_tag = match.group("startend") in ("/", "/")
-        tag = match.group("tag")
-
-#        print("_"*40)
-#        print(match.groupdict())
-#        print("block.......: %r" % block)
-#        print("end_tag.....:", end_tag)
-#        print("startend_tag:", startend_tag)
-#        print("tag.........: %r" % tag)
-
-        if tag in BLOCK_TAGS:
-            return block.strip()
-
-        space_start = block.startswith(" ")
-        space_end = block.endswith(" ")
-
-        result = block.strip()
-
-        if end_tag:
-            # It's a normal end tag e.g.: </strong>
-            if space_start or space_end:
-                result += " "
-        elif startend_tag:
-            # It's a closed start tag e.g.: <br />
-
-            if space_start: # there was space before the tag
-                result = " " + result
-
-            if space_end: # there was space after the tag
-                result += " "
-        else:
-            # a start tag e.g.: <strong>
-            if space_start or space_end:
-                result = " " + result
-
-        return result
-
     data = html_code.strip()
-    clean_data = " ".join([line.strip() for line in data.split("\n")])
-    clean_data = strip_html_regex.sub(strip_tag, clean_data)
-    return clean_data
+    result = []
+    pos = strip_tags(data, 0, len(data), result.append)
+    strip_text(data, pos, len(data), result.append)
+    return "".join(result)
 
 
 if __name__ == '__main__':
@@ -51,3 +51,16 @@ def repr2(obj):
         return repr(obj)
 
 
+if PY3:
+    def reraise(exc_type, exc_value, exc_traceback=None):
+        """
+        Raise the exception of a sys.exc_info() again, with the traceback
+        """
+        raise exc_value.with_traceback(exc_traceback)
+else:
+    exec("""def reraise(exc_type, exc_value, exc_traceback=None):
+    \"\"\"
+    Raise the exception of a sys.exc_info() again, with the traceback
+    \"\"\"
+    raise exc_type, exc_value, exc_traceback
+""")
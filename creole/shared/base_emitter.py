@@ -13,19 +13,100 @@
 from __future__ import division, absolute_import, print_function, unicode_literals
 import posixpath
 
-from creole.html_parser.config import BLOCK_TAGS
+from creole.html_parser.tags import BLOCK_TAG_SET
 from creole.html_tools.deentity import Deentity
 from creole.py3compat import TEXT_TYPE
 from creole.shared.markup_table import MarkupTable
-from creole.shared.unknown_tags import transparent_unknown_nodes
+from creole.shared.unknown_tags import escape_unknown_nodes, preformat_unknown_nodes, \
+    raise_unknown_node, transparent_unknown_nodes, use_html_macro
+
+
+# These unknown_emit callables emit the children of the node first, so
+# emit_node() walks into unknown nodes, see EmitHandlers
+CHILDREN_FIRST_UNKNOWN_EMITS = (
+    escape_unknown_nodes, preformat_unknown_nodes, raise_unknown_node,
+    transparent_unknown_nodes, use_html_macro,
+)
+
+
+def _defined_in(cls, name):
+    for klass in cls.__mro__:
+        if name in klass.__dict__:
+            return klass
+    return object
+
+
+class EmitHandlers(dict):
+    """
+    Map node kinds to the (emit, enter, walk) handlers of an emitter class:
+    The unbound *_emit method (None for unknown nodes), the unbound *_enter
+    method or None and if emit_node() walks into the children of the node.
+    The handlers are looked up only once per class, see get_emit_handlers()
+    """
+    def __init__(self, cls, walk_unknown):
+        super(EmitHandlers, self).__init__()
+        self.cls = cls
+        self.walk_unknown = walk_unknown
+
+    def __missing__(self, kind):
+        cls = self.cls
+        emit = getattr(cls, "%s_emit" % kind, None)
+        if emit is None:
+            handlers = (None, None, self.walk_unknown)
+        else:
+            enter = getattr(cls, "%s_enter" % kind, None)
+            if enter is not None and not issubclass(
+                    _defined_in(cls, "%s_enter" % kind), _defined_in(cls, "%s_emit" % kind)
+                ):
+                # *_emit is overwritten in a subclass without the *_enter
+                # method: It must emit the children by itself.
+                handlers = (emit, None, False)
+            else:
+                handlers = (emit, enter, kind not in cls.opaque_kinds)
+        self[kind] = handlers
+        return handlers
+
+
+_EMIT_HANDLERS = {}
+
+def get_emit_handlers(cls, unknown_emit):
+    """
+    Return the EmitHandlers of the emitter class with the unknown_emit
+    callable, created only once per class.
+
+    >>> handlers = get_emit_handlers(BaseEmitter, transparent_unknown_nodes)
+    >>> handlers["p"] == (BaseEmitter.p_emit, None, True)
+    True
+    >>> handlers["foo"]
+    (None, None, True)
+    >>> handlers is get_emit_handlers(BaseEmitter, escape_unknown_nodes)
+    True
+    """
+    key = (cls, unknown_emit in CHILDREN_FIRST_UNKNOWN_EMITS)
+    try:
+        return _EMIT_HANDLERS[key]
+    except KeyError:
+        return _EMIT_HANDLERS.setdefault(key, EmitHandlers(*key))
 
 
 class BaseEmitter(object):
     """
     Build from a document_tree (html2creole.parser.HtmlParser instance) a
     creole markup text.
+
+    Every node is emitted by the *_emit method of its kind. The optional
+    *_enter method is called before the children of the node are emitted,
+    the *_emit method after them, see emit_node(). The methods are looked
+    up once per class, so they can't be replaced on a instance.
+
+    With strict=True (the default, if debug is on) every *_emit method
+    result is checked to be a unicode string.
     """
-    def __init__(self, document_tree, unknown_emit=None, debug=False):
+    # Nodes of these kinds are not walked into by emit_node(), their *_emit
+    # method emits the children with emit_node() calls.
+    opaque_kinds = ("document",)
+
+    def __init__(self, document_tree, unknown_emit=None, debug=False, strict=None):
         self.root = document_tree
 
         if unknown_emit is None:
@@ -35,11 +116,21 @@ class BaseEmitter(object):
 
         self.last = None
         self.debugging = debug
+        if strict is None:
+            self.strict = debug
+        else:
+            self.strict = strict
 
         self.deentity = Deentity() # for replacing html entities
         self._inner_list = ""
+        self._list_starts = []
         self._mask_linebreak = False
 
+        self._handlers = get_emit_handlers(self.__class__, self._unknown_emit)
+        # The node with the already emitted children, see emit_node()
+        self._walked_node = None
+        self._walked_children = None
+
     #--------------------------------------------------------------------------
 
     def blockdata_pass_emit(self, node):
@@ -73,15 +164,8 @@ class BaseEmitter(object):
         """
         emit a not named html entity
         """
-        entity = node.content
-
-        if entity.startswith("x"):
-            # entity in hex
-            hex_no = entity[1:]
-            return self.deentity.replace_hex(hex_no)
-        else:
-            # entity as a unicode number
-            return self.deentity.replace_number(entity)
+        # entity as a unicode number or in hex, e.g. "126" or "x7E"
+        return self.deentity.replace_charref(node.content)
 
     #--------------------------------------------------------------------------
 
@@ -105,20 +189,26 @@ class BaseEmitter(object):
         content = self.emit_children(node)
         return "\n%s %s" % (self._inner_list, content)
 
-    def _list_emit(self, node, list_type):
+    def _list_enter(self, node, list_type):
         start_newline = False
-        if self.last and self.last.kind not in BLOCK_TAGS:
+        if self.last and self.last.kind not in BLOCK_TAG_SET:
             if not self.last.content or not self.last.content.endswith("\n"):
                 start_newline = True
+        self._list_starts.append(start_newline)
 
         if self._inner_list == "": # Start a new list
             self._inner_list = list_type
         else:
             self._inner_list += list_type
 
+    def _list_emit(self, node, list_type):
+        if self._walked_node is not node:
+            self._list_enter(node, list_type)
+
         content = "%s" % self.emit_children(node)
 
         self._inner_list = self._inner_list[:-1]
+        start_newline = self._list_starts.pop()
 
         if self._inner_list == "": # Start a new list
             if start_newline:
@@ -130,18 +220,26 @@ class BaseEmitter(object):
 
     #--------------------------------------------------------------------------
 
-    def table_emit(self, node):
+    def table_enter(self, node):
         self._table = MarkupTable(
             head_prefix=self.table_head_prefix,
             auto_width=self.table_auto_width,
             debug_msg=self.debug_msg
         )
+
+    def table_emit(self, node):
+        if self._walked_node is not node:
+            self.table_enter(node)
         self.emit_children(node)
         content = self._table.get_table_markup()
         return "%s\n" % content
 
-    def tr_emit(self, node):
+    def tr_enter(self, node):
         self._table.add_tr()
+
+    def tr_emit(self, node):
+        if self._walked_node is not node:
+            self.tr_enter(node)
         self.emit_children(node)
         return ""
 
@@ -171,7 +269,7 @@ class BaseEmitter(object):
     def _emit_content(self, node):
         content = self.emit_children(node)
         content = self._escape_linebreaks(content)
-        if node.kind in BLOCK_TAGS:
+        if node.kind in BLOCK_TAG_SET:
             content = "%s\n\n" % content
         return content
 
@@ -193,44 +291,89 @@ class BaseEmitter(object):
 
     def emit_children_list(self, node):
         """Emit all the children of a node."""
+        if self._walked_node is node:
+            return self._walked_children
         self.last = node
         result = []
         for child in node.children:
             content = self.emit_node(child)
-            assert isinstance(content, TEXT_TYPE)
+            if self.strict:
+                self._check_content(child, content, self._handlers[child.kind][0])
             result.append(content)
         return result
 
     def emit_node(self, node):
-        """Emit a single node."""
-        def unicode_error(method_name, method, node, content):
-            node.debug()
-            raise AssertionError(
-                "Method '%s' (%s) returns no unicode - returns: %s (%s)" % (
-                    method_name, method, repr(content), type(content)
-                )
-            )
-
-        if node.level:
-            self.debug_msg("emit_node", "%s (level: %i): %r" % (node.kind, node.level, node.content))
-        else:
-            self.debug_msg("emit_node", "%s: %r" % (node.kind, node.content))
-
-        method_name = "%s_emit" % node.kind
-        emit_method = getattr(self, method_name, None)
+        """
+        Emit a single node with all its children.
 
-        if emit_method:
-            content = emit_method(node)
-            if not isinstance(content, TEXT_TYPE):
-                unicode_error(method_name, emit_method, node, content)
-        else:
+        The tree is walked with a explicit stack, so deep nested documents
+        need no deep Python stack: The *_enter method of a node is called
+        before its children are emitted and the *_emit method after them.
+        In the *_emit method emit_children() returns the emitted children.
+        """
+        handlers = self._handlers
+        debugging = self.debugging
+        stack = []
+        result = []
+        nodes = iter((node,))
+        while True:
+            for node in nodes:
+                emit, enter, walk = handlers[node.kind]
+
+                if debugging:
+                    if node.level:
+                        self.debug_msg("emit_node", "%s (level: %i): %r" % (node.kind, node.level, node.content))
+                    else:
+                        self.debug_msg("emit_node", "%s: %r" % (node.kind, node.content))
+
+                if enter is not None:
+                    enter(self, node)
+                    if walk and node.children:
+                        # walk into the children, like emit_children_list()
+                        self.last = node
+                        stack.append((node, emit, nodes, result))
+                        nodes = iter(node.children)
+                        result = []
+                        break
+                    self._walked_node = node
+                    self._walked_children = []
+                elif walk and node.children:
+                    self.last = node
+                    stack.append((node, emit, nodes, result))
+                    nodes = iter(node.children)
+                    result = []
+                    break
+
+                result.append(self._emit(node, emit))
+            else:
+                if not stack:
+                    return result[0]
+                node, emit, nodes, parent_result = stack.pop()
+                self._walked_node = node
+                self._walked_children = result
+                content = self._emit(node, emit)
+                result = parent_result
+                result.append(content)
+
+    def _emit(self, node, emit):
+        if emit is None:
             content = self._unknown_emit(self, node)
-            if not isinstance(content, TEXT_TYPE):
-                unicode_error(method_name, self._unknown_emit, node, content)
-
+        else:
+            content = emit(self, node)
+        if self.strict:
+            self._check_content(node, content, emit)
         self.last = node
         return content
 
+    def _check_content(self, node, content, emit=None):
+        if not isinstance(content, TEXT_TYPE):
+            node.debug()
+            raise AssertionError(
+                "Method '%s_emit' (%s) returns no unicode - returns: %s (%s)" % (
+                    node.kind, emit or self._unknown_emit, repr(content), type(content)
+                )
+            )
+
 #    def emit(self):
 #        """Emit the document represented by self.root DOM tree."""
 #        result = self.emit_node(self.root)
@@ -19,21 +19,53 @@ from creole.py3compat import TEXT_TYPE
 from creole.shared.utils import dict2string
 
 
-class DocNode:
+# Shared by all nodes without children, see DocNode.__init__()
+NO_CHILDREN = ()
+
+
+class DocNode(object):
     """
     A node in the document tree for html2creole and creole2html.
     
     The Document tree would be created in the parser and used in the emitter.
+
+    There are many nodes in big documents, so the attributes are slots and
+    the nodes without children share the empty NO_CHILDREN tuple. The attrs
+    dict is created on the first access:
+
+    >>> root = DocNode("document")
+    >>> root.children
+    ()
+    >>> node = DocNode("text", root, content="foo")
+    >>> root.children
+    [<DocNode text: 'foo'>]
+    >>> node.attrs
+    {}
     """
-    def __init__(self, kind='', parent=None, content=None, attrs=[], level=None):
+    __slots__ = (
+        "kind", "children", "parent", "_attrs", "content", "level",
+        # Only used in some nodes:
+        "macro_name", "macro_args", # creole2html macros
+        "sect", # creole2html pre blocks
+        "used_macros", # creole2html document root
+    )
+
+    def __init__(self, kind='', parent=None, content=None, attrs=None, level=None):
         self.kind = kind
 
-        self.children = []
+        self.children = NO_CHILDREN
         self.parent = parent
-        if self.parent is not None:
-            self.parent.children.append(self)
+        if parent is not None:
+            if parent.children is NO_CHILDREN:
+                parent.children = [self]
+            else:
+                parent.children.append(self)
+
+        if attrs:
+            self._attrs = dict(attrs)
+        else:
+            self._attrs = None
 
-        self.attrs = dict(attrs)
         if content:
             assert isinstance(content, TEXT_TYPE), "Given content %r is not unicode, it's type: %s" % (
                 content, type(content)
@@ -42,6 +74,16 @@ class DocNode:
         self.content = content
         self.level = level
 
+    @property
+    def attrs(self):
+        if self._attrs is None:
+            self._attrs = {}
+        return self._attrs
+
+    @attrs.setter
+    def attrs(self, attrs):
+        self._attrs = attrs
+
     def get_attrs_as_string(self):
         """
         FIXME: Find a better was to do this.
@@ -74,6 +116,31 @@ class DocNode:
             print("%20s: %r" % (i, getattr(self, i, "---")))
 
 
+def iter_tree(node):
+    """
+    Yield (depth, node) for all nodes below node in document order. The
+    tree is walked with a explicit stack, so the depth is not limited by
+    the recursion limit.
+
+    >>> root = DocNode("document")
+    >>> p = DocNode("paragraph", root)
+    >>> text = DocNode("text", p, content="foo")
+    >>> hr = DocNode("separator", root)
+    >>> [(depth, node.kind) for depth, node in iter_tree(root)]
+    [(0, 'paragraph'), (1, 'text'), (0, 'separator')]
+    """
+    stack = [(0, iter(node.children))]
+    while stack:
+        depth, nodes = stack[-1]
+        for node in nodes:
+            yield depth, node
+            if node.children:
+                stack.append((depth + 1, iter(node.children)))
+                break
+        else:
+            stack.pop()
+
+
 class DebugList(list):
     def __init__(self, html2creole):
         self.html2creole = html2creole
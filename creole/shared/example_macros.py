@@ -38,12 +38,15 @@ def pre(text):
     Put text between html pre tag.
     """
     return '<pre>%s</pre>' % escape(text)
+pre.pure = True
 
 
 def code(ext, text):
     """
     Macro tag <<code ext=".some_extension">>...<</code>>
     If pygments is present, highlight the text according to the extension.
+    The macro is pure: The highlighted code can be cached with the
+    macro_cache argument of HtmlEmitter.
     """
     if not PYGMENTS:
         return pre(text)
@@ -57,7 +60,7 @@ def code(ext, text):
     except IndexError:
         source_type = ''
 
-    lexer = get_pygments_lexer(source_type, code)
+    lexer = get_pygments_lexer(source_type, text)
     formatter = get_pygments_formatter()
 
     try:
@@ -66,3 +69,4 @@ def code(ext, text):
         highlighted_text = pre(text)
     finally:
         return highlighted_text.replace('\n', '<br />\n')
+code.pure = True
@@ -27,6 +27,12 @@ except ImportError:
 if hasattr(OriginHTMLParser, "cdata_elem"):
     # Current python version is patched -> use the original
     HTMLParser = OriginHTMLParser
+    try:
+        HTMLParseError = OriginHTMLParser.HTMLParseError
+    except AttributeError:
+        # Python 3.5+ never raises it
+        class HTMLParseError(Exception):
+            pass
 else:
     # Current python version is not patched -> use own patched version
-    from creole.shared.HTMLParsercompat import HTMLParser
+    from creole.shared.HTMLParsercompat import HTMLParser, HTMLParseError
@@ -1,8 +1,37 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    markup table
+    ~~~~~~~~~~~~
+
+    The column widths are tracked while the cells are added, so the
+    table markup is written line by line in one pass.
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
 
 class MarkupTable(object):
     """
     Container for holding table data and render the data in creole markup.
     Format every cell width to the same col width.
+
+    Rows can have a different count of cells:
+
+    >>> t = MarkupTable()
+    >>> t.add_th("a"); t.add_th("b")
+    >>> t.add_tr(); t.add_td("long cell")
+    >>> t.add_tr(); t.add_td("1"); t.add_td("2"); t.add_td("3")
+    >>> t.widths
+    [11, 4, 3]
+    >>> print(t.get_table_markup())
+    |= a        |= b |
+    | long cell |
+    | 1         | 2  | 3 |
     """
     def __init__(self, head_prefix="= ", auto_width=True, debug_msg=None):
         self.head_prefix = head_prefix
@@ -13,17 +42,23 @@ class MarkupTable(object):
         else:
             self.debug_msg = debug_msg
 
-        self.rows = []
         self.row_index = None
         self.has_header = False
 
+        # With auto_width the preformatted cells of the rows and the max.
+        # width of them in every column, otherwise the cells as given.
+        self.rows = []
+        self.cells = []
+        self.widths = []
+
     def _non_debug(self, *args):
         pass
 
     def add_tr(self):
         self.debug_msg("Table.add_tr", "")
-        self.rows.append([])
-        self.row_index = len(self.rows) - 1
+        rows = self.cells if self.auto_width else self.rows
+        rows.append([])
+        self.row_index = len(rows) - 1
 
     def add_th(self, text):
         self.has_header = True
@@ -34,70 +69,74 @@ class MarkupTable(object):
             self.add_tr()
 
         self.debug_msg("Table.add_td", text)
-        self.rows[self.row_index].append(text)
-
-    def _get_preformat_info(self):
-        cells = []
-        for row in self.rows:
-            line_cells = []
-            for cell in row:
-                cell = cell.strip()
-                if cell != "":
-                    if self.head_prefix and cell.startswith(self.head_prefix):
-                        cell += " " # Headline
-                    else:
-                        cell = " %s " % cell # normal cell
-                line_cells.append(cell)
-            cells.append(line_cells)
-
-        # Build a list of max len for every column
-        widths = [max(map(len, col)) for col in zip(*cells)]
-
-        return cells, widths
+        if not self.auto_width:
+            self.rows[self.row_index].append(text)
+            return
 
-    def get_table_markup(self):
-        """ return the table data in creole/textile markup. """
+        cell = text.strip()
+        if cell:
+            if self.head_prefix and cell.startswith(self.head_prefix):
+                cell += " " # Headline
+            else:
+                cell = " %s " % cell # normal cell
+
+        row = self.cells[self.row_index]
+        col = len(row)
+        row.append(cell)
+
+        widths = self.widths
+        if col < len(widths):
+            if len(cell) > widths[col]:
+                widths[col] = len(cell)
+        else:
+            widths.append(len(cell))
+
+    def iter_lines(self, fill=False):
+        """
+        Yield every row as a line of preformatted cells, filled up to the
+        column widths. With fill=True the missing cells of short rows are
+        added as empty cells.
+        """
+        widths = self.widths
+        for row in self.cells:
+            cells = [cell.ljust(width) for cell, width in zip(row, widths)]
+            if fill:
+                cells += [" " * width for width in widths[len(row):]]
+            yield "|" + "|".join(cells) + "|"
+
+    def iter_table_markup(self):
+        """ yield the lines of the table in creole/textile markup. """
         if not self.auto_width:
-            lines = []
             for row in self.rows:
-                lines.append("|" + "|".join([cell for cell in row]) + "|")
+                yield "|" + "|".join(row) + "|"
         else:
-            # preformat every table cell
-            cells, widths = self._get_preformat_info()
+            for line in self.iter_lines():
+                yield line
 
-            # Join every line with ljust
-            lines = []
-            for row in cells:
-                cells = [cell.ljust(width) for cell, width in zip(row, widths)]
-                lines.append("|" + "|".join(cells) + "|")
-
-        result = "\n".join(lines)
+    def get_table_markup(self):
+        """ return the table data in creole/textile markup. """
+        result = "\n".join(self.iter_table_markup())
 
         self.debug_msg("Table.get_table_markup", result)
         return result
 
-    def get_rest_table(self):
-        """ return the table data in ReSt markup. """
-        # preformat every table cell
-        cells, widths = self._get_preformat_info()
+    def iter_rest_table(self):
+        """ yield the lines of the table in ReSt markup (needs auto_width). """
+        separator_line = "+%s+" % "+".join(["-"*width for width in self.widths])
+        headline_separator = "+%s+" % "+".join(["="*width for width in self.widths])
 
-        separator_line = "+%s+" % "+".join(["-"*width for width in widths])
-        headline_separator = "+%s+" % "+".join(["="*width for width in widths])
-
-        lines = []
-        for no, row in enumerate(cells):
+        for no, line in enumerate(self.iter_lines(fill=True)):
             if no == 1 and self.has_header:
-                lines.append(headline_separator)
+                yield headline_separator
             else:
-                lines.append(separator_line)
+                yield separator_line
+            yield line
 
-            # Join every line with ljust
-            cells = [cell.ljust(width) for cell, width in zip(row, widths)]
-            lines.append("|" + "|".join(cells) + "|")
+        yield separator_line
 
-        lines.append(separator_line)
-
-        return "\n".join(lines)
+    def get_rest_table(self):
+        """ return the table data in ReSt markup. """
+        return "\n".join(self.iter_rest_table())
 
 if __name__ == '__main__':
     import doctest
@@ -0,0 +1,252 @@
+# coding: utf-8
+
+
+"""
+    document tree serialization
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Store the DocNode tree of CreoleParser or HtmlParser as compact binary
+    data, e.g. in a cache or to send it to another process. The loaded tree
+    can be emitted like a parsed one:
+
+    >>> from creole.creole2html.emitter import HtmlEmitter
+    >>> from creole.creole2html.parser import CreoleParser
+    >>> document = CreoleParser("= Headline\\n\\nSome **creole** <<toc>>").parse()
+    >>> data = serialize_tree(document)
+    >>> loaded = deserialize_tree(data)
+    >>> sorted(loaded.used_macros)
+    ['toc']
+    >>> HtmlEmitter(loaded).emit() == HtmlEmitter(document).emit()
+    True
+
+    The format: A header, the string table as one UTF-8 string with the
+    length of every string and the nodes in document order as flat int
+    arrays. Every node is a record of the parent index, the string index of
+    the kind and of the content and the flags of the optional attributes,
+    that follow in the extra array. All ints are 32 bit little endian.
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import array
+import struct
+import sys
+
+from creole.py3compat import TEXT_TYPE
+from creole.shared.document_tree import DocNode, NO_CHILDREN, iter_tree
+
+
+MAGIC = b"CDT1"
+
+# magic, string count, node count, extra count, size of the UTF-8 text
+HEADER = struct.Struct(str("<4sIIII"))
+ARRAY_TYPE = str("i")
+ITEM_SIZE = array.array(ARRAY_TYPE).itemsize
+NODE_SIZE = 4 # parent, kind, content, flags
+
+# The string index of None
+NONE = -1
+
+# The flags of the optional node attributes in the extra array
+HAS_LEVEL = 1 # the level
+HAS_ATTRS = 2 # the count of attributes and the name, value string indexes
+HAS_MACRO_NAME = 4 # the string index
+HAS_MACRO_ARGS = 8 # the string index
+HAS_SECT = 16 # the string index
+HAS_USED_MACROS = 32 # the count of macro names and the string indexes
+
+# The default of the not set slots
+UNSET = object()
+
+OPTIONAL_STRINGS = (
+    ("macro_name", HAS_MACRO_NAME),
+    ("macro_args", HAS_MACRO_ARGS),
+    ("sect", HAS_SECT),
+)
+
+
+def _to_bytes(values):
+    values = array.array(ARRAY_TYPE, values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    try:
+        return values.tobytes()
+    except AttributeError: # Python 2
+        return values.tostring()
+
+
+def _from_bytes(data, pos, count):
+    end = pos + count * ITEM_SIZE
+    if end > len(data):
+        raise ValueError("Serialized document tree is truncated")
+    values = array.array(ARRAY_TYPE)
+    try:
+        values.frombytes(data[pos:end])
+    except AttributeError: # Python 2
+        values.fromstring(data[pos:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist(), end
+
+
+class StringTable(dict):
+    """
+    Map the strings to their index in the list of strings.
+
+    >>> table = StringTable()
+    >>> table["foo"], table["bar"], table["foo"], table.strings
+    (0, 1, 0, ['foo', 'bar'])
+    """
+    def __init__(self):
+        super(StringTable, self).__init__()
+        self.strings = []
+
+    def __missing__(self, text):
+        if not isinstance(text, TEXT_TYPE):
+            raise TypeError("Can't serialize %r, only unicode strings" % (text,))
+        index = self[text] = len(self.strings)
+        self.strings.append(text)
+        return index
+
+    def index(self, text):
+        if text is None:
+            return NONE
+        return self[text]
+
+
+def serialize_tree(root):
+    """
+    Return the document tree below the root node as bytes. The nodes
+    contents and attribute values must be unicode strings or None.
+    """
+    table = StringTable()
+    nodes = []
+    extras = []
+
+    def add(node, parent_index):
+        flags = 0
+        if node.level is not None:
+            flags |= HAS_LEVEL
+            extras.append(node.level)
+        if node._attrs:
+            flags |= HAS_ATTRS
+            extras.append(len(node._attrs))
+            for name, value in sorted(node._attrs.items()):
+                extras.append(table.index(name))
+                extras.append(table.index(value))
+        for name, flag in OPTIONAL_STRINGS:
+            value = getattr(node, name, UNSET)
+            if value is not UNSET:
+                flags |= flag
+                extras.append(table.index(value))
+        used_macros = getattr(node, "used_macros", UNSET)
+        if used_macros is not UNSET:
+            flags |= HAS_USED_MACROS
+            extras.append(len(used_macros))
+            extras.extend([table.index(name) for name in sorted(used_macros)])
+
+        content = node.content
+        nodes.extend((
+            parent_index, table[node.kind], NONE if content is None else table[content], flags
+        ))
+
+    add(root, NONE)
+    # The index of the last node for every depth
+    path = [0]
+    for depth, node in iter_tree(root):
+        del path[depth + 1:]
+        path.append(len(nodes) // NODE_SIZE)
+        add(node, path[depth])
+
+    text = "".join(table.strings).encode("utf-8")
+    return b"".join((
+        HEADER.pack(MAGIC, len(table.strings), len(nodes) // NODE_SIZE, len(extras), len(text)),
+        _to_bytes([len(string) for string in table.strings]),
+        _to_bytes(nodes),
+        _to_bytes(extras),
+        text,
+    ))
+
+
+def deserialize_tree(data):
+    """
+    Return the root DocNode of a tree from serialize_tree().
+    ValueError is raised for broken data.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Serialized document tree is truncated")
+    magic, string_count, node_count, extra_count, text_size = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("No serialized document tree (wrong magic: %r)" % magic)
+
+    lengths, pos = _from_bytes(data, HEADER.size, string_count)
+    records, pos = _from_bytes(data, pos, node_count * NODE_SIZE)
+    extras, pos = _from_bytes(data, pos, extra_count)
+    if pos + text_size != len(data):
+        raise ValueError("Serialized document tree has a wrong size")
+    text = data[pos:].decode("utf-8")
+
+    strings = []
+    start = 0
+    for length in lengths:
+        end = start + length
+        strings.append(text[start:end])
+        start = end
+    strings.append(None) # The index NONE = -1
+
+    new_node = DocNode.__new__
+    nodes = []
+    extras = iter(extras)
+    records = iter(records)
+    try:
+        for parent_index, kind, content, flags in zip(records, records, records, records):
+            node = new_node(DocNode)
+            node.kind = strings[kind]
+            node.content = strings[content]
+            node.children = NO_CHILDREN
+            node._attrs = None
+            node.level = None
+
+            if parent_index < 0:
+                if parent_index != NONE or nodes:
+                    raise ValueError("Serialized document tree has more than one root")
+                node.parent = None
+            else:
+                parent = nodes[parent_index]
+                node.parent = parent
+                if parent.children is NO_CHILDREN:
+                    parent.children = [node]
+                else:
+                    parent.children.append(node)
+
+            if flags:
+                if flags & HAS_LEVEL:
+                    node.level = next(extras)
+                if flags & HAS_ATTRS:
+                    node._attrs = dict([
+                        (strings[next(extras)], strings[next(extras)])
+                        for _ in range(next(extras))
+                    ])
+                for name, flag in OPTIONAL_STRINGS:
+                    if flags & flag:
+                        setattr(node, name, strings[next(extras)])
+                if flags & HAS_USED_MACROS:
+                    node.used_macros = set([
+                        strings[next(extras)] for _ in range(next(extras))
+                    ])
+
+            nodes.append(node)
+    except (IndexError, StopIteration):
+        raise ValueError("Serialized document tree is broken")
+
+    if not nodes:
+        raise ValueError("Serialized document tree has no nodes")
+    return nodes[0]
+
+
+if __name__ == '__main__':
+    import doctest
+    print(doctest.testmod())
@@ -11,13 +11,15 @@
 
 from __future__ import division, absolute_import, print_function, unicode_literals
 
-import shlex
+import collections
+import re
 
-from creole.py3compat import TEXT_TYPE, PY3, repr2
+from creole.py3compat import TEXT_TYPE, repr2
 
 try:
     from pygments import lexers
     from pygments.formatters import HtmlFormatter
+    from pygments.util import ClassNotFound
     PYGMENTS = True
 except ImportError:
     PYGMENTS = False
@@ -30,6 +32,69 @@ KEYWORD_MAP = {
     "None": None,
 }
 
+# The tokens of the macro arguments, split like shlex.split() does
+ARGS_TOKEN_REGEX = re.compile(r"""
+    (?P<space> [ \t\r\n]+ )
+    |
+    (?P<plain> [^ \t\r\n'"\\]+ )
+    |
+    '(?P<single> [^']* )'
+    |
+    "(?P<double> (?:[^"\\]|\\.)* )"
+    |
+    \\(?P<escaped> . )
+    |
+    (?P<error> . )
+""", re.VERBOSE | re.DOTALL)
+
+# In double quotes only the quote and the backslash can be escaped
+DOUBLE_QUOTED_ESCAPE_REGEX = re.compile(r'\\(["\\])')
+# A not closed double quote with a backslash at the end
+UNFINISHED_ESCAPE_REGEX = re.compile(r'(?:[^"\\]|\\.)*\\\Z', re.DOTALL)
+
+
+def split_args(raw_content):
+    """
+    Split the macro arguments with the quoting rules of shlex.split() in
+    POSIX mode, but with one regular expression. e.g.:
+
+    >>> print(" | ".join(split_args('key1="value 1" key2=2 key3=a"b c"d')))
+    key1=value 1 | key2=2 | key3=ab cd
+    >>> split_args('key="unclosed')
+    Traceback (most recent call last):
+    ...
+    ValueError: No closing quotation
+    """
+    tokens = []
+    parts = None
+    for match in ARGS_TOKEN_REGEX.finditer(raw_content):
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "space":
+            if parts is not None:
+                tokens.append("".join(parts))
+                parts = None
+            continue
+        elif kind == "double":
+            if "\\" in text:
+                text = DOUBLE_QUOTED_ESCAPE_REGEX.sub(r"\1", text)
+        elif kind == "error":
+            if text == "\\" or (
+                    text == '"' and UNFINISHED_ESCAPE_REGEX.match(raw_content, match.end())
+                ):
+                raise ValueError("No escaped character")
+            raise ValueError("No closing quotation")
+
+        if parts is None:
+            parts = [text]
+        else:
+            parts.append(text)
+
+    if parts is not None:
+        tokens.append("".join(parts))
+    return tokens
+
+
 def string2dict(raw_content, encoding="utf-8"):
     """
     convert a string into a dictionary. e.g.:
@@ -40,16 +105,15 @@ def string2dict(raw_content, encoding="utf-8"):
     >>> string2dict('key1="value1" key2="value2"') == {'key2': 'value2', 'key1': 'value1'}
     True
 
+    Byte strings are decoded with the encoding.
+
     See test_creole2html.TestString2Dict()
     """
-    if not PY3 and isinstance(raw_content, TEXT_TYPE):
-        # shlex.split doesn't work with unicode?!?
-        raw_content = raw_content.encode(encoding)
-
-    parts = shlex.split(raw_content)
+    if not isinstance(raw_content, TEXT_TYPE):
+        raw_content = raw_content.decode(encoding)
 
     result = {}
-    for part in parts:
+    for part in split_args(raw_content):
         key, value = part.split("=", 1)
 
         if value in KEYWORD_MAP:
@@ -67,6 +131,51 @@ def string2dict(raw_content, encoding="utf-8"):
     return result
 
 
+class ArgsTable(object):
+    """
+    Memoize string2dict() for the macro arguments, they repeat often.
+    The least recently used arguments are removed, if more than max_size
+    different arguments are stored.
+
+    >>> args_table = ArgsTable(max_size=2)
+    >>> args_table['ext=".py"'] is args_table['ext=".py"']
+    True
+    >>> args_table["a=1"]["a"], args_table["b=2"]["b"]
+    (1, 2)
+    >>> len(args_table.entries), 'ext=".py"' in args_table.entries
+    (2, False)
+    """
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()
+
+    def __getitem__(self, raw_content):
+        entries = self.entries
+        try:
+            result = entries.pop(raw_content)
+        except KeyError:
+            result = string2dict(raw_content)
+            if len(entries) >= self.max_size:
+                entries.popitem(last=False)
+        entries[raw_content] = result # mark as most recently used
+        return result
+
+ARGS_TABLE = ArgsTable()
+
+
+def cached_string2dict(raw_content):
+    """
+    string2dict() with the memoized result. Returns a new dict, so the
+    caller can change it.
+
+    >>> kwargs = cached_string2dict('ext=".py"')
+    >>> kwargs["text"] = "foo"
+    >>> cached_string2dict('ext=".py"') == {"ext": ".py"}
+    True
+    """
+    return dict(ARGS_TABLE[raw_content])
+
+
 def dict2string(d):
     """
     FIXME: Find a better was to do this.
@@ -86,19 +195,140 @@ def dict2string(d):
     return " ".join(attr_list)
 
 
+def strip_iter(parts):
+    """
+    Yield the given string parts like "".join(parts).strip() without
+    joining them, e.g.:
+
+    >>> list(strip_iter(["  ", " one ", "\\n", "two", "  \\n", ""]))
+    ['one', ' \\ntwo']
+    """
+    started = False
+    whitespace = ""
+    for part in parts:
+        if not started:
+            part = part.lstrip()
+            if not part:
+                continue
+            started = True
+
+        stripped = part.rstrip()
+        if stripped:
+            yield whitespace + stripped
+            whitespace = part[len(stripped):]
+        else:
+            whitespace += part
+
+
+def strip_parts(parts):
+    """
+    Strip the given list of string parts in place, so "".join(parts) is
+    the same as "".join(parts).strip() without a copy of the joined string.
+    Only the parts at the start and the end are changed, e.g.:
+
+    >>> parts = ["  ", " one ", "\\n", "two", "  \\n", ""]
+    >>> strip_parts(parts)
+    >>> parts == ["one ", "\\n", "two"]
+    True
+    """
+    start = 0
+    while start < len(parts) and not parts[start].strip():
+        start += 1
+    del parts[:start]
+
+    end = len(parts)
+    while end > 0 and not parts[end - 1].strip():
+        end -= 1
+    del parts[end:]
+
+    if parts:
+        parts[0] = parts[0].lstrip()
+        parts[-1] = parts[-1].rstrip()
+
+
+class GroupHandlers(dict):
+    """
+    Map regex group names to the methods of a class, e.g.:
+    group "foo" -> cls._foo_repl with method_format="_%s_repl"
+    Missing methods are mapped to None.
+
+    >>> class Foo(object):
+    ...     def _bar_repl(self): pass
+    >>> handlers = GroupHandlers(Foo, "_%s_repl")
+    >>> handlers["bar"] == Foo._bar_repl, handlers["baz"]
+    (True, None)
+    """
+    def __init__(self, cls, method_format):
+        super(GroupHandlers, self).__init__()
+        self.cls = cls
+        self.method_format = method_format
+
+    def __missing__(self, name):
+        method = getattr(self.cls, self.method_format % name, None)
+        self[name] = method
+        return method
+
+
+_GROUP_HANDLERS = {}
+
+def get_group_handlers(cls, method_format):
+    """
+    Returns the GroupHandlers for the class. They are created only once
+    per class and used to dispatch a regex match via match.lastgroup,
+    see CreoleParser._replace(), or a node via its kind, see
+    HtmlEmitter.emit_node()
+    """
+    key = (cls, method_format)
+    try:
+        return _GROUP_HANDLERS[key]
+    except KeyError:
+        return _GROUP_HANDLERS.setdefault(key, GroupHandlers(cls, method_format))
+
+
+class PygmentsLexers(dict):
+    """
+    The pygments lexers by source type, e.g. "py". A lexer is created once
+    and used for all code of the source type, None is stored for unknown
+    source types. Only the first max_size different source types are stored.
+    """
+    max_size = 256
+
+    def __missing__(self, source_type):
+        try:
+            lexer = lexers.get_lexer_by_name(source_type)
+        except ClassNotFound:
+            lexer = None
+        if len(self) < self.max_size:
+            self[source_type] = lexer
+        return lexer
+
+PYGMENTS_LEXERS = PygmentsLexers()
+
+# The HtmlFormatter of get_pygments_formatter(), created at the first call
+_pygments_formatter = None
+
+
 def get_pygments_formatter():
+    """ Return the shared HtmlFormatter for the highlighted code """
+    global _pygments_formatter
     if PYGMENTS:
-        return HtmlFormatter(lineos = True, encoding='utf-8',
-                             style='colorful', outencoding='utf-8',
-                             cssclass='pygments')
+        if _pygments_formatter is None:
+            _pygments_formatter = HtmlFormatter(lineos = True, encoding='utf-8',
+                                 style='colorful', outencoding='utf-8',
+                                 cssclass='pygments')
+        return _pygments_formatter
 
 
 def get_pygments_lexer(source_type, code):
+    """
+    Return the lexer for the source type or the lexer guessed from the
+    source code, if the source type is unknown.
+    """
     if PYGMENTS:
-        try:
-            return lexers.get_lexer_by_name(source_type)
-        except:
-            return lexers.guess_lexer(code)
+        lexer = PYGMENTS_LEXERS[source_type]
+        if lexer is None:
+            lexer = lexers.guess_lexer(code)
+        return lexer
     else:
         return None
 
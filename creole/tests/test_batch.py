@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    unittest for creole.batch
+    ~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import unittest
+
+from creole import creole2html, html2creole
+from creole.batch import convert_many
+from creole.creole2html.emitter import TableOfContent
+
+
+class BatchTests(unittest.TestCase):
+    docs = ["**doc %i**\n\n* item //%i//" % (no, no) for no in range(25)]
+
+    def test_same_order(self):
+        for workers in (1, 2):
+            results = convert_many(self.docs, workers=workers, chunksize=3)
+            self.assertEqual(
+                [result.output for result in results],
+                [creole2html(doc) for doc in self.docs]
+            )
+            self.assertEqual([result.error for result in results], [None] * 25)
+
+    def test_errors(self):
+        docs = ["one", None, "three"]
+        for workers in (1, 2):
+            results = convert_many(docs, workers=workers)
+            self.assertEqual(results[0].output, "<p>one</p>")
+            self.assertEqual(results[1].output, None)
+            self.assertIn("AssertionError", results[1].error)
+            self.assertEqual(results[2].output, "<p>three</p>")
+
+    def test_html2creole(self):
+        html = ["<p><strong>%i</strong></p>" % no for no in range(5)]
+        results = convert_many(html, func="html2creole", workers=2)
+        self.assertEqual(
+            [result.output for result in results], [html2creole(doc) for doc in html]
+        )
+
+    def test_macros_by_name(self):
+        results = convert_many(
+            ["<<pre>>**no markup**<</pre>>"], workers=2,
+            macros="creole.shared.example_macros", verbose=1
+        )
+        self.assertEqual(results[0].output, "<pre>**no markup**</pre>")
+
+        self.assertRaises(ImportError,
+            convert_many, ["x"], macros="not_existing.module"
+        )
+
+    def test_toc_in_every_doc(self):
+        docs = ["<<toc>>\n= A", "<<toc>>\n= B", "<<toc>>\n= C"]
+        macros = {"toc": TableOfContent()}
+        for kwargs in (dict(macros="creole.shared.example_macros"), dict(macros=macros)):
+            for workers in (1, 2):
+                results = convert_many(docs, workers=workers, **kwargs)
+                self.assertEqual(
+                    [result.output for result in results],
+                    [creole2html(doc, macros={"toc": TableOfContent()}) for doc in docs]
+                )
+        self.assertFalse(macros["toc"].created)
+
+    def test_unknown_converter(self):
+        self.assertRaises(ValueError, convert_many, ["x"], func="print")
+        self.assertRaises(ImportError, convert_many, ["x"], func="not_exists:convert")
+
+
+if __name__ == '__main__':
+    unittest.main()
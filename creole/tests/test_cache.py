@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    unittest for the creole2html render cache
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from creole import creole2html
+from creole.creole2html.cache import MemoryCache, SqliteCache, DirectoryCache, \
+    cached_creole2html, get_cache_key, get_macro_id
+from creole.creole2html import macro_cache, macro_runner
+from creole.creole2html.emitter import HtmlEmitter
+from creole.creole2html.parser import CreoleParser
+from creole.creole2html.rules import BlockRules
+
+
+def html_macro(text):
+    return text
+
+def counter_macro(text):
+    counter_macro.calls += 1
+    return "%i" % counter_macro.calls
+counter_macro.calls = 0
+counter_macro.cacheable = False
+
+def badge_macro(text, status="ok"):
+    badge_macro.calls.append((status, text))
+    return '<span class="%s">%s</span>' % (status, text)
+badge_macro.pure = True
+badge_macro.calls = []
+
+
+class CacheTestMixin(object):
+    def get_cache(self, max_size):
+        raise NotImplementedError
+
+    def test_hits_and_misses(self):
+        cache = self.get_cache(max_size=1000)
+        markup = "**bold** and üñíçödé"
+        for _ in range(3):
+            self.assertEqual(cached_creole2html(markup, cache), creole2html(markup))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+        cached_creole2html(markup, cache, blog_line_breaks=False)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_lru_eviction(self):
+        cache = self.get_cache(max_size=100)
+        first = "a" * 40
+        cached_creole2html(first, cache)
+        cached_creole2html("b" * 40, cache)
+        cached_creole2html(first, cache) # first is now the most recently used
+        cached_creole2html("c" * 40, cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+        cached_creole2html(first, cache)
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+        cached_creole2html("b" * 40, cache) # was removed
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+    def test_size_in_bytes(self):
+        cache = self.get_cache(max_size=150)
+        cached_creole2html("ü" * 40, cache) # 87 bytes, but 47 characters
+        cached_creole2html("ö" * 40, cache)
+        self.assertEqual(cache.size, 87)
+        cached_creole2html("ö" * 40, cache)
+        cached_creole2html("ü" * 40, cache) # was removed
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_not_cacheable_macro(self):
+        cache = self.get_cache(max_size=1000)
+        macros = {"counter": counter_macro, "html": html_macro}
+        first = cached_creole2html("<<counter>>", cache, macros=macros)
+        second = cached_creole2html("<<counter>>", cache, macros=macros)
+        self.assertNotEqual(first, second)
+        self.assertEqual(cache.uncacheable, 2)
+
+        cached_creole2html("<<html>>x<</html>>", cache, macros=macros)
+        cached_creole2html("<<html>>x<</html>>", cache, macros=macros)
+        self.assertEqual(cache.hits, 1)
+
+    def test_macro_arguments(self):
+        cache = self.get_cache(max_size=1000)
+        memo_cache = MemoryCache(max_size=1000)
+        threads = []
+
+        def macro(text):
+            threads.append(threading.current_thread())
+            return text
+        macro.pure = True
+
+        # The nested macro isn't memoized in the shared memo_cache
+        html = cached_creole2html(
+            "a <<macro>>x<</macro>> <<badge>>y<</badge>>", cache,
+            macros={"macro": macro, "badge": badge_macro},
+            macro_workers=2, macro_cache=memo_cache
+        )
+        self.assertEqual(html, '<p>a x <span class="ok">y</span></p>')
+        self.assertEqual(memo_cache.misses, 1)
+        if macro_runner.ThreadPoolExecutor is not None:
+            self.assertNotEqual(threads, [threading.current_thread()])
+
+        # Only the timeout changes the html code
+        macros = {"html": html_macro}
+        for macro_timeout in (1, 2, 1):
+            cached_creole2html("<<html>>x<</html>>", cache, macros=macros, macro_timeout=macro_timeout)
+        cached_creole2html("<<html>>x<</html>>", cache, macros=macros, macro_workers=2, macro_timeout=1)
+        self.assertEqual((cache.hits, cache.misses, cache.uncacheable), (2, 3, 1))
+
+    def test_clear(self):
+        cache = self.get_cache(max_size=1000)
+        cached_creole2html("text", cache)
+        cache.clear()
+        cached_creole2html("text", cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+
+class MemoryCacheTests(CacheTestMixin, unittest.TestCase):
+    def get_cache(self, max_size):
+        return MemoryCache(max_size)
+
+
+class SqliteCacheTests(CacheTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get_cache(self, max_size):
+        return SqliteCache(os.path.join(self.temp_dir, "cache.sqlite"), max_size)
+
+
+    def test_reopen(self):
+        cache = self.get_cache(max_size=100)
+        cached_creole2html("a" * 40, cache)
+        cached_creole2html("b" * 40, cache)
+        cached_creole2html("a" * 40, cache) # "b" is now the least recently used
+
+        cache = self.get_cache(max_size=100)
+        self.assertEqual(cache.size, 94)
+        cached_creole2html("c" * 40, cache)
+        self.assertEqual(cache.size, 94)
+        cached_creole2html("a" * 40, cache)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_threads(self):
+        # e.g. one cache for all threads of a web server
+        cache = self.get_cache(max_size=1000)
+        markups = ["**%i**" % no for no in range(20)]
+        results = []
+
+        def convert():
+            try:
+                for markup in markups:
+                    results.append(cached_creole2html(markup, cache) == creole2html(markup))
+            except Exception as err:
+                results.append(err)
+
+        threads = [threading.Thread(target=convert) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [True] * 80)
+
+
+class DirectoryCacheTests(SqliteCacheTests):
+    def get_cache(self, max_size):
+        return DirectoryCache(os.path.join(self.temp_dir, "cache"), max_size)
+
+
+class CacheKeyTests(unittest.TestCase):
+    def test_arguments(self):
+        keys = set([
+            get_cache_key("markup"),
+            get_cache_key("markup2"),
+            get_cache_key("markup", blog_line_breaks=False),
+            get_cache_key("markup", block_rules=BlockRules()),
+            get_cache_key("markup", macros={"html": html_macro}),
+            get_cache_key("markup", verbose=2),
+            get_cache_key("markup", macro_timeout=1),
+        ])
+        self.assertEqual(len(keys), 7)
+        self.assertEqual(get_cache_key("markup"), get_cache_key("markup"))
+
+    def test_macro_version(self):
+        def macro(text):
+            return text
+        key = get_cache_key("markup", macros={"macro": macro})
+        macro.version = 2
+        self.assertNotEqual(get_cache_key("markup", macros={"macro": macro}), key)
+
+    def test_ambiguous_macro_names(self):
+        cache = MemoryCache(max_size=1000)
+        self.assertEqual(
+            cached_creole2html("a <<m>>x<</m>>", cache, macros={"m": lambda text: "one"}),
+            "<p>a one</p>"
+        )
+        self.assertEqual(
+            cached_creole2html("a <<m>>x<</m>>", cache, macros={"m": lambda text: "two"}),
+            "<p>a two</p>"
+        )
+        self.assertEqual((cache.hits, cache.uncacheable), (0, 2))
+
+        macros = {"m": html_macro, "unused": lambda text: text}
+        for _ in range(2):
+            cached_creole2html("a <<m>>x<</m>>", cache, macros=macros)
+        self.assertEqual((cache.hits, cache.uncacheable), (1, 2))
+
+    def test_macro_id(self):
+        class Macros(object):
+            def method(self, text):
+                return text
+        self.assertEqual(get_macro_id(html_macro), "creole.tests.test_cache.html_macro")
+        self.assertEqual(get_macro_id(Macros().method), None)
+        self.assertEqual(get_macro_id(counter_macro.__call__), None)
+
+
+class MacroCacheTests(unittest.TestCase):
+    MARKUP = (
+        "a <<badge>>ok<</badge>> b <<badge>>ok<</badge>>\n\n"
+        "<<badge status=\"fail\">>ok<</badge>> <<badge>>other<</badge>> <<badge>>ok<</badge>>"
+    )
+
+    def setUp(self):
+        self.calls = []
+
+        def badge(text, status="ok"):
+            self.calls.append((status, text))
+            return '<span class="%s">%s</span>' % (status, text)
+        badge.pure = True
+        self.badge = badge
+
+    def test_emit_scope(self):
+        expected = creole2html(self.MARKUP, macros={"badge": self.badge})
+        self.assertEqual(len(self.calls), 5)
+
+        self.calls = []
+        for _ in range(2):
+            html = creole2html(self.MARKUP, macros={"badge": self.badge}, macro_cache="emit")
+            self.assertEqual(html, expected)
+        self.assertEqual(self.calls, [("ok", "ok"), ("fail", "ok"), ("ok", "other")] * 2)
+
+    def test_process_scope(self):
+        badge_macro.calls = []
+        for _ in range(2):
+            creole2html(self.MARKUP, macros={"badge": badge_macro}, macro_cache="process")
+        self.assertEqual(len(badge_macro.calls), 3)
+
+    def test_shared_scope_needs_macro_id(self):
+        def get_badge(color):
+            def badge(text):
+                return '<b class="%s">%s</b>' % (color, text)
+            badge.pure = True
+            return badge
+
+        for scope in ("process", MemoryCache(max_size=1000)):
+            for color in ("red", "blue"):
+                macros = {"badge": get_badge(color)}
+                self.assertEqual(
+                    creole2html(self.MARKUP, macros=macros, macro_cache=scope),
+                    creole2html(self.MARKUP, macros=macros)
+                )
+
+    def test_shared_store(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cache = SqliteCache(os.path.join(temp_dir, "cache.sqlite"), max_size=1000)
+            badge_macro.calls = []
+            for _ in range(2):
+                creole2html(self.MARKUP, macros={"badge": badge_macro}, macro_cache=cache)
+            cache.close()
+        finally:
+            shutil.rmtree(temp_dir)
+        self.assertEqual(len(badge_macro.calls), 3)
+        self.assertEqual((cache.hits, cache.misses), (7, 3))
+
+    def test_macro_workers(self):
+        expected = creole2html(self.MARKUP, macros={"badge": self.badge})
+        self.calls = []
+        html = creole2html(
+            self.MARKUP, macros={"badge": self.badge}, macro_cache="emit", macro_workers=2
+        )
+        self.assertEqual(html, expected)
+        self.assertEqual(sorted(self.calls), [("fail", "ok"), ("ok", "ok"), ("ok", "other")])
+
+    def test_not_pure(self):
+        del self.badge.pure
+        creole2html(self.MARKUP, macros={"badge": self.badge}, macro_cache="emit")
+        self.assertEqual(len(self.calls), 5)
+
+    def test_errors_not_cached(self):
+        def broken(text):
+            self.calls.append(text)
+            raise ValueError("broken")
+        broken.pure = True
+
+        html = creole2html(
+            "a <<broken>>x<</broken>> <<broken>>x<</broken>>",
+            macros={"broken": broken}, macro_cache="emit"
+        )
+        self.assertEqual(html.count("[Error: Macro 'broken' error: broken]"), 2)
+        self.assertEqual(self.calls, ["x", "x"])
+
+    def test_memo_key(self):
+        macro_key = macro_cache.get_macro_key("badge", badge_macro)
+        key = macro_cache.get_memo_key(macro_key, badge_macro, None, "ok")
+        self.assertNotEqual(macro_cache.get_memo_key(macro_key, badge_macro, "", "ok"), key)
+        for other_key in (
+                macro_cache.get_macro_key("other", badge_macro),
+                macro_cache.get_macro_key("badge", html_macro),
+            ):
+            self.assertNotEqual(macro_cache.get_memo_key(other_key, badge_macro, None, "ok"), key)
+        badge_macro.version = 2
+        try:
+            self.assertNotEqual(macro_cache.get_memo_key(macro_key, badge_macro, None, "ok"), key)
+        finally:
+            del badge_macro.version
+
+        self.assertEqual(macro_cache.get_macro_key("badge", self.badge), None)
+        self.assertNotEqual(macro_cache.get_macro_key("badge", self.badge, shared=False), None)
+
+    def test_wrong_scope(self):
+        document = CreoleParser("text").parse()
+        self.assertRaises(ValueError, HtmlEmitter, document, macro_cache="thread")
+
+
+if __name__ == '__main__':
+    unittest.main()
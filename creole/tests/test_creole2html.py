@@ -37,9 +37,11 @@ from creole.tests.utils.base_unittest import BaseCreoleTest
 from creole.tests import test_macros
 from creole.py3compat import PY3
 
-from creole import creole2html
-from creole.shared import example_macros
-from creole.shared.utils import string2dict, dict2string
+from creole import creole2html, creole2html_iter
+from creole.creole2html.emitter import HtmlEmitter
+from creole.creole2html.parser import CreoleParser
+from creole.shared import example_macros, utils
+from creole.shared.utils import ArgsTable, cached_string2dict, string2dict, dict2string
 
 
 class TestCreole2html(BaseCreoleTest):
@@ -259,6 +261,27 @@ class TestCreole2html(BaseCreoleTest):
             macros={'code': example_macros.code}
         )
 
+    @unittest.skipIf(not PYGMENTS, "pygments is not installed")
+    def test_code_macro_unknown_ext(self):
+        # The lexer is guessed from the code
+        html = creole2html(
+            "<<code ext=\".unknown\">>\n#!/usr/bin/env python\nprint(1)\n<</code>>",
+            macros={'code': example_macros.code}
+        )
+        self.assertTrue(html.startswith('<div class="pygments">'), html)
+        self.assertNotIn("[Error", html)
+        self.assertTrue(utils.PYGMENTS_LEXERS["unknown"] is None)
+
+    @unittest.skipIf(not PYGMENTS, "pygments is not installed")
+    def test_code_macro_shared_lexer(self):
+        lexer = utils.get_pygments_lexer("py", "")
+        self.assertTrue(utils.get_pygments_lexer("py", "") is lexer)
+        self.assertTrue(utils.get_pygments_formatter() is utils.get_pygments_formatter())
+
+        markup = "<<code ext=\".py\">>\nprint(1)\n<</code>>"
+        html = creole2html(markup, macros={'code': example_macros.code})
+        self.assertEqual(creole2html(markup, macros={'code': example_macros.code}), html)
+
 
 
 
@@ -713,6 +736,21 @@ class TestCreole2htmlMarkup(BaseCreoleTest):
             <a name="Sub-Headline"><h2>Sub-Headline</h2></a>
         """)
 
+    def test_toc_depth_headline_before_toc(self):
+        self.assert_creole2html(r"""
+            == sub headline
+
+            <<toc depth=1>>
+            = headline
+        """, """
+            <a name="sub headline"><h2>sub headline</h2></a>
+
+            <ul>
+                <li><a href="#headline">headline</a></li>
+            </ul>
+            <a name="headline"><h1>headline</h1></a>
+        """)
+
     def test_toc_headline_before_toc(self):
         self.assert_creole2html(r"""
             = headline
@@ -905,6 +943,153 @@ class TestCreole2htmlMarkup(BaseCreoleTest):
             <p>missing space.ftp://ok</p>
         """)
 
+    def test_single_markup_chars_in_text(self):
+        self.assert_creole2html(r"""
+            a-b, c/d *e* #f ^g_h ~ [i] <j> {k} \l: see http://foo.org
+            and ~http://bar.org, x--y-- **z**
+        """, """
+            <p>a-b, c/d *e* #f ^g_h ~ [i] &lt;j&gt; {k} \\l: see <a href="http://foo.org">http://foo.org</a><br />
+            and http://bar.org, x<small>y</small> <strong>z</strong></p>
+        """)
+
+
+class TestHtmlEmitterParts(unittest.TestCase):
+    """
+    HtmlEmitter.emit() builds the html code with emit_parts()
+    """
+    markup = "* **one //two// three**\n** [[link|four]]\n\n|= head |= a //b// |"
+
+    def test_same_as_emit_node(self):
+        document = CreoleParser(self.markup).parse()
+        emitter = HtmlEmitter(document)
+        self.assertEqual(emitter.emit(), emitter.emit_node(document).strip())
+
+    def test_subclass(self):
+        class MyEmitter(HtmlEmitter):
+            def strong_emit(self, node):
+                return "<b>%s</b>" % self.emit_children(node)
+
+            def _list_emit(self, node, list_type):
+                return "[%s]" % self.emit_children(node)
+
+        document = CreoleParser(self.markup).parse()
+        self.assertEqual(MyEmitter(document).emit(),
+            '[[<b>one <i>two</i> three</b>[[<a href="link">four</a>]]]]\n'
+            '<table>\n'
+            '<tr>\n'
+            '\t<th>head</th>\n'
+            '\t<th>a <i>b</i></th>\n'
+            '</tr>\n'
+            '</table>'
+        )
+
+
+class TestCreole2htmlIter(unittest.TestCase):
+    """
+    creole2html_iter() must create the same html code as creole2html()
+    """
+    markup = (
+        "<<toc>>\n"
+        "= headline\n"
+        "\n"
+        "a paragraph with **bold\n"
+        "  \n"
+        "and a //second// one\n"
+        "\n"
+        "|= table |= header |\n"
+        "| cell   | cell    |\n"
+        "\n"
+        "{{{\n"
+        "pre\n"
+        "\n"
+        "block\n"
+        "}}}\n"
+        "\n"
+        "== sub headline\n"
+        "* one\n"
+        "** two\n"
+        "\n"
+        "<<html>>\n"
+        "<p>html</p>\n"
+        "\n"
+        "<</html>>\n"
+        "\n"
+        "----\n"
+        "last line"
+    )
+
+    def assert_iter(self, source, markup=None, **kwargs):
+        if markup is None:
+            markup = self.markup
+        for blog_line_breaks in (True, False):
+            if hasattr(source, "seek"):
+                source.seek(0)
+            html = "".join(creole2html_iter(
+                source, blog_line_breaks=blog_line_breaks, verbose=0, **kwargs
+            ))
+            self.assertEqual(
+                html, creole2html(markup, blog_line_breaks=blog_line_breaks, verbose=0)
+            )
+
+    def test_string(self):
+        self.assert_iter(self.markup)
+
+    def test_lines(self):
+        self.assert_iter(self.markup.splitlines(True))
+
+    def test_pieces(self):
+        markup = self.markup.replace("\n", "\r\n")
+        pieces = [markup[i:i + 3] for i in range(0, len(markup), 3)]
+        self.assert_iter(pieces, markup)
+
+    def test_two_pass(self):
+        self.assert_iter(StringIO(self.markup), two_pass=True)
+        self.assert_iter(self.markup.splitlines(True), two_pass=True)
+        self.assertRaises(TypeError,
+            creole2html_iter, iter(self.markup.splitlines(True)), two_pass=True
+        )
+
+    def test_blocks_are_yielded(self):
+        markup = "\n\n".join(["paragraph %i" % no for no in range(10)])
+        parts = list(creole2html_iter(markup, toc_lookahead=0))
+        self.assertEqual(len(parts), 10)
+        self.assertEqual("".join(parts), creole2html(markup))
+
+    def test_unclosed_blocks(self):
+        markup = "{{{\nno end\n\nof pre\n\n<<html>>\n\nno end tag"
+        self.assert_iter(markup, markup)
+        self.assert_iter(markup.splitlines(True), markup)
+
+    def test_macro_block_name(self):
+        # The macro_block rule backtracks to a shorter macro name
+        for markup in (
+                "<<html<</html>>\n\n1\n\n<</h>>",
+                "<<html>><</ht>>\n\ntext\n\n<</html>>",
+                "<<html\n\n<</h>>text <<h<</ht>>\n\n<</html>>",
+            ):
+            self.assert_iter(markup.splitlines(True), markup)
+
+    def test_toc_lookahead(self):
+        markup = "= one\n\n" + "text\n\n" * 5 + "<<toc>>\n\n= two"
+        self.assert_iter(markup.splitlines(True), markup, toc_lookahead=20)
+        self.assert_iter(markup.splitlines(True), markup, two_pass=True)
+        self.assertNotEqual(
+            "".join(creole2html_iter(markup, toc_lookahead=1)), creole2html(markup)
+        )
+
+    def test_toc_text_before_the_toc(self):
+        # "<<toc>>" in the html code before the macro is no placeholder
+        markup = (
+            "<<html>><<toc>><</html>> {{{<<toc>>}}}\n\n= one\n\n<<toc depth>>\n\n<<toc>>\n\n"
+            "<<html>><<toc>><</html>>\n\n= two"
+        )
+        html = creole2html(markup, macros={"html": example_macros.html})
+        self.assertEqual(html.count('<li><a href="#one">one</a></li>'), 1)
+        for kwargs in ({}, {"two_pass": True}):
+            self.assertEqual("".join(creole2html_iter(
+                markup.splitlines(True), macros={"html": example_macros.html}, **kwargs
+            )), html)
+
 
 class TestStr2Dict(unittest.TestCase):
     def test_basic(self):
@@ -931,6 +1116,33 @@ class TestStr2Dict(unittest.TestCase):
             {'key3': 3, 'key2': 2, 'key1': 1}
         )
 
+    def test_quoting(self):
+        self.assertEqual(
+            string2dict(r'''a="x \"y\"" b='z \' c=d"e f"g h=\ i j=""'''),
+            {'a': 'x "y"', 'b': 'z \\', 'c': 'de fg', 'h': ' i', 'j': ''}
+        )
+
+    def test_unicode(self):
+        self.assertEqual(string2dict('title="äöü ß"'), {'title': 'äöü ß'})
+        self.assertEqual(string2dict('title="äöü"'.encode("utf-8")), {'title': 'äöü'})
+
+    def test_errors(self):
+        self.assertRaises(ValueError, string2dict, 'key="value')
+        self.assertRaises(ValueError, string2dict, 'key=value\\')
+        self.assertRaises(ValueError, string2dict, 'no_key_value')
+
+    def test_cached(self):
+        kwargs = cached_string2dict('A="B" C=1')
+        kwargs["text"] = "changed"
+        self.assertEqual(cached_string2dict('A="B" C=1'), {'A': 'B', 'C': 1})
+        self.assertRaises(ValueError, cached_string2dict, 'key="value')
+
+    def test_args_table_lru(self):
+        args_table = ArgsTable(max_size=2)
+        for raw_content in ("a=1", "b=2", "a=1", "c=3"):
+            args_table[raw_content]
+        self.assertEqual(sorted(args_table.entries), ["a=1", "c=3"])
+
 class TestDict2String(unittest.TestCase):
     def test_basic(self):
         self.assertEqual(
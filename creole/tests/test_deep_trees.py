@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    unittest for deep nested documents
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The emitters and the debug() helpers walk the document tree without
+    recursion, so the nesting depth is not limited by the recursion limit.
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import sys
+import unittest
+
+from creole import creole2html, html2creole, html2jira, html2rest, html2textile, \
+    parse_html
+from creole.creole2html.parser import CreoleParser
+from creole.html2creole.emitter import CreoleEmitter
+from creole.html_parser.parser import HtmlParser
+
+try:
+    from io import StringIO
+except ImportError:
+    from StringIO import StringIO # python 2
+
+
+DEPTH = sys.getrecursionlimit() + 100
+
+
+class TestDeepHtml(unittest.TestCase):
+    def test_nested_blocks(self):
+        html = "<div>" * DEPTH + "text" + "</div>" * DEPTH
+        for func in (html2creole, html2textile, html2rest, html2jira):
+            self.assertEqual(func(html), "text")
+
+    def test_nested_inline(self):
+        html = "<span>" * DEPTH + "<strong>text</strong>" + "</span>" * DEPTH
+        self.assertEqual(html2creole(html), "**text**")
+
+    def test_nested_lists(self):
+        html = "<ul><li>x" * DEPTH + "</li></ul>" * DEPTH
+        lines = html2creole(html).splitlines()
+        self.assertEqual(len(lines), DEPTH)
+        self.assertEqual(lines[-1], "*" * DEPTH + " x")
+
+
+class TestDeepCreole(unittest.TestCase):
+    def test_nested_lists(self):
+        markup = "\n".join(["*" * level + " x" for level in range(1, DEPTH)])
+        html = creole2html(markup)
+        self.assertEqual(html.count("<ul>"), DEPTH - 1)
+        self.assertEqual(html.count("</li>"), DEPTH - 1)
+
+    def test_debug(self):
+        markup = "\n".join(["*" * level + " x" for level in range(1, DEPTH)])
+        parser = CreoleParser(markup)
+        parser.parse()
+        html = "<ul><li>x" * DEPTH + "</li></ul>" * DEPTH
+        html_parser = HtmlParser()
+        html_parser.feed(html)
+        html_parser.close()
+
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            parser.debug()
+            html_parser.debug()
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        # The last line before the end of html_parser.debug()
+        line = output.splitlines()[-2]
+        self.assertEqual(line.lstrip(), "data: %r" % "x")
+        self.assertEqual(len(line) - len(line.lstrip()), 4 * 2 * DEPTH)
+
+
+class TestEnterHooks(unittest.TestCase):
+    html = (
+        "<p>text</p><ul><li>one<ol><li>two</li></ol></li><li>three</li></ul>"
+        "<table><tr><th>a</th><td>b</td></tr></table>"
+    )
+
+    def test_overwritten_emit(self):
+        # *_emit methods in subclasses without the *_enter method
+        class MyEmitter(CreoleEmitter):
+            def ul_emit(self, node):
+                return super(MyEmitter, self).ul_emit(node)
+
+            def table_emit(self, node):
+                return super(MyEmitter, self).table_emit(node)
+
+        document_tree = parse_html(self.html)
+        self.assertEqual(
+            MyEmitter(document_tree).emit(), CreoleEmitter(document_tree).emit()
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,20 +15,50 @@
 
 from __future__ import division, absolute_import, print_function, unicode_literals
 
+import sys
 import unittest
 
 from creole.tests.utils.base_unittest import BaseCreoleTest
 
-from creole import html2creole
+from creole import html2creole, parse_html
+from creole.html2creole.emitter import CreoleEmitter
 from creole.shared.unknown_tags import raise_unknown_node, use_html_macro, \
                             escape_unknown_nodes, transparent_unknown_nodes
 
+try:
+    from io import StringIO
+except ImportError:
+    from StringIO import StringIO # python 2
+
 
 class TestHtml2Creole(unittest.TestCase):
     """
     Tests around html2creole API.
     """
-    pass
+    def test_emit_handlers_per_class(self):
+        document_tree = parse_html("<p>one</p>")
+        emitter1 = CreoleEmitter(document_tree)
+        emitter2 = CreoleEmitter(document_tree)
+        self.assertTrue(emitter1._handlers is emitter2._handlers)
+        self.assertEqual(emitter1.emit(), emitter2.emit())
+
+    def test_strict(self):
+        class NoneEmitter(CreoleEmitter):
+            def strong_emit(self, node):
+                return None
+
+        document_tree = parse_html("<p><strong>one</strong></p>")
+        self.assertFalse(NoneEmitter(document_tree).strict)
+        self.assertTrue(NoneEmitter(document_tree, debug=True).strict)
+
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            self.assertRaises(AssertionError,
+                NoneEmitter(document_tree, strict=True).emit
+            )
+        finally:
+            sys.stdout = stdout
 
 
 
@@ -190,6 +220,16 @@ class TestHtml2CreoleMarkup(BaseCreoleTest):
             </ul>
         """)
 
+    def test_more_entities(self):
+        self.assert_html2creole("""
+            it's … ½ A
+
+            {{{it's … ½ A &foo;}}}
+        """, """
+            <p>it&apos;s &hellip; &frac12; &#X41;</p>
+            <pre>it&apos;s &hellip; &frac12; &#X41; &foo;</pre>
+        """)
+
     def test_html_entity_nbsp(self):
         """ Non breaking spaces is not in htmlentitydefs """
         self.assert_html2creole(r"""
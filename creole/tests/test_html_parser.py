@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    unittest for the html parser pre-processing
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import io
+import unittest
+
+from creole import html2creole
+from creole.html_parser.parser import HtmlParser, clean_html
+from creole.html_tools.strip_html import strip_html
+
+
+class TestCleanHtml(unittest.TestCase):
+    def assertClean(self, html, clean, blocks=(), inlines=()):
+        cut_blocks = []
+        cut_inlines = []
+        def block_cut(content):
+            cut_blocks.append(content)
+            return "<blockdata />"
+        def inline_cut(content):
+            cut_inlines.append(content)
+            return "<inlinedata />"
+        self.assertEqual(clean_html(html, block_cut, inline_cut), clean)
+        self.assertEqual(cut_blocks, list(blocks))
+        self.assertEqual(cut_inlines, list(inlines))
+
+    def test_strip_html(self):
+        html = (
+            "<ul>\r\n  <li>  one  </li>\r\n"
+            "  <li><a\n  href='#'>two</a> <br /> </li>\r\n</ul>"
+        )
+        self.assertClean(html, "<ul><li>one</li><li><a href='#'>two</a> <br /></li></ul>")
+        self.assertEqual(clean_html(html, None, None), strip_html(html))
+
+    def test_strip_html_spaces(self):
+        self.assertEqual(strip_html("<p>a\t<i>b</i>\t c</p>"), "<p>a<i>b</i> c</p>")
+        self.assertEqual(
+            strip_html('<a\n  href="#">link</a> \n <br/> x'),
+            '<a href="#">link</a>  <br/>x'
+        )
+        self.assertEqual(
+            strip_html("x < y and y > z <br />\n"), "x < y and y > z<br />"
+        )
+        self.assertEqual(
+            strip_html("<td>\n\t<b>one</b>\n\t</td>"), "<td><b>one</b> </td>"
+        )
+
+    def test_pre_block(self):
+        self.assertClean(
+            "<p>\n  one\n  two\n</p>\n<pre>\n  code\n\n</pre>\n\n<p>three</p>",
+            "<p>one two</p><blockdata /><p>three</p>",
+            blocks=["\n  code\n\n"]
+        )
+
+    def test_pre_inline(self):
+        self.assertClean(
+            "<p>a <pre> inline\n pre </pre> b</p>",
+            "<p>a <inlinedata /> b</p>",
+            inlines=[" inline\n pre "]
+        )
+        self.assertClean(
+            "<pre>\nnot a block\n</pre> text",
+            "<inlinedata /> text",
+            inlines=["\nnot a block\n"]
+        )
+
+    def test_block_in_inline(self):
+        self.assertClean(
+            "<pre>x\n<pre>\nblock\n</pre>\ny</pre>",
+            "<inlinedata />",
+            blocks=["\nblock\n"],
+            inlines=["x\n<blockdata />y"],
+        )
+
+    def test_not_a_tag(self):
+        self.assertClean(
+            "<p>a < b and\n <pre>x</pre></p>",
+            "<p>a < b and <inlinedata /></p>",
+            inlines=["x"]
+        )
+
+    def test_feed(self):
+        parser = HtmlParser()
+        parser.feed("<p>\n  text\n</p>\n<pre>\nblock\n</pre>\n<p><pre>inline</pre></p>")
+        parser.close()
+        self.assertEqual(
+            [node.kind for node in parser.root.children],
+            ["p", "blockdata_pre", "p"]
+        )
+        self.assertEqual(parser.blockdata, ["\nblock\n", "inline"])
+
+    def test_void_tags(self):
+        # void tags without the closing slash have no content
+        self.assertEqual(html2creole("<p>a<hr>b</p><p>c</p>"), "a----\n\nb\n\nc")
+        self.assertEqual(
+            html2creole('<p><img src="x.png">a</img> b</p><p>c</p>'),
+            "{{x.png|x.png}}a b\n\nc"
+        )
+
+
+def dump_tree(node):
+    return (
+        node.kind, node.content, node.attrs,
+        [dump_tree(child) for child in node.children]
+    )
+
+
+class TestChunkedFeed(unittest.TestCase):
+    html = (
+        "<h1>Head</h1>\n<p>\n  one <strong>two</strong>\n  three\n</p>\n"
+        "<pre>\n  block\n  code\n</pre>\n"
+        "<p>a <pre>inline\n pre</pre> b</p>\n<ul>\n  <li>item</li>\n</ul>\n"
+    )
+
+    def get_tree(self, chunks):
+        parser = HtmlParser()
+        for chunk in chunks:
+            parser.feed(chunk)
+        return dump_tree(parser.close()), parser.blockdata
+
+    def test_chunks(self):
+        expected = self.get_tree([self.html])
+        for size in (1, 2, 3, 7, 16):
+            chunks = [
+                self.html[pos:pos + size] for pos in range(0, len(self.html), size)
+            ]
+            self.assertEqual(self.get_tree(chunks), expected, "chunk size %i" % size)
+
+    def test_file_object(self):
+        self.assertEqual(
+            html2creole(io.StringIO(self.html)), html2creole(self.html)
+        )
+
+    def test_iterable(self):
+        chunks = iter(self.html.split("\n"))
+        self.assertEqual(
+            html2creole(chunk + "\n" for chunk in chunks), html2creole(self.html)
+        )
+
+    def test_truncated(self):
+        for html, creole in (
+                ("text <b", "text"),
+                ("<p>x</p><!-- unclosed", "x"),
+                ("<bar baz", ""),
+                ("<//", ""),
+                ("<p>a</p><![CDATA[x", "a"),
+            ):
+            self.assertEqual(html2creole(html), creole, repr(html))
+            chunks = [html[:3], html[3:]]
+            self.assertEqual(html2creole(iter(chunks)), creole, repr(chunks))
+
+
+if __name__ == '__main__':
+    unittest.main()
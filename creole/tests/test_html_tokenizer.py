@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    unittest for the html tokenizer backends
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    The html2* tests run again with the lxml tokenizer, if lxml is
+    installed.
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import unittest
+
+from creole import parse_html
+from creole.html_parser import tokenizer
+from creole.html_parser.tokenizer import available_tokenizers, create_tokenizer, \
+    tokenize_text
+from creole.shared.html_parser import HTMLParser
+from creole.tests import test_html2creole, test_html2jira, test_html2rest, \
+    test_html2textile
+from creole.tests.test_html_parser import dump_tree
+
+
+NO_LXML = "lxml" not in available_tokenizers()
+
+
+class EventRecorder(HTMLParser):
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.events = []
+
+    def handle_data(self, data):
+        self.events.append(("data", data))
+
+    def handle_charref(self, name):
+        self.events.append(("charref", name))
+
+    def handle_entityref(self, name):
+        self.events.append(("entityref", name))
+
+
+class TestTokenizeText(unittest.TestCase):
+    def assertSameEvents(self, text):
+        stdlib = EventRecorder()
+        stdlib.feed("<p>%s</p>" % text)
+        stdlib.close()
+        recorder = EventRecorder()
+        tokenize_text(text, recorder)
+        self.assertEqual(recorder.events, stdlib.events, text)
+
+    def test_like_html_parser(self):
+        for text in (
+                "text", "a &amp; b", "&nbsp;&nbsp;", "x&#65;y", "&#x4f;&#X4fg",
+                "a & b", "&amp1 &a.b-c;", "x < y", "1 &lt; 2 &amp;&amp; 3",
+            ):
+            self.assertSameEvents(text)
+
+
+class TestCreateTokenizer(unittest.TestCase):
+    def test_unknown(self):
+        self.assertRaises(ValueError, create_tokenizer, "foo", None)
+        self.assertRaises(ValueError, parse_html, "<p>x</p>", tokenizer="foo")
+
+    @unittest.skipUnless(NO_LXML, "lxml is installed")
+    def test_missing_lxml(self):
+        self.assertRaises(ImportError, parse_html, "<p>x</p>", tokenizer="lxml")
+
+
+class LxmlTokenizerMixin(object):
+    def setUp(self):
+        super(LxmlTokenizerMixin, self).setUp()
+        self.default_tokenizer = tokenizer.DEFAULT_TOKENIZER
+        tokenizer.DEFAULT_TOKENIZER = "lxml"
+
+    def tearDown(self):
+        tokenizer.DEFAULT_TOKENIZER = self.default_tokenizer
+        super(LxmlTokenizerMixin, self).tearDown()
+
+
+@unittest.skipIf(NO_LXML, "lxml is not installed")
+class TestLxmlTokenizer(unittest.TestCase):
+    def test_same_tree(self):
+        html = (
+            "<h1>Head</h1>\n<p class='x'>one <strong>two</strong> &amp; &#65;\n"
+            "<a href='/?a=1&amp;b=2'>link</a><br />x < y</p>\n"
+            "<pre>\n  block &amp; code\n</pre>\n<p>a <pre>inline</pre> b</p>\n"
+            "<ul>\n  <li>item <img src='x.png' alt='x'></li>\n</ul>\n"
+            "<table><tr><th>a</th><td>b</td></tr></table>"
+        )
+        self.assertEqual(
+            dump_tree(parse_html(html, tokenizer="lxml")),
+            dump_tree(parse_html(html, tokenizer="stdlib"))
+        )
+
+
+@unittest.skipIf(NO_LXML, "lxml is not installed")
+class TestHtml2CreoleLxml(LxmlTokenizerMixin, test_html2creole.TestHtml2Creole):
+    pass
+
+
+@unittest.skipIf(NO_LXML, "lxml is not installed")
+class TestHtml2CreoleMarkupLxml(LxmlTokenizerMixin, test_html2creole.TestHtml2CreoleMarkup):
+    pass
+
+
+@unittest.skipIf(NO_LXML, "lxml is not installed")
+class JiraTestsLxml(LxmlTokenizerMixin, test_html2jira.JiraTests):
+    pass
+
+
+@unittest.skipIf(NO_LXML, "lxml is not installed")
+class ReStTestsLxml(LxmlTokenizerMixin, test_html2rest.ReStTests):
+    pass
+
+
+@unittest.skipIf(NO_LXML, "lxml is not installed")
+class TextileTestsLxml(LxmlTokenizerMixin, test_html2textile.TextileTests):
+    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
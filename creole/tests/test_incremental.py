@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    unittest for the incremental creole2html
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import unittest
+
+from creole import creole2html
+from creole.creole2html.incremental import IncrementalRenderer, iter_parts
+from creole.creole2html.parser import split_blocks
+from creole.shared import example_macros
+
+
+SAMPLE = """
+== Section %(no)i
+
+A paragraph with **bold**, //italic// and a [[http://example.org|link]].
+The text goes
+on in the next line.
+
+* one
+** nested
+* two
+
+|= head |= head |
+| cell  | cell  |
+
+{{{
+pre text
+}}}
+----
+"""
+
+
+class TestIncrementalRenderer(unittest.TestCase):
+    def setUp(self):
+        self.page = "\n".join([SAMPLE % {"no": no} for no in range(30)])
+
+    def assertEdits(self, versions, **kwargs):
+        renderer = IncrementalRenderer(**kwargs)
+        for markup in versions:
+            self.assertEqual(renderer.render(markup), creole2html(markup, **kwargs))
+        return renderer
+
+    def test_iter_parts(self):
+        markup = "one\n  \n\n{{{\n\n}}}\n\t\n= head\n| a |\n\n\n"
+        self.assertEqual(list(iter_parts(markup)), list(split_blocks(markup)))
+        self.assertEqual(list(iter_parts(self.page)), list(split_blocks(self.page)))
+
+    def test_typing(self):
+        pos = len(self.page) // 2
+        versions = []
+        markup = self.page
+        for char in "**bold** //italic// [[link]]\n\n* item\n\n{{{\ncode\n}}}\n":
+            markup = markup[:pos] + char + markup[pos:]
+            pos += 1
+            versions.append(markup)
+        self.assertEdits(versions)
+        self.assertEdits(versions, blog_line_breaks=False)
+
+    def test_only_the_changed_blocks_are_parsed(self):
+        renderer = IncrementalRenderer()
+        renderer.render(self.page)
+        pos = len(self.page) // 2
+        markup = self.page[:pos] + "**bold**" + self.page[pos:]
+        self.assertEqual(renderer.render(markup), creole2html(markup))
+        start, end = renderer.reparsed
+        self.assertTrue(start < pos < end)
+        self.assertTrue(end - start < len(self.page) // 10)
+
+    def test_block_that_contains_the_rest(self):
+        # The end tag of a block macro could be in any of the next parts
+        pos = self.page.index("== Section 15")
+        markup = self.page[:pos] + "<<html>>\n" + self.page[pos:]
+        renderer = IncrementalRenderer()
+        renderer.render(self.page)
+        self.assertEqual(renderer.render(markup), creole2html(markup))
+        self.assertEqual(renderer.reparsed[1], len(markup))
+        self.assertEqual(renderer.render(self.page), creole2html(self.page))
+
+    def test_macro_block_name(self):
+        markup = "<<html<</html>>\n\n1\n\n<</h>>"
+        self.assertEdits(["x\n\n" + markup, markup], blog_line_breaks=False)
+        self.assertEdits([markup[:-1], markup])
+
+    def test_delete_and_replace(self):
+        self.assertEdits([
+            self.page,
+            self.page[:100] + self.page[2000:],
+            self.page.replace("text", "**text**\n\n"),
+            "",
+            "\r\n\r\nnew\r\n\r\npage",
+            "",
+        ])
+
+    def test_no_change(self):
+        renderer = IncrementalRenderer()
+        html = renderer.render(self.page)
+        self.assertEqual(renderer.render(self.page), html)
+        self.assertEqual(renderer.reparsed, (0, 0))
+
+    def test_toc(self):
+        page = "\n\n".join(["= Head %i\n\ntext %i" % (no, no) for no in range(30)])
+        pos = page.index("= Head 20")
+        self.assertEdits([
+            page,
+            "<<toc>>\n\n" + page, # all headlines get a anchor
+            "<<toc>>\n\n" + page.replace("Head 15", "Headline 15"),
+            "<<toc depth=1>>\n\n" + page[:pos] + "== sub\n\n" + page[pos:],
+            "<<toc>>\n\n" + page + "\n\n<<toc>>", # The second is not a toc
+            page + "\n\n<<toc>>",
+            page,
+        ])
+
+    def test_toc_typing(self):
+        page = "<<html>><<toc>><</html>> text <<toc depth=2>> text\n\n" + "\n\n".join([
+            "= Head %i\n\n== Sub %i\n\n=== Sub sub %i\n\ntext %i" % (no, no, no, no)
+            for no in range(30)
+        ])
+        versions = []
+        for pos in (page.index("text 15"), page.index("Head 20") + 4, 5, 40, len(page)):
+            markup = page
+            for char in "= //x//\n\n<<toc>> y":
+                markup = markup[:pos] + char + markup[pos:]
+                pos += 1
+                versions.append(markup)
+
+        renderer = IncrementalRenderer(macros={"html": example_macros.html})
+        for markup in versions:
+            self.assertEqual(
+                renderer.render(markup), creole2html(markup, macros={"html": example_macros.html})
+            )
+
+    def test_macros(self):
+        macros = {"html": example_macros.html}
+        page = "\n\n".join(["<<html>>\n<p>%i</p>\n<</html>>" % no for no in range(30)])
+        pos = page.index("<</html>>")
+        self.assertEdits([
+            page,
+            page[:pos] + "\n\nchanged\n\n" + page[pos:],
+            page.replace("<<html>>", "<<unknown>>", 1),
+        ], macros=macros, verbose=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    unittest for the concurrent macro calls
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import threading
+import time
+import unittest
+
+from creole import creole2html, creole2html_iter
+from creole.creole2html import macro_runner
+from creole.shared import example_macros
+
+try:
+    import asyncio
+except ImportError:
+    # Python 2
+    asyncio = None
+
+
+NO_THREADS = macro_runner.ThreadPoolExecutor is None
+NO_ASYNC = macro_runner.asyncio is None
+
+MARKUP = """
+= Headline
+
+<<toc>>
+
+Inline <<html>><strong>html</strong><</html>> and <<upper>>text<</upper>>.
+
+<<pre>>
+pre block
+<</pre>>
+
+* a <<upper>>list item<</upper>>
+* <<error>>x<</error>>
+
+<<code ext=".py">>
+print(1)
+<</code>>
+
+<<missing>>
+"""
+
+
+def upper(text):
+    return text.upper()
+
+
+def error(text):
+    raise ValueError("broken %s" % text)
+
+
+class TestParallelMacros(unittest.TestCase):
+    def get_macros(self, **macros):
+        result = {
+            "html": example_macros.html, "pre": example_macros.pre,
+            "code": example_macros.code, "upper": upper, "error": error,
+        }
+        result.update(macros)
+        return result
+
+    def test_same_output(self):
+        self.assertEqual(
+            creole2html(MARKUP, macros=self.get_macros(), macro_workers=4),
+            creole2html(MARKUP, macros=self.get_macros())
+        )
+        self.assertIn("[Error: Macro 'error' error: broken x]", creole2html(
+            MARKUP, macros=self.get_macros(), macro_workers=4
+        ))
+
+    @unittest.skipIf(NO_THREADS, "no concurrent.futures")
+    def test_concurrent(self):
+        # All macros must run at the same time to pass the barrier
+        barrier = threading.Barrier(4, timeout=5)
+
+        def wait(text):
+            barrier.wait()
+            return text
+
+        html = creole2html(
+            "a <<wait>>1<</wait>> <<wait>>2<</wait>>\n\nb <<wait>>3<</wait>> <<wait>>4<</wait>>",
+            macros={"wait": wait}, macro_workers=4
+        )
+        self.assertEqual(html, "<p>a 1 2</p>\n\n<p>b 3 4</p>")
+
+    @unittest.skipIf(NO_THREADS, "no concurrent.futures")
+    def test_not_parallel(self):
+        threads = []
+
+        def current(text):
+            threads.append(threading.current_thread())
+            return text
+        current.parallel = False
+
+        creole2html("<<current>>x<</current>>", macros={"current": current}, macro_workers=2)
+        self.assertEqual(threads, [threading.current_thread()])
+
+    @unittest.skipIf(NO_THREADS, "no concurrent.futures")
+    def test_timeout(self):
+        event = threading.Event()
+
+        def slow(text):
+            event.wait(5)
+            return text
+        slow.timeout = 0.1
+
+        try:
+            html = creole2html(
+                "a <<slow>>x<</slow>> <<upper>>y<</upper>>",
+                macros={"slow": slow, "upper": upper}, macro_workers=2
+            )
+        finally:
+            event.set()
+        self.assertEqual(html, "<p>a [Error: Macro 'slow' error: timeout after 0.1 sec]\n Y</p>")
+
+    def test_creole2html_iter(self):
+        source = ["x <<upper>>a<</upper>>\n\n", "y <<upper>>b<</upper>>\n"]
+        self.assertEqual(
+            "".join(creole2html_iter(source, macros={"upper": upper}, macro_workers=2)),
+            "<p>x A</p>\n\n<p>y B</p>"
+        )
+
+
+if not NO_ASYNC:
+    # The async macros are created with exec(), "async def" is no syntax
+    # for Python 2.
+    ASYNC_MACROS = {"creole2html": creole2html, "creole2html_iter": creole2html_iter}
+    exec("""
+import asyncio
+
+async def convert(func, markup, **kwargs):
+    return "".join(func(markup, **kwargs))
+
+async def sleep(text):
+    await asyncio.sleep(float(text))
+    return "slept %s" % text
+
+async def async_error(text):
+    raise ValueError("async %s" % text)
+""", ASYNC_MACROS)
+
+
+@unittest.skipIf(NO_ASYNC, "no asyncio")
+class TestAsyncMacros(unittest.TestCase):
+    def test_serial(self):
+        self.assertEqual(
+            creole2html("a <<sleep>>0<</sleep>>", macros={"sleep": ASYNC_MACROS["sleep"]}),
+            "<p>a slept 0</p>"
+        )
+
+    def test_one_loop(self):
+        # The four macros sleep 0.3 sec at the same time
+        start = time.time()
+        html = creole2html(
+            "a <<sleep>>0.3<</sleep>> <<sleep>>0.3<</sleep>>\n\n"
+            "b <<sleep>>0.3<</sleep>> <<upper>>x<</upper>> <<sleep>>0.3<</sleep>>",
+            macros={"sleep": ASYNC_MACROS["sleep"], "upper": upper}
+        )
+        self.assertLess(time.time() - start, 0.9)
+        self.assertEqual(
+            html, "<p>a slept 0.3 slept 0.3</p>\n\n<p>b slept 0.3 X slept 0.3</p>"
+        )
+
+    @unittest.skipIf(NO_THREADS, "no concurrent.futures")
+    def test_concurrent(self):
+        macros = {"sleep": ASYNC_MACROS["sleep"], "async_error": ASYNC_MACROS["async_error"]}
+        html = creole2html(
+            "a <<sleep>>0.01<</sleep>> <<sleep>>0<</sleep>> <<async_error>>x<</async_error>>",
+            macros=macros, macro_workers=2
+        )
+        self.assertEqual(
+            html, "<p>a slept 0.01 slept 0 [Error: Macro 'async_error' error: async x]\n</p>"
+        )
+
+    @unittest.skipIf(NO_ASYNC or not hasattr(asyncio, "run"), "no asyncio.run()")
+    def test_running_loop(self):
+        # e.g. creole2html() in a async web server
+        macros = {"sleep": ASYNC_MACROS["sleep"], "async_error": ASYNC_MACROS["async_error"]}
+        for func in (creole2html, creole2html_iter):
+            for macro_workers in (None, 2):
+                html = asyncio.run(ASYNC_MACROS["convert"](
+                    func, "a <<sleep>>0<</sleep>> <<async_error>>x<</async_error>>",
+                    macros=macros, macro_workers=macro_workers
+                ))
+                self.assertEqual(
+                    html, "<p>a slept 0 [Error: Macro 'async_error' error: async x]\n</p>"
+                )
+
+    def test_timeout(self):
+        for macro_workers in (None, 2):
+            html = creole2html(
+                "a <<sleep>>5<</sleep>>", macros={"sleep": ASYNC_MACROS["sleep"]},
+                macro_workers=macro_workers, macro_timeout=0.05
+            )
+            self.assertEqual(html, "<p>a [Error: Macro 'sleep' error: timeout after 0.05 sec]\n</p>")
+
+
+if __name__ == '__main__':
+    unittest.main()
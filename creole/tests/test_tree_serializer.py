@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+    unittest for the document tree serialization
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    :copyleft: 2008-2014 by python-creole team, see AUTHORS for more details.
+    :license: GNU GPL v3 or above, see LICENSE for more details.
+"""
+
+from __future__ import division, absolute_import, print_function, unicode_literals
+
+import codecs
+import os
+import sys
+import unittest
+
+from creole import creole2html, parse_html
+from creole.creole2html.emitter import HtmlEmitter
+from creole.creole2html.parser import CreoleParser
+from creole.html2creole.emitter import CreoleEmitter
+from creole.html2rest.emitter import ReStructuredTextEmitter
+from creole.shared import example_macros
+from creole.shared.document_tree import DocNode, iter_tree
+from creole.shared.tree_serializer import deserialize_tree, serialize_tree
+
+
+README_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_README.creole")
+
+NODE_ATTRIBUTES = ("kind", "content", "level", "_attrs", "macro_name", "macro_args", "sect", "used_macros")
+
+
+def dump_nodes(root):
+    """ all attributes of all nodes, without recursion """
+    nodes = [(-1, root)] + list(iter_tree(root))
+    return [
+        (depth, [getattr(node, name, "-unset-") or None for name in NODE_ATTRIBUTES])
+        for depth, node in nodes
+    ]
+
+
+class TestTreeSerializer(unittest.TestCase):
+    def assertRoundTrip(self, root):
+        loaded = deserialize_tree(serialize_tree(root))
+        self.assertEqual(dump_nodes(loaded), dump_nodes(root))
+        for depth, node in iter_tree(loaded):
+            for child in node.children:
+                self.assertTrue(child.parent is node)
+        return loaded
+
+    def test_creole(self):
+        with codecs.open(README_PATH, "r", encoding="utf-8") as f:
+            markup = f.read()
+        markup += "\n\n<<toc>>\n\n<<code ext=.py>>\nprint(1)\n<</code>>\n\n{{{\n#!python\npre\n}}}\n"
+        document = CreoleParser(markup).parse()
+        loaded = self.assertRoundTrip(document)
+
+        self.assertEqual(loaded.used_macros, set(["toc", "code"]))
+        # A new macros dict for every emitter, it gets the toc
+        self.assertEqual(
+            HtmlEmitter(loaded, macros={"code": example_macros.code}, verbose=0).emit(),
+            HtmlEmitter(document, macros={"code": example_macros.code}, verbose=0).emit()
+        )
+
+    def test_html(self):
+        html = creole2html("= Head\n\n* one\n** two\n\n|= a |= b |\n| c | [[/url/|d]] |\n")
+        html += '<p>x &amp; &#65; <img src="/i.png" alt="i" /> <input disabled></p>'
+        document = parse_html(html)
+        loaded = self.assertRoundTrip(document)
+
+        self.assertEqual(CreoleEmitter(loaded).emit(), CreoleEmitter(document).emit())
+        self.assertEqual(
+            ReStructuredTextEmitter(loaded).emit(),
+            ReStructuredTextEmitter(document).emit()
+        )
+
+    def test_deep_tree(self):
+        depth = sys.getrecursionlimit() + 100
+        self.assertRoundTrip(parse_html("<div>" * depth + "text" + "</div>" * depth))
+
+    def test_single_node(self):
+        root = DocNode("document", content="")
+        loaded = self.assertRoundTrip(root)
+        self.assertEqual(loaded.content, "")
+        self.assertTrue(loaded.parent is None)
+
+    def test_unsupported_values(self):
+        root = DocNode("document")
+        DocNode("img", root, attrs={"width": 100})
+        self.assertRaises(TypeError, serialize_tree, root)
+
+    def test_broken_data(self):
+        data = serialize_tree(parse_html("<p>text</p>"))
+        self.assertRaises(ValueError, deserialize_tree, b"")
+        self.assertRaises(ValueError, deserialize_tree, b"XXXX" + data[4:])
+        self.assertRaises(ValueError, deserialize_tree, data[:-1])
+        self.assertRaises(ValueError, deserialize_tree, data[:30])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -96,6 +96,39 @@ class UtilsTests(MarkupTest):
             """
         )
 
+    def test_markup_table_ragged_rows(self):
+        t = MarkupTable(head_prefix="")
+        t.add_tr()
+        t.add_th("head1")
+        t.add_tr()
+        t.add_td("1.1.")
+        t.add_td("1.2.")
+        t.add_tr()
+        t.add_td("2.1.")
+        t.add_td("2.2.")
+        t.add_td("2.3.")
+
+        self.assertEqual2(
+            t.get_table_markup(),
+            """
+            | head1 |
+            | 1.1.  | 1.2. |
+            | 2.1.  | 2.2. | 2.3. |
+            """
+        )
+        self.assertEqual2(
+            t.get_rest_table(),
+            """
+            +-------+------+------+
+            | head1 |      |      |
+            +=======+======+======+
+            | 1.1.  | 1.2. |      |
+            +-------+------+------+
+            | 2.1.  | 2.2. | 2.3. |
+            +-------+------+------+
+            """
+        )
+
 
 if __name__ == '__main__':
     unittest.main()